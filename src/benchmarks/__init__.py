@@ -0,0 +1,13 @@
+"""Benchmarks.
+
+Performance benchmarks for the import pipeline on synthetic data.
+
+Synthetic source rows are generated for representative collections (scenarios) and read from an in-memory
+datastore. The complete import and the separate stages of the import are measured for every scenario.
+The startup stage measures the time until the first row is read by `python -m gobimport import ...`,
+in a fresh interpreter. Its throughput is the number of imports that start per second.
+
+Run the benchmarks:
+
+    python -m benchmarks [--rows N] [--scenario NAME ...] [--stage NAME ...] [--save] [--compare]
+"""
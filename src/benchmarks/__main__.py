@@ -0,0 +1,54 @@
+"""Run the benchmarks.
+
+The results can be saved as baselines and compared with the saved baselines.
+A comparison that finds regressions exits with a non-zero exit code.
+"""
+
+
+import argparse
+import os
+import sys
+
+from benchmarks.runner import DEFAULT_TOLERANCE, compare, load_baselines, run_benchmarks, save_baselines
+from benchmarks.scenarios import SCENARIOS
+from benchmarks.stages import STAGES
+
+BASELINES = os.path.join(os.path.dirname(__file__), "baselines.json")
+
+
+def argument_parser() -> argparse.ArgumentParser:
+    """Parse the benchmark arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark the import pipeline on synthetic data")
+    parser.add_argument("--rows", type=int, default=100_000, help="The number of rows per scenario")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS), help="The scenario(s) to run")
+    parser.add_argument("--stage", action="append", choices=list(STAGES), help="The stage(s) to run")
+    parser.add_argument("--baselines", default=BASELINES, help="The baselines file")
+    parser.add_argument("--save", action="store_true", help="Save the results as baselines")
+    parser.add_argument("--compare", action="store_true", help="Compare the results with the baselines")
+    parser.add_argument(
+        "--tolerance", type=float, default=DEFAULT_TOLERANCE, help="The allowed deviation from the baselines"
+    )
+    return parser
+
+
+def main() -> None:
+    """Run the benchmarks."""
+    args = argument_parser().parse_args()
+
+    scenarios = [SCENARIOS[name] for name in args.scenario or SCENARIOS]
+    stages = {name: STAGES[name] for name in args.stage or STAGES}
+
+    results = run_benchmarks(scenarios, stages, args.rows)
+
+    if args.compare:
+        if regressions := compare(results, load_baselines(args.baselines), args.tolerance):
+            print("Performance regressions:", *regressions, sep="\n")
+            sys.exit(1)
+        print("No performance regressions")
+
+    if args.save:
+        save_baselines(results, args.baselines)
+
+
+if __name__ == "__main__":
+    main()  # pragma: no cover
@@ -0,0 +1,34 @@
+"""Synthetic datastore.
+
+An in-memory datastore that returns generated rows for any query.
+"""
+
+
+from typing import Any, Iterator
+
+
+class SyntheticDatastore:
+    """Datastore that returns a fixed list of rows."""
+
+    user = "synthetic"
+
+    def __init__(self, rows: list[dict[str, Any]]) -> None:
+        """Initialise SyntheticDatastore.
+
+        :param rows: the rows that are returned by every query
+        """
+        self.rows = rows
+
+    def connect(self) -> None:
+        """Connect to the datastore, nothing to connect to."""
+
+    def disconnect(self) -> None:
+        """Disconnect from the datastore, nothing to disconnect from."""
+
+    def query(self, query: str, **kwargs: Any) -> Iterator[dict[str, Any]]:
+        """Return the rows, the query is ignored.
+
+        :param query:
+        :return:
+        """
+        yield from self.rows
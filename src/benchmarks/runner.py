@@ -0,0 +1,128 @@
+"""Benchmark runner.
+
+Measure the throughput (rows/s) and the peak memory usage of the stages and compare them with a baseline.
+
+The throughput is measured without tracing memory allocations, tracemalloc slows down the stage.
+The peak memory usage is measured in a separate run of the stage.
+"""
+
+
+import gc
+import json
+import time
+import tracemalloc
+from functools import partial
+from typing import Any, Callable, Optional
+
+from benchmarks.scenarios import Scenario
+from benchmarks.stages import STAGE_ROWS, Stage
+
+# Default allowed deviation from the baseline, 0.2 allows for a 20% lower throughput or a 20% higher memory usage
+DEFAULT_TOLERANCE = 0.2
+
+Result = dict[str, Any]
+
+
+def measure(prepare: Callable[[], Optional[Callable[[], None]]], n_rows: int) -> Optional[Result]:
+    """Measure the throughput and peak memory usage of a stage.
+
+    :param prepare: prepares the input for a run of the stage and returns the function that runs the stage
+    :param n_rows: the number of rows that is processed by a run
+    :return: None if the stage does not apply, otherwise the result of the measurement
+    """
+    if (run := prepare()) is None:
+        return None
+
+    gc.collect()
+    start = time.perf_counter()
+    run()
+    seconds = time.perf_counter() - start
+    del run
+
+    run = prepare()
+    assert run is not None
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "rows": n_rows,
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(n_rows / seconds),
+        "peak_memory": peak,
+    }
+
+
+def run_benchmarks(scenarios: list[Scenario], stages: dict[str, Stage], n_rows: int) -> dict[str, Result]:
+    """Run the stages for the scenarios.
+
+    :param scenarios:
+    :param stages: name => stage
+    :param n_rows: the number of rows per scenario
+    :return: "<scenario>:<stage>" => result
+    """
+    results = {}
+    for scenario in scenarios:
+        for name, stage in stages.items():
+            result = measure(partial(stage, scenario, n_rows), STAGE_ROWS.get(name, n_rows))
+            if result is not None:
+                results[f"{scenario.name}:{name}"] = result
+                print(_format(f"{scenario.name}:{name}", result))
+    return results
+
+
+def _format(name: str, result: Result) -> str:
+    return f"{name:<50} {result['rows_per_second']:>10} rows/s {result['peak_memory'] / 2 ** 20:>10.1f} MiB"
+
+
+def save_baselines(results: dict[str, Result], filename: str) -> None:
+    """Save the results as baselines, existing baselines for other benchmarks are kept.
+
+    :param results:
+    :param filename:
+    :return:
+    """
+    try:
+        baselines = load_baselines(filename)
+    except FileNotFoundError:
+        baselines = {}
+
+    with open(filename, "w") as file:
+        json.dump({**baselines, **results}, file, indent=2, sort_keys=True)
+
+
+def load_baselines(filename: str) -> dict[str, Result]:
+    """Load the baselines.
+
+    :param filename:
+    :return:
+    """
+    with open(filename) as file:
+        baselines: dict[str, Result] = json.load(file)
+    return baselines
+
+
+def compare(results: dict[str, Result], baselines: dict[str, Result], tolerance: float) -> list[str]:
+    """Compare the results with the baselines.
+
+    :param results:
+    :param baselines:
+    :param tolerance: the allowed deviation, e.g. 0.2 for 20%
+    :return: a description of every regression
+    """
+    regressions = []
+    for name, result in results.items():
+        if (baseline := baselines.get(name)) is None:
+            continue
+
+        if result["rows_per_second"] < baseline["rows_per_second"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: {result['rows_per_second']} rows/s, baseline {baseline['rows_per_second']} rows/s"
+            )
+        if result["peak_memory"] > baseline["peak_memory"] * (1 + tolerance):
+            regressions.append(f"{name}: {result['peak_memory']} bytes, baseline {baseline['peak_memory']} bytes")
+    return regressions
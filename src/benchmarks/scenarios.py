@@ -0,0 +1,233 @@
+"""Benchmark scenarios.
+
+A scenario is a representative collection for which synthetic source rows are generated.
+
+The dataset definition (mapping) and the values of the rows are derived from the GOB model,
+every model field is read from a source column with the same name unless the scenario renames it.
+Scenarios add the raw columns that the enrichers and validators of the collection expect.
+"""
+
+
+import datetime
+from typing import Any, Callable, Optional
+
+from gobimport import gob_model
+from gobimport.enricher.bag import FINANCIERINGSCODE_MAPPING
+
+BASE_DATE = datetime.date(2000, 1, 1)
+
+# RD coordinates within the bounding box of the Netherlands
+BASE_X, BASE_Y = 110000, 470000
+
+# Generates a value for an object (key) and state (seqnr, 0 for the first state)
+ValueGenerator = Callable[[int, int], Any]
+
+
+def _date(days: int) -> str:
+    return (BASE_DATE + datetime.timedelta(days=days)).isoformat()
+
+
+def _datetime(days: int) -> datetime.datetime:
+    return datetime.datetime.combine(BASE_DATE + datetime.timedelta(days=days), datetime.time(12))
+
+
+def _none(key: int, seqnr: int, spec: dict[str, Any]) -> None:
+    return None
+
+
+def _letter(n: int) -> str:
+    return chr(ord("A") + n % 26)
+
+
+def _polygon(key: int) -> str:
+    x, y = BASE_X + key % 10000, BASE_Y + key // 10000 % 10000
+    return f"POLYGON(({x} {y}, {x + 10} {y}, {x + 10} {y + 10}, {x} {y + 10}, {x} {y}))"
+
+
+def _json(key: int, spec: dict[str, Any]) -> Any:
+    value = {attr: f"{attr} {key % 10}" for attr in spec.get("attributes", {"code": None, "omschrijving": None})}
+    return [value] if spec.get("has_multiple_values") else value
+
+
+# GOB type => function that generates a value for an object (key), state (seqnr) and field specification
+VALUE_GENERATORS: dict[str, Callable[[int, int, dict[str, Any]], Any]] = {
+    "GOB.String": lambda key, seqnr, spec: f"{key}",
+    "GOB.Character": lambda key, seqnr, spec: _letter(key),
+    "GOB.Integer": lambda key, seqnr, spec: key,
+    "GOB.Decimal": lambda key, seqnr, spec: key / 100,
+    "GOB.Boolean": lambda key, seqnr, spec: key % 2 == 0,
+    "GOB.Date": lambda key, seqnr, spec: _date(key % 3650),
+    "GOB.DateTime": lambda key, seqnr, spec: _datetime(key % 3650),
+    "GOB.JSON": lambda key, seqnr, spec: _json(key, spec),
+    "GOB.Reference": lambda key, seqnr, spec: f"{key % 1000}",
+    "GOB.Geo.Point": lambda key, seqnr, spec: f"POINT({BASE_X + key % 10000} {BASE_Y + key // 10000 % 10000})",
+    "GOB.Geo.Polygon": lambda key, seqnr, spec: _polygon(key),
+    "GOB.Geo.Geometry": lambda key, seqnr, spec: _polygon(key),
+}
+
+# Every state of an object is valid for a year
+STATE_DAYS = 365
+
+# Default number of references in a ManyReference
+N_REFERENCES = 3
+
+
+class Scenario:
+    """A collection for which synthetic source rows are generated."""
+
+    def __init__(
+        self,
+        catalogue: str,
+        entity: str,
+        n_states: int = 1,
+        source_columns: Optional[dict[str, str]] = None,
+        values: Optional[dict[str, ValueGenerator]] = None,
+        n_references: int = N_REFERENCES,
+        name: Optional[str] = None,
+    ) -> None:
+        """Initialise a Scenario.
+
+        :param catalogue:
+        :param entity:
+        :param n_states: the number of states per object for collections with states
+        :param source_columns: field => source column for fields that are read from another column
+        :param values: source column => value generator for columns with specific values
+        :param n_references: the number of references in every ManyReference
+        :param name: the name of the scenario, default <catalogue>.<entity>
+        """
+        self.catalogue = catalogue
+        self.entity = entity
+        self.name = name or f"{catalogue}.{entity}"
+        self.application = "Synthetic"
+
+        self.collection = gob_model[catalogue]["collections"][entity]
+        self.has_states = gob_model.has_states(catalogue, entity)
+        self.n_states = n_states if self.has_states else 1
+
+        self.source_columns = source_columns or {}
+        self.values = values or {}
+        self.n_references = n_references
+
+        # Secure fields are not generated, they require the secure configuration of the environment
+        self.fields = {field: spec for field, spec in self.collection["fields"].items() if "Secure" not in spec["type"]}
+        self.entity_id = self.column(self.collection["entity_id"])
+
+    def column(self, field: str) -> str:
+        """Return the source column for field."""
+        return self.source_columns.get(field, field)
+
+    def dataset(self) -> dict[str, Any]:
+        """Return the dataset definition for the scenario."""
+        mapping: dict[str, Any] = {}
+        for field, spec in self.fields.items():
+            column = self.column(field)
+            if spec["type"] == "GOB.Reference":
+                mapping[field] = {"source_mapping": {"bronwaarde": column}}
+            elif spec["type"] == "GOB.ManyReference":
+                mapping[field] = {"source_mapping": {"bronwaarde": column, "format": {"split": ";"}}}
+            else:
+                mapping[field] = {"source_mapping": column}
+
+        return {
+            "version": "0.1",
+            "catalogue": self.catalogue,
+            "entity": self.entity,
+            "source": {
+                "name": self.application,
+                "application": self.application,
+                "application_config": {"type": "synthetic"},
+                "entity_id": self.entity_id,
+                "query": [f"SELECT * FROM {self.catalogue}_{self.entity}"],
+            },
+            "gob_mapping": mapping,
+        }
+
+    def row(self, n: int) -> dict[str, Any]:
+        """Return the n-th source row.
+
+        Consecutive rows are the states of the same object.
+
+        :param n:
+        :return:
+        """
+        key, seqnr = divmod(n, self.n_states)
+
+        row = {self.column(field): self._value(key, seqnr, spec) for field, spec in self.fields.items()}
+        row[self.entity_id] = f"{key}"
+
+        if self.has_states:
+            self._add_state(row, seqnr)
+
+        for column, value in self.values.items():
+            row[column] = value(key, seqnr)
+        return row
+
+    def _value(self, key: int, seqnr: int, spec: dict[str, Any]) -> Any:
+        if spec["type"] == "GOB.ManyReference":
+            return ";".join(f"{key + n}" for n in range(self.n_references))
+        return VALUE_GENERATORS.get(spec["type"], _none)(key, seqnr, spec)
+
+    def _add_state(self, row: dict[str, Any], seqnr: int) -> None:
+        row[self.column("volgnummer")] = seqnr + 1
+
+        begin, end = seqnr * STATE_DAYS, (seqnr + 1) * STATE_DAYS
+        for field, days in (("begin_geldigheid", begin), ("eind_geldigheid", end)):
+            if field not in self.fields:
+                continue
+            if field == "eind_geldigheid" and seqnr == self.n_states - 1:
+                # The last state is the current state
+                row[self.column(field)] = None
+            elif self.fields[field]["type"] == "GOB.DateTime":
+                row[self.column(field)] = _datetime(days)
+            else:
+                row[self.column(field)] = _date(days)
+
+    def rows(self, n_rows: int) -> list[dict[str, Any]]:
+        """Return n_rows source rows."""
+        return [self.row(n) for n in range(n_rows)]
+
+
+# The raw columns of the verblijfsobjecten that the BAG enricher and validator expect
+VERBLIJFSOBJECTEN_VALUES: dict[str, ValueGenerator] = {
+    "identificatie": lambda key, seqnr: f"0363010{key:09d}",
+    "gebruiksdoel": lambda key, seqnr: [{"code": "1", "omschrijving": "woonfunctie"}],
+    "fng_code": lambda key, seqnr: list(FINANCIERINGSCODE_MAPPING)[key % len(FINANCIERINGSCODE_MAPPING)],
+    "pandidentificatie": lambda key, seqnr: f"0363100{key:09d};0363100{key + 1:09d}",
+}
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in (
+        # Many metingen for every meetbout, enriched in order of datum
+        Scenario(
+            "meetbouten",
+            "metingen",
+            source_columns={"hoort_bij_meetbouten_meetbout": "hoort_bij_meetbout"},
+            values={
+                "hoort_bij_meetbout": lambda key, seqnr: f"{key % 1000:08d}",
+                "datum": lambda key, seqnr: _date(key // 1000),
+                "hoogte_tov_nap": lambda key, seqnr: 1 - key // 1000 / 1000,
+            },
+        ),
+        # Verblijfsobjecten with states and references, including the plus-gegevens (Amsterdam: 0363)
+        Scenario("bag", "verblijfsobjecten", n_states=2, values=VERBLIJFSOBJECTEN_VALUES),
+        # Verblijfsobjecten with hundreds of references in every ManyReference
+        Scenario(
+            "bag",
+            "verblijfsobjecten",
+            values=VERBLIJFSOBJECTEN_VALUES,
+            n_references=250,
+            name="bag.verblijfsobjecten.many_references",
+        ),
+        # Bouwblokken with states
+        Scenario(
+            "gebieden",
+            "bouwblokken",
+            n_states=3,
+            values={
+                "code": lambda key, seqnr: f"{_letter(key // 100)}{_letter(key)}{key % 100:02d}",
+            },
+        ),
+    )
+}
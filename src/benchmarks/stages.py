@@ -0,0 +1,186 @@
+"""Benchmark stages.
+
+A stage is a part of the import pipeline that is benchmarked on its own, or the complete import.
+
+Every stage prepares its input before it is measured and returns the function that is measured.
+A stage that does not apply to a scenario, e.g. the MeetboutenEnricher for BAG, returns None.
+"""
+
+
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+from typing import Any, Callable, Optional
+from unittest import mock
+
+from gobcore.datastore.factory import DatastoreFactory
+from gobcore.logging.logger import logger
+from gobcore.model import FIELD
+
+from benchmarks.datastore import SyntheticDatastore
+from benchmarks.scenarios import Scenario
+from gobimport.converter import Converter
+from gobimport.enricher.meetbouten import MeetboutenEnricher
+from gobimport.entity_validator.state import StateValidator
+from gobimport.import_client import ImportClient
+from gobimport.merger import Merger
+from gobimport.validator import Validator
+
+Stage = Callable[[Scenario, int], Optional[Callable[[], None]]]
+
+# The directory from which the benchmarks are run in a fresh interpreter
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _entities(scenario: Scenario, n_rows: int) -> list[dict[str, Any]]:
+    converter = Converter(scenario.catalogue, scenario.entity, scenario.dataset())
+    return [converter.convert(row) for row in scenario.rows(n_rows)]
+
+
+def _discard(entity: dict[str, Any]) -> None:
+    pass
+
+
+def import_dataset(scenario: Scenario, n_rows: int) -> Optional[Callable[[], None]]:
+    """Import the dataset end to end, from the datastore to the contents file."""
+    rows = scenario.rows(n_rows)
+
+    def run() -> None:
+        with mock.patch.object(DatastoreFactory, "get_datastore", return_value=SyntheticDatastore(rows)):
+            client = ImportClient(scenario.dataset(), {"header": {}}, logger)
+            client.raise_exception = True
+            with client:
+                client.import_dataset()
+        os.remove(client.filename)
+
+    return run
+
+
+def startup(scenario: Scenario, n_rows: int) -> Optional[Callable[[], None]]:
+    """Start an import by `python -m gobimport import ...` in a fresh interpreter, up to the first row."""
+    fd, spec_file = tempfile.mkstemp(suffix=".pickle")
+    with os.fdopen(fd, "wb") as file:
+        pickle.dump((scenario.dataset(), scenario.row(0)), file)
+
+    args = ["--catalogue", scenario.catalogue, "--collection", scenario.entity, "--application", scenario.application]
+
+    def run() -> None:
+        try:
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.startup", spec_file, "import", *args],
+                check=True,
+                cwd=SRC_DIR,
+                stdout=subprocess.DEVNULL,
+            )
+        finally:
+            os.remove(spec_file)
+
+    return run
+
+
+def converter(scenario: Scenario, n_rows: int) -> Optional[Callable[[], None]]:
+    """Convert the source rows into entities."""
+    rows = scenario.rows(n_rows)
+    convert = Converter(scenario.catalogue, scenario.entity, scenario.dataset()).convert
+
+    def run() -> None:
+        for row in rows:
+            convert(row)
+
+    return run
+
+
+def extract(scenario: Scenario, n_rows: int) -> Optional[Callable[[], None]]:
+    """Extract the values of the fields from the source rows, without converting them."""
+    rows = scenario.rows(n_rows)
+    field_converters = Converter(scenario.catalogue, scenario.entity, scenario.dataset()).field_converters.values()
+
+    def run() -> None:
+        for row in rows:
+            for field_converter in field_converters:
+                field_converter.extract(row)
+
+    return run
+
+
+def validator(scenario: Scenario, n_rows: int) -> Optional[Callable[[], None]]:
+    """Validate the entities (quality checks and primary keys)."""
+    entities = _entities(scenario, n_rows)
+    validate = Validator(scenario.application, scenario.catalogue, scenario.entity, scenario.dataset()).validate
+
+    def run() -> None:
+        for entity in entities:
+            validate(entity)
+
+    return run
+
+
+def state_validator(scenario: Scenario, n_rows: int) -> Optional[Callable[[], None]]:
+    """Validate the states of the entities."""
+    if not scenario.has_states:
+        return None
+
+    entities = _entities(scenario, n_rows)
+    validate = StateValidator(scenario.catalogue, scenario.entity, scenario.collection["entity_id"]).validate
+
+    def run() -> None:
+        for entity in entities:
+            validate(entity)
+
+    return run
+
+
+def meetbouten_enricher(scenario: Scenario, n_rows: int) -> Optional[Callable[[], None]]:
+    """Enrich the metingen."""
+    if not MeetboutenEnricher.enriches(scenario.application, scenario.catalogue, scenario.entity):
+        return None
+
+    rows = scenario.rows(n_rows)
+    enrich = MeetboutenEnricher(scenario.application, scenario.catalogue, scenario.entity).enrich
+
+    def run() -> None:
+        for row in rows:
+            enrich(row)
+
+    return run
+
+
+def merger(scenario: Scenario, n_rows: int) -> Optional[Callable[[], None]]:
+    """Merge the rows with the entities of another dataset, every other object has entities to merge."""
+    if not scenario.has_states:
+        return None
+
+    rows = scenario.rows(n_rows)
+    merge_entities = _entities(scenario, n_rows)
+
+    merger = Merger(None)
+    merger.merge_def = {"on": scenario.entity_id, "copy": [FIELD.START_VALIDITY], "id": "diva_into_dgdialog"}
+    merger.merge_func = merger._merge_diva_into_dgdialog
+    for n, entity in enumerate(merge_entities):
+        if n // scenario.n_states % 2 == 0:
+            merger._collect_entity(entity, merger.merge_def)
+
+    def run() -> None:
+        for row in rows:
+            merger.merge(row, _discard)
+
+    return run
+
+
+STAGES: dict[str, Stage] = {
+    "import": import_dataset,
+    "startup": startup,
+    "converter": converter,
+    "extract": extract,
+    "validator": validator,
+    "state_validator": state_validator,
+    "meetbouten_enricher": meetbouten_enricher,
+    "merger": merger,
+}
+
+# The number of rows that a run of a stage reads, if it does not read all rows of the scenario
+STAGE_ROWS = {
+    "startup": 1,
+}
@@ -0,0 +1,51 @@
+"""Import startup.
+
+Start an import of a synthetic dataset like `python -m gobimport import ...` and stop at the first row.
+
+    python -m benchmarks.startup <spec file> import --catalogue <catalogue> --collection <entity> ...
+
+The spec file is a pickle of the dataset definition and the first row of the dataset.
+The remaining arguments are the arguments of gobimport.
+The import definition and the datastore are replaced by the synthetic ones,
+the process exits as soon as the first row is read.
+"""
+
+
+import os
+import pickle
+import runpy
+import sys
+from typing import Any, Iterator
+from unittest import mock
+
+from benchmarks.datastore import SyntheticDatastore
+
+
+class FirstRowDatastore(SyntheticDatastore):
+    """Datastore that exits the process when the first row is read."""
+
+    def query(self, query: str, **kwargs: Any) -> Iterator[dict[str, Any]]:
+        """Exit the process, the import has started.
+
+        :param query:
+        :return:
+        """
+        sys.stdout.flush()
+        os._exit(0)
+
+
+def main() -> None:
+    """Start the import."""
+    with open(sys.argv[1], "rb") as file:
+        dataset, row = pickle.load(file)
+
+    sys.argv = ["gobimport", *sys.argv[2:]]
+    with (
+        mock.patch("gobconfig.import_.import_config.get_import_definition", return_value=dataset),
+        mock.patch("gobcore.datastore.factory.DatastoreFactory.get_datastore", return_value=FirstRowDatastore([row])),
+    ):
+        runpy.run_module("gobimport", run_name="__main__", alter_sys=True)
+
+
+if __name__ == "__main__":
+    main()  # pragma: no cover
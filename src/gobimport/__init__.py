@@ -1,3 +1,44 @@
+"""GOB Import.
+
+The GOBModel is constructed on first use, importing gobimport (e.g. to start a standalone run)
+does not load the model before it is actually needed.
+"""
+
+from typing import Any, Iterator, Optional
+
 from gobcore.model import GOBModel
 
-gob_model = GOBModel()
+_gob_model: Optional[GOBModel] = None
+
+
+def get_gob_model() -> GOBModel:
+    """Return the GOBModel, construct the model on the first call."""
+    global _gob_model
+    if _gob_model is None:
+        _gob_model = GOBModel()
+    return _gob_model
+
+
+class LazyGOBModel:
+    """Proxy to the GOBModel that constructs the model on first use."""
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_gob_model(), name)
+
+    def __getitem__(self, key: str) -> Any:
+        return get_gob_model()[key]
+
+    def __contains__(self, key: str) -> bool:
+        return key in get_gob_model()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(get_gob_model())
+
+    def __len__(self) -> int:
+        return len(get_gob_model())
+
+    def __dir__(self) -> list[str]:
+        return dir(get_gob_model())
+
+
+gob_model = LazyGOBModel()
@@ -6,7 +6,7 @@ This component imports data sources.
 
 import argparse
 import sys
-from typing import Any
+from typing import TYPE_CHECKING, Any, Optional
 
 from gobconfig.import_.import_config import get_import_definition
 from gobcore.enum import ImportMode
@@ -23,8 +23,11 @@ from gobcore.message_broker.messagedriven_service import messagedriven_service
 from gobcore.message_broker.typing import ServiceDefinition
 from gobcore.standalone import parent_argument_parser, run_as_standalone
 
-from gobimport.converter import MappinglessConverterAdapter
-from gobimport.import_client import DatasetMappingType, ImportClient
+from gobimport.converter import get_mappingless_converter
+from gobimport.workers import IMPORT_WORKERS, application_slot, requeue, run_worker_pool
+
+if TYPE_CHECKING:
+    from gobimport.import_client import DatasetMappingType
 
 
 def argument_parser() -> argparse.ArgumentParser:
@@ -50,10 +53,15 @@ def argument_parser() -> argparse.ArgumentParser:
         default="full",
         choices=["delete", "full", "recent"],
     )
+    import_parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile the import, the profile is written next to the contents file",
+    )
     return parser
 
 
-def extract_dataset_from_msg(msg: dict[str, Any]) -> DatasetMappingType:
+def extract_dataset_from_msg(msg: dict[str, Any]) -> "DatasetMappingType":
     """Return location of dataset file from msg.
 
     Example message:
@@ -80,36 +88,57 @@ def extract_dataset_from_msg(msg: dict[str, Any]) -> DatasetMappingType:
     return get_import_definition(header["catalogue"], header["collection"], header.get("application"))
 
 
-def handle_import_msg(msg: dict[str, Any]) -> dict[str, str]:
+def handle_import_msg(msg: dict[str, Any]) -> Optional[dict[str, str]]:
     """Handle an import message from the message broker queue.
 
+    When the maximum number of concurrent imports from the source application has been reached,
+    the message is requeued and no result is returned.
+
     :param msg: valid (import) message
     :return: result msg
     """
+    # The import client and the import stages are only imported when an import is handled
+    from gobimport.import_client import ImportClient
+
     dataset = extract_dataset_from_msg(msg)
+    application = dataset["source"].get("application", dataset["source"]["name"])
     msg["header"] |= {
         "source": dataset["source"]["name"],
-        "application": dataset["source"]["application"],
+        "application": application,
         "catalogue": dataset["catalogue"],
         "entity": dataset["entity"],
     }
 
     mode = ImportMode(msg["header"].get("mode", ImportMode.FULL.value))
-    with ImportClient(dataset=dataset, msg=msg, mode=mode, logger=logger) as import_client:
-        import_client.import_dataset()
+    with application_slot(application) as has_slot:
+        if not has_slot:
+            requeue(msg)
+            return None
+
+        with ImportClient(dataset=dataset, msg=msg, mode=mode, logger=logger) as import_client:
+            import_client.import_dataset()
 
     result: dict[str, str] = import_client.get_result_msg()
     return result
 
 
 def handle_import_object_msg(msg: dict[str, Any]) -> dict[str, Any]:
-    """Handle an import object message."""
-    logger.info("Start import object")
+    """Handle an import object message.
+
+    The contents of the message is either a single object or a list of objects.
+    All objects are converted and returned in one result message.
+    """
+    if isinstance(msg["contents"], list):
+        objects = msg["contents"]
+        logger.info(f"Start import of {len(objects)} objects")
+    else:
+        objects = [msg["contents"]]
+        logger.info("Start import object")
 
-    importer = MappinglessConverterAdapter(
+    importer = get_mappingless_converter(
         msg["header"].get("catalogue"), msg["header"].get("entity"), msg["header"].get("entity_id_attr")
     )
-    entity = importer.convert(msg["contents"])
+    entities = importer.convert_many(objects)
 
     return {
         "header": {
@@ -118,7 +147,7 @@ def handle_import_object_msg(msg: dict[str, Any]) -> dict[str, Any]:
             "collection": msg["header"].get("entity"),
         },
         "summary": logger.get_summary(),
-        "contents": [entity],
+        "contents": entities,
     }
 
 
@@ -129,6 +158,7 @@ SERVICEDEFINITION: ServiceDefinition = {
         "report": {"exchange": WORKFLOW_EXCHANGE, "key": IMPORT_RESULT_KEY},
         "pass_args_standalone": [
             "mode",
+            "profile",
         ],
     },
     "import_single_object_request": {
@@ -143,7 +173,11 @@ def main():
     """Determine import mode: messagedriven_service or standalone."""
     if len(sys.argv) == 1:
         print("No arguments found, wait for messages on the message broker.")
-        messagedriven_service(SERVICEDEFINITION, "Import")
+        if IMPORT_WORKERS > 1:
+            print(f"Start {IMPORT_WORKERS} import workers.")
+            run_worker_pool(IMPORT_WORKERS, messagedriven_service, SERVICEDEFINITION, "Import")
+        else:
+            messagedriven_service(SERVICEDEFINITION, "Import")
 
     else:
         print("Arguments found, start in standalone mode.")
@@ -0,0 +1,188 @@
+"""Checkpoints.
+
+Checkpoints make long running imports resumable.
+
+When checkpointing is enabled the imported entities are spooled to a file on the shared volume.
+Periodically the state of the import is saved: the key of the last processed row, the number of rows,
+the size of the spool file and the state of the validators, enrichers and merger.
+When an import fails, the next import of the same dataset resumes after the last processed key.
+The rows after the checkpoint are read from the source, the entities are appended to the spool file.
+At the end of the import the spooled entities are written to the contents file.
+
+Checkpointing is enabled in the source definition of a dataset:
+
+"checkpoint": {
+    "key": "<unique source column>",
+    "interval": <number of rows between two checkpoints, default 1000000>,
+    "max_age": <max age in hours of a checkpoint to resume from, default 24>
+}
+
+The rows of the source query are read ordered by the key, this replaces any ordering of the source query itself.
+The key should therefore be the column by which the source is ordered, if the source is ordered at all.
+Only sources with a query, e.g. database sources, can be read ordered by the key.
+Sources without a query, e.g. files, objectstore files and WFS services, can not be checkpointed.
+Imports that depend on another order of the rows, e.g. the enrichment of meetbouten metingen, can not be checkpointed.
+The key should be unique, rows with the same key value as the last processed row are skipped on resume.
+Once all rows have been read the checkpoint is finished, a failure after that point starts a new import.
+
+The components of an import that have a state, e.g. the validators, list the attributes that make up their state:
+
+    checkpoint_attributes = ("<attribute>", ...)
+
+These attributes are saved in a checkpoint and restored when the import is resumed.
+A component without checkpoint_attributes has no state.
+"""
+
+
+import os
+import pickle
+import time
+from typing import Any, Callable, Optional
+
+from gobcore.message_broker.config import GOB_SHARED_DIR
+
+CHECKPOINT_DIR = os.path.join(GOB_SHARED_DIR, "checkpoints")
+
+DEFAULT_INTERVAL = 1_000_000
+DEFAULT_MAX_AGE = 24
+
+
+class Checkpoint:
+    """Save and restore the state of an import."""
+
+    def __init__(self, name: str, spec: dict[str, Any]) -> None:
+        """Initialise a Checkpoint, load a previously saved checkpoint if it exists and is not too old.
+
+        :param name: unique name for the imported dataset, e.g. catalogue.collection.application.mode
+        :param spec: checkpoint specification from the dataset source definition
+        """
+        self.key = spec["key"]
+        self.interval = spec.get("interval", DEFAULT_INTERVAL)
+        self.max_age = spec.get("max_age", DEFAULT_MAX_AGE)
+
+        os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+        self.state_file = os.path.join(CHECKPOINT_DIR, f"{name}.checkpoint")
+        self.spool_file = os.path.join(CHECKPOINT_DIR, f"{name}.spool")
+
+        self.state: Optional[dict[str, Any]] = self._load()
+        self.spool: Any = None
+
+    def _load(self) -> Optional[dict[str, Any]]:
+        if not os.path.exists(self.state_file):
+            return None
+
+        if time.time() - os.path.getmtime(self.state_file) > self.max_age * 3600:
+            # Too old to resume from
+            self.remove()
+            return None
+
+        with open(self.state_file, "rb") as file:
+            state: dict[str, Any] = pickle.load(file)
+        return state
+
+    @property
+    def resumable(self) -> bool:
+        """Tell whether an import can be resumed from this checkpoint."""
+        return self.state is not None
+
+    @property
+    def last_key(self) -> Any:
+        """Return the key of the last row that has been processed before the checkpoint was saved."""
+        return self.state["last_key"] if self.state else None
+
+    def __enter__(self) -> "Checkpoint":
+        """Open the spool file, when resuming drop any entities that have been spooled after the checkpoint."""
+        if self.state:
+            self.spool = open(self.spool_file, "r+b")
+            self.spool.truncate(self.state["offset"])
+            self.spool.seek(self.state["offset"])
+        else:
+            self.spool = open(self.spool_file, "wb")
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """Close the spool file."""
+        if self.spool is not None:
+            self.spool.close()
+            self.spool = None
+
+    def write(self, entity: dict[str, Any]) -> None:
+        """Spool an entity.
+
+        :param entity:
+        :return:
+        """
+        pickle.dump(entity, self.spool, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def save(self, last_key: Any, n_rows: int, components: dict[str, Any]) -> None:
+        """Save a checkpoint.
+
+        The state of a component consists of the attributes that are listed in its checkpoint_attributes.
+
+        :param last_key: the key of the last processed row
+        :param n_rows: the number of rows that have been processed
+        :param components: the components of the import that have a state, by name
+        :return:
+        """
+        self.spool.flush()
+        os.fsync(self.spool.fileno())
+
+        self.state = {
+            "last_key": last_key,
+            "n_rows": n_rows,
+            "offset": self.spool.tell(),
+            "components": {
+                name: {attr: getattr(component, attr) for attr in getattr(component, "checkpoint_attributes", ())}
+                for name, component in components.items()
+            },
+        }
+
+        tmp_file = f"{self.state_file}.tmp"
+        with open(tmp_file, "wb") as file:
+            pickle.dump(self.state, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, self.state_file)
+
+    def restore(self, components: dict[str, Any]) -> int:
+        """Restore the state of the components.
+
+        :param components: the components of the import that have a state, by name
+        :return: the number of rows that had been processed when the checkpoint was saved
+        """
+        assert self.state is not None, "No checkpoint to restore from"
+
+        for name, state in self.state["components"].items():
+            for attr, value in state.items():
+                setattr(components[name], attr, value)
+        n_rows: int = self.state["n_rows"]
+        return n_rows
+
+    def replay(self, write: Callable[[dict[str, Any]], None]) -> None:
+        """Write all spooled entities.
+
+        :param write: the function to write an entity
+        :return:
+        """
+        self.spool.flush()
+        with open(self.spool_file, "rb") as file:
+            while True:
+                try:
+                    entity = pickle.load(file)
+                except EOFError:
+                    return
+                write(entity)
+
+    def finish(self) -> None:
+        """Mark the checkpoint as finished, all rows have been read.
+
+        A next import will not resume from a finished checkpoint. The spooled entities can still be replayed.
+        """
+        if os.path.exists(self.state_file):
+            os.remove(self.state_file)
+        self.state = None
+
+    def remove(self) -> None:
+        """Remove the checkpoint and the spool file."""
+        for filename in (self.state_file, self.spool_file):
+            if os.path.exists(filename):
+                os.remove(filename)
+        self.state = None
@@ -0,0 +1,189 @@
+"""Content hashes.
+
+Suppress the entities that have not changed since the previous import.
+
+A stable hash of every converted entity is stored in a local SQLite hash store on the shared volume,
+keyed by the source id of the entity (which includes the volgnummer for collections with states).
+An entity whose hash equals the hash of the previous import is not written to the contents file.
+The contents file then only holds the new and changed entities, the import result is marked as a delta.
+
+A full import reads all entities, the entities of the previous import that have not been read have been deleted.
+Their ids are written as a JSON array to a side file next to the contents file (<contents>.deleted),
+the deleted_ref in the header of the import result refers to this file.
+Other imports do not read all entities, their side file holds no ids.
+
+The hashes of an import are written to a separate table. When the import has succeeded the hashes are kept
+pending, keyed by the contents file, until the workflow has compared and uploaded the contents.
+The workflow confirms this by the contents_ref of the import in the confirmed_contents_ref of the header
+of a next import request. The confirmed hashes replace the previous hashes before the next import starts:
+a full import replaces all hashes, any other import updates the hashes of the entities that have been read.
+The pending hashes of earlier imports are dropped, their workflow has failed or has been superseded.
+Until an import has been confirmed, the entities are compared with the hashes of the last confirmed import.
+A delete import clears the hashes, the next import writes all entities.
+
+Suppression is enabled in the source definition of a dataset:
+
+"suppress_unchanged": true
+"""
+
+
+import hashlib
+import json
+import os
+import sqlite3
+from typing import Any, Callable
+
+from gobcore.message_broker.config import GOB_SHARED_DIR
+from gobcore.model import FIELD
+from gobcore.typesystem.json import GobTypeJSONEncoder
+
+HASH_DIR = os.path.join(GOB_SHARED_DIR, "hashes")
+
+# Size in bytes of an entity hash
+HASH_SIZE = 16
+
+
+def entity_hash(entity: dict[str, Any]) -> bytes:
+    """Return a stable hash of the entity.
+
+    The hash is independent of the order of the attributes.
+
+    :param entity: a converted entity
+    :return:
+    """
+    content = json.dumps(entity, sort_keys=True, separators=(",", ":"), cls=GobTypeJSONEncoder)
+    return hashlib.blake2b(content.encode(), digest_size=HASH_SIZE).digest()
+
+
+class HashStore:
+    """Store the entity hashes of an import and compare them with the hashes of the previous import."""
+
+    def __init__(self, name: str, full: bool) -> None:
+        """Open the hash store.
+
+        :param name: unique name for the imported dataset, e.g. catalogue.collection.application
+        :param full: True if all entities are imported, the hashes of entities that are not imported are dropped
+        """
+        self.full = full
+        self.n_unchanged = 0
+        self.n_deleted = 0
+        self.deleted_filename = ""
+
+        os.makedirs(HASH_DIR, exist_ok=True)
+        self.connection = sqlite3.connect(os.path.join(HASH_DIR, f"{name}.sqlite"))
+        with self.connection:
+            self.connection.execute("CREATE TABLE IF NOT EXISTS hashes (id TEXT PRIMARY KEY, hash BLOB)")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS pending_imports (seq INTEGER PRIMARY KEY, contents TEXT, full INTEGER)"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS pending_hashes (seq INTEGER, id TEXT, hash BLOB, PRIMARY KEY (seq, id))"
+            )
+            self.connection.execute("DROP TABLE IF EXISTS new_hashes")
+            self.connection.execute("CREATE TABLE new_hashes (id TEXT PRIMARY KEY, hash BLOB)")
+
+    def is_unchanged(self, entity: dict[str, Any]) -> bool:
+        """Tell whether the entity is equal to the entity of the previous import.
+
+        The hash of the entity is stored for the next import.
+        Entities without a source id are never considered unchanged.
+
+        :param entity: a converted entity
+        :return:
+        """
+        source_id = entity.get(FIELD.SOURCE_ID)
+        if source_id is None:
+            return False
+
+        key = str(source_id)
+        digest = entity_hash(entity)
+        self.connection.execute("INSERT OR REPLACE INTO new_hashes VALUES (?, ?)", (key, digest))
+        previous = self.connection.execute("SELECT hash FROM hashes WHERE id = ?", (key,)).fetchone()
+        return previous is not None and previous[0] == digest
+
+    def suppress_unchanged(self, write: Callable[[dict[str, Any]], None]) -> Callable[[dict[str, Any]], None]:
+        """Return a write function that only writes new and changed entities.
+
+        :param write: the function to write an entity
+        :return:
+        """
+
+        def write_changed(entity: dict[str, Any]) -> None:
+            if self.is_unchanged(entity):
+                self.n_unchanged += 1
+            else:
+                write(entity)
+
+        return write_changed
+
+    def _deleted_ids(self) -> list[str]:
+        """Return the ids of the entities of the previous import that have not been read by this import.
+
+        Only a full import reads all entities, other imports have no deleted ids.
+
+        :return:
+        """
+        if not self.full:
+            return []
+        query = "SELECT id FROM hashes WHERE id NOT IN (SELECT id FROM new_hashes)"
+        return [id for id, in self.connection.execute(query)]
+
+    def confirm(self, contents: str) -> None:
+        """Replace the hashes of the previous import by the pending hashes of the import of contents.
+
+        The workflow has compared and uploaded the contents of the import.
+        The pending hashes of earlier imports are dropped.
+
+        :param contents: the name of the contents file of the confirmed import
+        :return:
+        """
+        with self.connection:
+            query = "SELECT seq, full FROM pending_imports WHERE contents = ?"
+            if (pending := self.connection.execute(query, (contents,)).fetchone()) is None:
+                # Unknown or already confirmed
+                return
+
+            seq, full = pending
+            if full:
+                self.connection.execute("DELETE FROM hashes")
+            self.connection.execute(
+                "INSERT OR REPLACE INTO hashes SELECT id, hash FROM pending_hashes WHERE seq = ?", (seq,)
+            )
+            self.connection.execute("DELETE FROM pending_hashes WHERE seq <= ?", (seq,))
+            self.connection.execute("DELETE FROM pending_imports WHERE seq <= ?", (seq,))
+
+    def commit(self, contents: str) -> None:
+        """Keep the hashes of this import pending until the workflow confirms the import, and close the store.
+
+        The ids of the deleted entities are written to the side file of the contents file.
+
+        :param contents: the name of the contents file
+        :return:
+        """
+        deleted = self._deleted_ids()
+        self.n_deleted = len(deleted)
+        self.deleted_filename = f"{contents}.deleted"
+        with open(self.deleted_filename, "w") as file:
+            json.dump(deleted, file)
+
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO pending_imports (contents, full) VALUES (?, ?)", (contents, self.full)
+            )
+            self.connection.execute(
+                "INSERT INTO pending_hashes SELECT ?, id, hash FROM new_hashes", (cursor.lastrowid,)
+            )
+            self.connection.execute("DROP TABLE new_hashes")
+        self.connection.close()
+
+    def clear(self) -> None:
+        """Remove all hashes and close the store.
+
+        :return:
+        """
+        with self.connection:
+            self.connection.execute("DELETE FROM hashes")
+            self.connection.execute("DELETE FROM pending_hashes")
+            self.connection.execute("DELETE FROM pending_imports")
+            self.connection.execute("DROP TABLE new_hashes")
+        self.connection.close()
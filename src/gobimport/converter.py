@@ -6,9 +6,12 @@ Todo:
     The current logic is bound to CSV files (especially the pandas.isnull logic to test for null values)
 """
 
+import datetime
 import re
 from decimal import Decimal
-from typing import Any, Literal, Union, overload
+from functools import lru_cache, partial
+from operator import methodcaller
+from typing import Any, Callable, Literal, NamedTuple, Optional, Union, overload
 
 from gobcore.exceptions import GOBException, GOBTypeException
 from gobcore.logging.logger import logger
@@ -17,6 +20,9 @@ from gobcore.typesystem import get_gob_type_from_info, get_value
 
 from gobimport import gob_model
 
+# Max number of collections for which a MappinglessConverterAdapter is kept in memory
+MAPPINGLESS_CONVERTER_CACHE_SIZE = 64
+
 
 class Converter:
     """Convert data to GOB entity."""
@@ -36,6 +42,41 @@ class Converter:
         # Extract the fields that have a source mapping defined
         self.extract_fields = [field for field, meta in self.mapping.items() if "source_mapping" in meta]
 
+        # Prepare the conversion of every field once, e.g. an unknown filter raises here instead of on the first row
+        self.field_converters = {
+            field: FieldConverter(field, self.mapping[field], self.fields[field], self.entity_id, self.seqnr)
+            for field in self.extract_fields
+        }
+
+        # The source id is the value of the entity id column, followed by the seqnr for collections with states
+        # (see GOBModel.get_source_id)
+        has_states = self.gob_model.has_states(catalog_name, entity_name)
+        self.source_id_seqnr = (self.seqnr or FIELD.SEQNR) if has_states else None
+
+    def get_source_id(self, row) -> str:
+        """Return the id that uniquely identifies the row within the source.
+
+        :param row: data in external format
+        :return:
+        """
+        source_id = str(row[self.entity_id])
+        if self.source_id_seqnr:
+            return f"{source_id}.{row[self.source_id_seqnr]}"
+        return source_id
+
+    def get_columns(self) -> set[str]:
+        """Return the source columns that are read to convert a row.
+
+        :return:
+        """
+        columns = {
+            self.entity_id,
+            *(column for converter in self.field_converters.values() for column in converter.get_columns()),
+        }
+        if self.source_id_seqnr:
+            columns.add(self.source_id_seqnr)
+        return columns
+
     def convert(self, row):
         """Convert the given data using the definitions in the dataset.
 
@@ -43,20 +84,126 @@ class Converter:
         :return: entity in GOB format
         """
         # Extract source fields into entity
-        entity = {
-            field: _extract_field(row, field, self.mapping[field], self.fields[field], self.entity_id, self.seqnr)
-            for field in self.extract_fields
-        }
+        entity = {field: field_converter.convert(row) for field, field_converter in self.field_converters.items()}
 
-        # Convert GOBTypes to Python objects
+        # Convert GOBTypes to Python objects, values that have been converted by a fast path are left as is
         entity = get_value(entity)
 
         # Add explicit source id, as string, to entity
-        entity["_source_id"] = self.gob_model.get_source_id(entity=row, input_spec=self.input_spec)
+        entity["_source_id"] = self.get_source_id(row)
 
         return entity
 
 
+def _is_naive_datetime(value: Any) -> bool:
+    return type(value) is datetime.datetime and value.tzinfo is None
+
+
+# GOB type => tells if a value is converted by a fast path
+# A value that already has the Python type of the GOB type (exact type, a bool is no int) is left unchanged,
+# converting it to the GOB type and back to a Python value would return the same value
+FAST_PATHS: dict[str, Callable[[Any], bool]] = {
+    "GOB.String": lambda value: type(value) is str,
+    "GOB.Integer": lambda value: type(value) is int,
+    "GOB.Boolean": lambda value: type(value) is bool,
+    "GOB.Date": lambda value: type(value) is datetime.date,
+    "GOB.DateTime": _is_naive_datetime,
+}
+
+
+class FieldConverter:
+    """Convert the value of a field in a row to its GOB type.
+
+    The mapping of the field is prepared once: the GOB type, the filters, the source column or the parsed references.
+    """
+
+    def __init__(self, field, metadata, typeinfo, entity_id_field=None, seqnr_field=None):
+        """Initialise FieldConverter.
+
+        :param field: the name of the field
+        :param metadata: the mapping definition
+        :param typeinfo: the GOB model info
+        :param entity_id_field: the source column of the entity id, used to report conversion errors
+        :param seqnr_field: the source column of the seqnr, used to report conversion errors
+        """
+        self.field = field
+        self.metadata = metadata
+        self.typeinfo = typeinfo
+        self.entity_id_field = entity_id_field
+        self.seqnr_field = seqnr_field
+
+        self.field_type = typeinfo["type"]
+        self.field_source = metadata["source_mapping"]
+        self.is_reference = self.field_type in REFERENCE_TYPES
+        self.force_list = metadata.get("force_list", False)
+
+        self.field_filter = _compile_field_filters(metadata)
+        # The parsed mapping of a field that is mapped by a dict (references)
+        self.references = _parse_references(self.field_source) if isinstance(self.field_source, dict) else None
+        # The source column of any other field, None for a literal value
+        self.column: Optional[str] = None
+        self.literal: Optional[str] = None
+        if self.references is None:
+            self.column, self.literal = _resolve_source(self.field_source)
+
+        self.gob_type = get_gob_type_from_info(typeinfo)
+        self.kwargs = {k: v for k, v in metadata.items() if k not in ["type", "source_mapping", "filters"]}
+
+        # Values of fields with conversion arguments, e.g. a format, are always converted by the GOB type
+        self.is_fast = None if self.kwargs else FAST_PATHS.get(self.field_type)
+
+    def convert(self, row):
+        """Extract the value of the field from row and convert it.
+
+        :param row: the data row
+        :return: the GOB type value of the field, or the Python value if it has been converted by a fast path
+        """
+        value = self.extract(row)
+
+        if self.field_filter:
+            value = self.field_filter(value)
+
+        if self.is_fast and (value is None or self.is_fast(value)):
+            return value
+
+        try:
+            return self.gob_type.from_value_secure(value, self.typeinfo, **self.kwargs)
+        except GOBTypeException:
+            # The row is still in the source format.
+            report_row = _goblike_row(row, self.entity_id_field, self.seqnr_field)
+            report_row[self.field] = value
+
+            id = f"{report_row[FIELD.ID]}" + (f".{report_row[FIELD.SEQNR]}" if self.seqnr_field else "")
+            logger.error(f"Error importing object with id {id}. Can't extract value for field {self.field}")
+            return self.gob_type.from_value_secure(None, self.typeinfo, **self.kwargs)
+
+    def get_columns(self) -> list[str]:
+        """Return the source columns that the field is extracted from, literal values are not read.
+
+        :return:
+        """
+        if self.references is not None:
+            return [source.column for source in self.references if source.kind != LITERAL]
+        return [] if self.column is None else [self.column]
+
+    def extract(self, row):
+        """Extract the value of the field from row, without converting it.
+
+        :param row: the data row
+        :return:
+        """
+        # Clean all references
+        if self.references is not None:
+            return _extract_references(
+                row, self.field_source, self.field_type, self.force_list, self.references, self.is_reference
+            )
+
+        value = self.literal if self.column is None else row.get(self.column)
+        if self.is_reference and value is not None:
+            value = _clean_references(value)
+        return value
+
+
 class MappinglessConverterAdapter:
     """Adapter for the Converter.
 
@@ -93,19 +240,67 @@ class MappinglessConverterAdapter:
         """
         return self.converter.convert(row)
 
+    def convert_many(self, rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Convert a batch of rows using the definitions in the dataset.
+
+        :param rows: list of data in external format
+        :return: list of entities in GOB format
+        """
+        convert = self.converter.convert
+        return [convert(row) for row in rows]
+
+
+@lru_cache(maxsize=MAPPINGLESS_CONVERTER_CACHE_SIZE)
+def get_mappingless_converter(
+    catalogue_name: str, entity_name: str, entity_id_attr: str
+) -> MappinglessConverterAdapter:
+    """Return a MappinglessConverterAdapter for the given collection.
+
+    The adapters are cached for the lifetime of the process, the mapping and Converter
+    for a collection are constructed only once.
+
+    :param catalogue_name:
+    :param entity_name:
+    :param entity_id_attr: The name of the attribute that serves as the entity_id
+    :return:
+    """
+    return MappinglessConverterAdapter(catalogue_name, entity_name, entity_id_attr)
 
-def _apply_filters(raw_value, filters):
-    value = raw_value
-    for filter in filters:
-        name = filter[0]
-        args = filter[1:]
-        if name == "re.sub":
-            value = re.sub(args[0], args[1], value)
-        elif name == "upper":
-            value = value.upper()
-        else:
-            raise GOBException(f"Unknown function {name}")
-    return value
+
+FilterType = Callable[[Any], Any]
+
+
+def _compile_filter(filter: list[str]) -> FilterType:
+    """Compile a filter, e.g. ["re.sub", "pattern", "replacement"], into a function.
+
+    :param filter: the name of the filter followed by its arguments
+    :return: the function that applies the filter to a value
+    """
+    name = filter[0]
+    args = filter[1:]
+    if name == "re.sub":
+        return partial(re.compile(args[0]).sub, args[1])
+    if name == "upper":
+        return methodcaller("upper")
+    raise GOBException(f"Unknown function {name}")
+
+
+def _compile_filters(filters: list[list[str]]) -> FilterType:
+    """Compile a list of filters into a single function that applies the filters in order.
+
+    :param filters:
+    :return:
+    """
+    compiled = [_compile_filter(filter) for filter in filters]
+    if len(compiled) == 1:
+        return compiled[0]
+
+    def apply(value: Any) -> Any:
+        for filter in compiled:
+            value = filter(value)
+        return value
+
+    return apply
 
 
 def _is_literal(field):
@@ -159,21 +354,22 @@ def _literal_value(field):
     return field[1:]
 
 
-def _get_value(row, field):
-    """Get the value for a field in a row.
+def _resolve_source(field: str) -> tuple[Optional[str], Optional[str]]:
+    """Resolve the source of a field.
+
+    Example: '=geometrie' returns (None, 'geometrie'), 'json_column.attribute' returns ('json_column', None)
 
-    :param row: row of fields
     :param field: field name
-    :return: the value of the specified field in the specified row
+    :return: the column that holds the value of the field and the literal value of a literal field
     """
     if _is_literal(field):
         # Literal value
-        return _literal_value(field)
+        return None, _literal_value(field)
     if _is_object_reference(field):
         column, _ = _split_object_reference(field)
-        return row.get(column)
+        return column, None
     # Source value
-    return row.get(field)
+    return field, None
 
 
 def _json_safe_value(value):
@@ -191,22 +387,93 @@ FieldType = dict[Any, Any]
 FieldListType = list[FieldType]
 
 
+REFERENCE_TYPES = ("GOB.Reference", "GOB.ManyReference")
+
+# The attributes of a cleaned reference, all other attributes are moved to broninfo
+ROOT_VALUES = (FIELD.SOURCE_VALUE, FIELD.START_VALIDITY)
+
+# Kinds of reference sources
+LITERAL = "literal"  # A literal value, e.g. "=value"
+COLUMN = "column"  # The value of a source column
+SPLIT = "split"  # The value of a source column, a string value is split by a separator
+OBJECT_ATTRIBUTE = "object_attribute"  # An attribute of the objects in a (JSON) source column, e.g. "column.attr"
+
+
+class ReferenceSource(NamedTuple):
+    """The parsed source mapping of an attribute of a reference."""
+
+    attribute: str
+    kind: str
+    column: str  # the literal value for LITERAL sources
+    attr: Optional[str] = None  # the object attribute for OBJECT_ATTRIBUTE sources
+    separator: Optional[str] = None  # the separator for string values
+
+
+def _parse_references(field_source: dict[Any, Any]) -> list[ReferenceSource]:
+    """Parse the source mapping of a reference, or of any other field that is mapped by a dict.
+
+    The mapping is parsed once, extracting the references of a row does not parse the mapping again.
+
+    Example: {"bronwaarde": "col", "format": {"split": ";"}}
+    returns [ReferenceSource("bronwaarde", SPLIT, "col", None, ";")]
+
+    :param field_source: The source_mapping
+    :return:
+    """
+    FORMAT = "format"  # Optional parameter for ManyReference single string values
+    # Currently only the split format is recognized
+    separator = field_source.get(FORMAT, {}).get("split")
+
+    sources = []
+    for attribute, source_mapping in field_source.items():
+        if attribute == FORMAT:
+            # Do not process format specifications
+            continue
+        if _is_literal(source_mapping):
+            sources.append(ReferenceSource(attribute, LITERAL, _literal_value(source_mapping)))
+        elif _is_object_reference(source_mapping):
+            column, attr = _split_object_reference(source_mapping)
+            sources.append(ReferenceSource(attribute, OBJECT_ATTRIBUTE, column, attr, separator))
+        else:
+            sources.append(ReferenceSource(attribute, SPLIT if separator else COLUMN, source_mapping, None, separator))
+    return sources
+
+
+def _get_source_value(row: Any, source: ReferenceSource) -> Any:
+    return source.column if source.kind == LITERAL else row.get(source.column)
+
+
 @overload
 def _extract_references(
-    row: list[str], field_source: dict[Any, Any], field_type: str, force_list: Literal[True]
+    row: list[str],
+    field_source: dict[Any, Any],
+    field_type: str,
+    force_list: Literal[True],
+    sources: Optional[list[ReferenceSource]] = None,
+    clean: bool = False,
 ) -> FieldListType:
     ...
 
 
 @overload
 def _extract_references(
-    row: list[str], field_source: dict[Any, Any], field_type: Literal["GOB.ManyReference"]
+    row: list[str],
+    field_source: dict[Any, Any],
+    field_type: Literal["GOB.ManyReference"],
+    force_list: bool = False,
+    sources: Optional[list[ReferenceSource]] = None,
+    clean: bool = False,
 ) -> FieldListType:
     ...
 
 
-def _extract_references(  # noqa: C901
-    row: list[str], field_source: dict[Any, Any], field_type: str, force_list: bool = False
+def _extract_references(
+    row: list[str],
+    field_source: dict[Any, Any],
+    field_type: str,
+    force_list: bool = False,
+    sources: Optional[list[ReferenceSource]] = None,
+    clean: bool = False,
 ) -> Union[FieldType, FieldListType]:
     """Create the dictionary as defined in field_source.
 
@@ -216,65 +483,119 @@ def _extract_references(  # noqa: C901
     :param field_source: The source_mapping
     :param field_type: The field_type as string (GOB.xxxx)
     :param force_list: Force return of list of dicts, even if not a GOB.ManyReference
+    :param sources: The parsed source mapping, if None field_source is parsed
+    :param clean: Return cleaned references (bronwaarde and broninfo), see _clean_references
     :return:
     """
-    FORMAT = "format"  # Optional parameter for ManyReference single string values
-    value: Union[FieldType, FieldListType]
+    if sources is None:
+        sources = _parse_references(field_source)
+    # Cleaned references are built in one pass, every attribute is set directly in the root or in broninfo
+    new, set_value = (_new_reference, _set_reference_value) if clean else (_new_value, _set_value)
     if field_type == "GOB.ManyReference" or force_list:
-        value = []
-        # For each attribute in the source mapping, loop through all values and add them to the correct dict
-        for attribute, source_mapping in field_source.items():
-            if attribute in [FORMAT]:
-                # Do not process format specifications
-                continue
-            source_value = _get_value(row, source_mapping)
-            if _is_literal(source_mapping):
-                value.append({attribute: source_value})
-            elif _is_object_reference(source_mapping) and source_value:
-                column, attr = _split_object_reference(source_mapping)
-
-                for idx, v in enumerate(source_value):
-                    if not isinstance(v, dict):
-                        raise GOBException("References should be dicts when referencing by attribute")
-                    # Merge referenced value with existing values
-                    try:
-                        value[idx].update({attribute: v[attr]})
-                    except IndexError:
-                        value.append({attribute: v[attr], **v})
-            elif isinstance(source_value, str):
-                # Accept a single string as Many Reference
-                # If a format has been specified then apply the format
-                # Currently only the split format is recognized
-                format = field_source.get(FORMAT, {}).get("split")
-                source_values = source_value.split(format) if format else [source_value]
-                for v in sorted(list(set(source_values))):
-                    # unique values
-                    value.append({attribute: v})
-            elif source_value:
-                for idx, v in enumerate(source_value):
-                    # Try to update the dictionary with the attribute and value or create a new dict
-                    try:
-                        value[idx].update({attribute: v})
-                    except IndexError:
-                        value.append({attribute: v})
+        return _extract_many_references(row, sources, new, set_value)
+    return _extract_reference(row, sources, new, set_value)
+
+
+def _new_value(attribute: str, value: Any) -> FieldType:
+    return {attribute: value}
+
+
+def _set_value(reference: FieldType, attribute: str, value: Any) -> None:
+    reference[attribute] = value
+
+
+def _new_reference(attribute: str, value: Any) -> FieldType:
+    """Return a new cleaned reference with attribute set to value."""
+    return {attribute: value} if attribute in ROOT_VALUES else {FIELD.SOURCE_INFO: {attribute: value}}
+
+
+def _set_reference_value(reference: FieldType, attribute: str, value: Any) -> None:
+    """Set attribute of a cleaned reference, any attribute that is not a root value is set in broninfo."""
+    if attribute in ROOT_VALUES:
+        reference[attribute] = value
+    elif FIELD.SOURCE_INFO in reference:
+        reference[FIELD.SOURCE_INFO][attribute] = value
     else:
-        value = {}
+        reference[FIELD.SOURCE_INFO] = {attribute: value}
 
-        for attribute, source_mapping in field_source.items():
-            source_value = _json_safe_value(_get_value(row, source_mapping))
 
-            if _is_object_reference(source_mapping) and source_value:
-                if not value:
-                    value = {**source_value}
+SetValueType = Callable[[FieldType, str, Any], None]
+NewValueType = Callable[[str, Any], FieldType]
 
-                column, attr = _split_object_reference(source_mapping)
 
-                if not isinstance(source_value, dict):
+def _extract_many_references(  # noqa: C901
+    row: Any, sources: list[ReferenceSource], new: NewValueType, set_value: SetValueType
+) -> FieldListType:
+    """Create the list of dictionaries as defined by the parsed source mapping.
+
+    :param row:
+    :param sources: The parsed source mapping
+    :param new: Returns a new dictionary for an attribute and value
+    :param set_value: Sets an attribute of a dictionary to a value
+    :return:
+    """
+    value: FieldListType = []
+    # For each attribute in the source mapping, loop through all values and add them to the correct dict
+    for attribute, kind, column, attr, separator in sources:
+        if kind == LITERAL:
+            value.append(new(attribute, column))
+            continue
+
+        source_value = row.get(column)
+        if kind == OBJECT_ATTRIBUTE and source_value:
+            for idx, v in enumerate(source_value):
+                if not isinstance(v, dict):
                     raise GOBException("References should be dicts when referencing by attribute")
+                # Merge referenced value with existing values
+                if idx < len(value):
+                    set_value(value[idx], attribute, v[attr])
+                else:
+                    value.append(new(attribute, v[attr]))
+                    for key, item in v.items():
+                        set_value(value[idx], key, item)
+        elif isinstance(source_value, str):
+            # Accept a single string as Many Reference
+            # If a format has been specified then apply the format
+            source_values = source_value.split(separator) if separator else [source_value]
+            # unique values
+            value.extend(new(attribute, v) for v in sorted(set(source_values)))
+        elif source_value:
+            for idx, v in enumerate(source_value):
+                # Update the dictionary with the attribute and value or create a new dict
+                if idx < len(value):
+                    set_value(value[idx], attribute, v)
+                else:
+                    value.append(new(attribute, v))
+    return value
+
+
+def _extract_reference(
+    row: Any, sources: list[ReferenceSource], new: NewValueType, set_value: SetValueType
+) -> FieldType:
+    """Create the dictionary as defined by the parsed source mapping.
+
+    :param row:
+    :param sources: The parsed source mapping
+    :param new: Returns a new dictionary for an attribute and value
+    :param set_value: Sets an attribute of a dictionary to a value
+    :return:
+    """
+    value: FieldType = {}
+
+    for source in sources:
+        source_value = _json_safe_value(_get_source_value(row, source))
+
+        if source.kind == OBJECT_ATTRIBUTE and source_value:
+            if not isinstance(source_value, dict):
+                raise GOBException("References should be dicts when referencing by attribute")
 
-                value[attribute] = source_value[attr]
-            else:
-                value[attribute] = source_value
+            if not value:
+                for key, item in source_value.items():
+                    set_value(value, key, item)
+
+            set_value(value, source.attribute, source_value[source.attr])
+        else:
+            set_value(value, source.attribute, source_value)
 
     return value
 
@@ -300,54 +621,12 @@ def _extract_source_info(value):
     :param value: The reference
     :return: the cleaned reference
     """
-    root_values = [FIELD.SOURCE_VALUE, FIELD.START_VALIDITY]
-
-    # Move all attributes to source info if it's not one of the root_values
-    source_value = {field: value[field] for field in root_values if field in value}
-    source_info = {k: v for k, v in value.items() if k not in root_values}
-
-    # Only add broninfo if there are additional fields
-    if len(source_info.keys()) == 0:
-        return {**source_value}
-    return {**source_value, FIELD.SOURCE_INFO: source_info}
-
-
-def _extract_field(row, field, metadata, typeinfo, entity_id_field=None, seqnr_field=None):
-    """Extract a field from a row given the corresponding metadata.
-
-    :param row: the data row
-    :param metadata: the mapping definition
-    :param typeinfo: the GOB model info
-    :return: the string value of a field specified by the field's metadata, based on the values in row
-    """
-    field_type = typeinfo["type"]
-    field_source = metadata["source_mapping"]
-
-    gob_type = get_gob_type_from_info(typeinfo)
-
-    kwargs = {k: v for k, v in metadata.items() if k not in ["type", "source_mapping", "filters"]}
-
-    if isinstance(field_source, dict):
-        value = _extract_references(row, field_source, field_type, metadata.get("force_list", False))
-    else:
-        value = _get_value(row, field_source)
-
-    # Clean all references
-    if field_type in ("GOB.Reference", "GOB.ManyReference") and value is not None:
-        value = _clean_references(value)
-
-    value = _apply_field_filters(metadata, value)
-
-    try:
-        return gob_type.from_value_secure(value, typeinfo, **kwargs)
-    except GOBTypeException:
-        # The row is still in the source format.
-        report_row = _goblike_row(row, entity_id_field, seqnr_field)
-        report_row[field] = value
-
-        id = f"{report_row[FIELD.ID]}" + (f".{report_row[FIELD.SEQNR]}" if seqnr_field else "")
-        logger.error(f"Error importing object with id {id}. Can't extract value for field {field}")
-        return gob_type.from_value_secure(None, typeinfo, **kwargs)
+    # Move all attributes to source info if it's not one of the root values
+    # Broninfo is only added if there are additional fields
+    cleaned_value: FieldType = {}
+    for field, field_value in value.items():
+        _set_reference_value(cleaned_value, field, field_value)
+    return cleaned_value
 
 
 def _goblike_row(row, entity_id_field, seqnr_field=None):
@@ -368,13 +647,25 @@ def _goblike_row(row, entity_id_field, seqnr_field=None):
     return gobrow
 
 
-def _apply_field_filters(metadata, value):
-    if "filters" in metadata:
-        # If we are dealing with a dict, apply filters to the correct attribute
-        if isinstance(metadata["filters"], dict):
-            for attribute, filters in metadata["filters"].items():
-                value[attribute] = _apply_filters(value[attribute], filters)
-        else:
-            # Apply any filters to the raw value
-            value = _apply_filters(value, metadata["filters"])
-    return value
+def _compile_field_filters(metadata) -> Optional[FilterType]:
+    """Compile the filters of a field into a single function, None if the field has no filters.
+
+    :param metadata: the mapping definition
+    :return:
+    """
+    if "filters" not in metadata:
+        return None
+
+    if not isinstance(metadata["filters"], dict):
+        # Apply any filters to the raw value
+        return _compile_filters(metadata["filters"])
+
+    # If we are dealing with a dict, apply filters to the correct attribute
+    compiled = {attribute: _compile_filters(filters) for attribute, filters in metadata["filters"].items()}
+
+    def apply(value: Any) -> Any:
+        for attribute, filter in compiled.items():
+            value[attribute] = filter(value[attribute])
+        return value
+
+    return apply
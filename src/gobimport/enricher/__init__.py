@@ -1,15 +1,31 @@
 """Enricher.
 
 This enricher calls some specific functions for collections to add missing values in the source.
+
+The catalogue specific enrichers are imported on first use,
+an import only loads the enricher (and its dependencies) for the catalogue that is imported.
 """
 
 
+import sys
+from importlib import import_module
 from typing import Any
 
-from gobimport.enricher.bag import BAGEnricher
-from gobimport.enricher.gebieden import GebiedenEnricher
-from gobimport.enricher.meetbouten import MeetboutenEnricher
-from gobimport.enricher.test_catalogue import TstCatalogueEnricher
+# Catalogue name => (module, enricher class name)
+CATALOGUE_ENRICHERS = {
+    "gebieden": ("gobimport.enricher.gebieden", "GebiedenEnricher"),
+    "meetbouten": ("gobimport.enricher.meetbouten", "MeetboutenEnricher"),
+    "bag": ("gobimport.enricher.bag", "BAGEnricher"),
+    "test_catalogue": ("gobimport.enricher.test_catalogue", "TstCatalogueEnricher"),
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Import the catalogue enricher classes on first access."""
+    for module, class_name in CATALOGUE_ENRICHERS.values():
+        if name == class_name:
+            return getattr(import_module(module), class_name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class BaseEnricher:
@@ -22,9 +38,10 @@ class BaseEnricher:
         :param entity_name:
         """
         self.enrichers = []
-        for CatalogueEnricher in [GebiedenEnricher, MeetboutenEnricher, BAGEnricher, TstCatalogueEnricher]:
+        if catalogue_enricher := CATALOGUE_ENRICHERS.get(catalog_name):
+            CatalogueEnricher = getattr(sys.modules[__name__], catalogue_enricher[1])
             if CatalogueEnricher.enriches(app_name, catalog_name, entity_name):
-                self.enrichers.append(CatalogueEnricher(app_name, catalog_name, entity_name))  # type: ignore[abstract]
+                self.enrichers.append(CatalogueEnricher(app_name, catalog_name, entity_name))
 
     def enrich(self, entity: dict[str, Any]) -> None:
         """Enrich the entity for all applicable enrichments.
@@ -34,3 +51,23 @@ class BaseEnricher:
         """
         for enricher in self.enrichers:
             enricher.enrich(entity)
+
+    def depends_on_order(self) -> bool:
+        """Tell whether any of the enrichments depends on the order of the rows.
+
+        :return:
+        """
+        return any(enricher.depends_on_order() for enricher in self.enrichers)
+
+    def get_columns(self) -> tuple[set[str], set[str]]:
+        """Return the source columns that the enrichers read and the columns that they add to a row.
+
+        :return: read columns, added columns
+        """
+        read_columns: set[str] = set()
+        added_columns: set[str] = set()
+        for enricher in self.enrichers:
+            read, added = enricher.get_columns()
+            read_columns |= read
+            added_columns |= added
+        return read_columns, added_columns
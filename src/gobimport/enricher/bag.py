@@ -4,9 +4,10 @@
 from typing import Any
 
 from gobcore.logging.logger import logger
-from gobcore.quality.issue import QA_CHECK, QA_LEVEL, Issue, log_issue
+from gobcore.quality.issue import QA_CHECK, QA_LEVEL
 
 from gobimport.enricher.enricher import Enricher
+from gobimport.issues import Issue, log_issue
 
 CODE_TABLE_FIELDS = ["code", "omschrijving"]
 
@@ -36,6 +37,16 @@ FINANCIERINGSCODE_MAPPING = {
 class BAGEnricher(Enricher):
     """BAG Enricher."""
 
+    checkpoint_attributes = ("multiple_values_logged",)
+
+    read_columns = {
+        "nummeraanduidingen": ("ligt_in_bag_woonplaats",),
+        "verblijfsobjecten": ("fng_code", "pandidentificatie"),
+    }
+    added_columns = {
+        "verblijfsobjecten": ("fng_omschrijving",),
+    }
+
     @classmethod
     def enriches(cls, app_name: str, catalog_name: str, entity_name: str) -> bool:
         """Enrich BAG collections."""
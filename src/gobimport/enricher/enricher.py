@@ -4,10 +4,21 @@
 from abc import ABC, abstractmethod
 from typing import Any, Callable
 
+from gobcore.exceptions import GOBException
+
 
 class Enricher(ABC):
     """Abstract base class for any enrichment class."""
 
+    # The source columns that the enricher reads and the columns that it adds to a row, by collection
+    # An import that projects the source query reads the columns that are read, not the columns that are added
+    read_columns: dict[str, tuple[str, ...]] = {}
+    added_columns: dict[str, tuple[str, ...]] = {}
+
+    # The collections of which the enrichment of a row depends on the rows that have been enriched before
+    # These collections can not be read in another order than the order of the source query, e.g. by a checkpoint
+    order_dependent: tuple[str, ...] = ()
+
     @classmethod
     @abstractmethod
     def enriches(cls, app_name: str, catalog_name: str, entity_name: str) -> bool:
@@ -42,3 +53,19 @@ class Enricher(ABC):
         """
         if self._enrich_entity:
             self._enrich_entity(entity)
+
+    def depends_on_order(self) -> bool:
+        """Tell whether the enrichment depends on the order of the rows.
+
+        :return:
+        """
+        return self.entity_name in self.order_dependent
+
+    def get_columns(self) -> tuple[set[str], set[str]]:
+        """Return the source columns that the enricher reads and the columns that it adds to a row.
+
+        :return: read columns, added columns
+        """
+        if self._enrich_entity and self.entity_name not in self.read_columns:
+            raise GOBException(f"The columns that are enriched for {self.entity_name} are unknown")
+        return set(self.read_columns.get(self.entity_name, ())), set(self.added_columns.get(self.entity_name, ()))
@@ -16,6 +16,19 @@ CBS_CODES_WIJK = "gebieden/Wijken/CBScodes_wijk.xlsx"
 class GebiedenEnricher(Enricher):
     """Gebieden Enricher."""
 
+    read_columns = {
+        "buurten": ("code",),
+        "wijken": ("code",),
+        "ggwgebieden": ("BUURTEN", "_file_info", "GGW_DOCUMENTDATUM"),
+        "ggpgebieden": ("BUURTEN", "_file_info", "GGP_DOCUMENTDATUM"),
+    }
+    added_columns = {
+        "buurten": ("cbs_code",),
+        "wijken": ("cbs_code",),
+        "ggwgebieden": ("_IDENTIFICATIE", "registratiedatum"),
+        "ggpgebieden": ("_IDENTIFICATIE", "registratiedatum"),
+    }
+
     @classmethod
     def enriches(cls, app_name: str, catalog_name: str, entity_name: str) -> bool:
         """Enrich Gebieden collections."""
@@ -11,6 +11,25 @@ from gobimport.enricher.enricher import Enricher
 class MeetboutenEnricher(Enricher):
     """Meetbouten Enricher."""
 
+    checkpoint_attributes = ("meetbouten",)
+
+    # The metingen of a meetbout are enriched in the order of the source, by date
+    order_dependent = ("metingen",)
+
+    read_columns = {
+        "metingen": ("hoort_bij_meetbout", "datum", "hoogte_tov_nap"),
+    }
+    added_columns = {
+        "metingen": (
+            "type_meting",
+            "hoeveelste_meting",
+            "aantal_dagen",
+            "zakking",
+            "zakking_cumulatief",
+            "zakkingssnelheid",
+        ),
+    }
+
     @classmethod
     def enriches(cls, app_name: str, catalog_name: str, entity_name: str) -> bool:
         """Enrich Meetbouten collections."""
@@ -5,10 +5,17 @@ from typing import Any
 
 from gobimport.enricher.enricher import Enricher
 
+MANYREF_COLUMNS = ("manyref_to_c", "manyref_to_d", "manyref_to_c_begin_geldigheid", "manyref_to_d_begin_geldigheid")
+
 
 class TstCatalogueEnricher(Enricher):
     """Test Catalog Enricher."""
 
+    read_columns = {
+        "rel_test_entity_a": MANYREF_COLUMNS,
+        "rel_test_entity_b": MANYREF_COLUMNS,
+    }
+
     @classmethod
     def enriches(cls, app_name: str, catalog_name: str, entity_name: str) -> bool:
         """Enrich test_catalogue collections."""
@@ -31,9 +38,7 @@ class TstCatalogueEnricher(Enricher):
 
     def enrich_rel_entity(self, entity: dict[str, Any]) -> None:
         """Enrich test_catalogue relations."""
-        keys = ["manyref_to_c", "manyref_to_d", "manyref_to_c_begin_geldigheid", "manyref_to_d_begin_geldigheid"]
-
-        for key in keys:
+        for key in MANYREF_COLUMNS:
             try:
                 entity[key] = [i for i in entity[key].split(";") if i]
             except (KeyError, AttributeError):
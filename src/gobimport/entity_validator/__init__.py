@@ -3,15 +3,33 @@
 Validation will take place after the imported data has been converted into the GOBModel.
 This is done to be able to perform comparisons between dates in the imported data or
 run specific validation for certain collections.
+
+The catalogue specific validators are imported on first use.
 """
 
 
+import sys
+from importlib import import_module
+from typing import Any
+
 from gobcore.exceptions import GOBException
 
-from gobimport.entity_validator.bag import BAGValidator
-from gobimport.entity_validator.gebieden import GebiedenValidator
 from gobimport.entity_validator.state import StateValidator
 
+# Catalogue name => (module, validator class name)
+CATALOGUE_VALIDATORS = {
+    "gebieden": ("gobimport.entity_validator.gebieden", "GebiedenValidator"),
+    "bag": ("gobimport.entity_validator.bag", "BAGValidator"),
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Import the catalogue validator classes on first access."""
+    for module, class_name in CATALOGUE_VALIDATORS.values():
+        if name == class_name:
+            return getattr(import_module(module), class_name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 class EntityValidator:
     """Entity Validator."""
@@ -26,9 +44,13 @@ class EntityValidator:
         self.catalog_name = catalog_name
         self.entity_name = entity_name
 
+        validators = [StateValidator]
+        if catalogue_validator := CATALOGUE_VALIDATORS.get(catalog_name):
+            validators.append(getattr(sys.modules[__name__], catalogue_validator[1]))
+
         self.validators = []
-        for Validator in [StateValidator, GebiedenValidator, BAGValidator]:
-            if Validator.validates(catalog_name, entity_name):  # type: ignore[attr-defined]
+        for Validator in validators:
+            if Validator.validates(catalog_name, entity_name):
                 self.validators.append(Validator(catalog_name, entity_name, source_id))
 
     def validate(self, entity, **kwargs):
@@ -8,7 +8,9 @@ from functools import reduce
 from typing import Any
 
 from gobcore.logging.logger import logger
-from gobcore.quality.issue import QA_CHECK, QA_LEVEL, Issue, log_issue
+from gobcore.quality.issue import QA_CHECK, QA_LEVEL
+
+from gobimport.issues import Issue, log_issue
 
 VALID_GEBRUIKSDOEL_DOMAIN = [
     "woonfunctie",
@@ -28,6 +30,8 @@ VALID_GEBRUIKSDOEL_DOMAIN = [
 class BAGValidator:
     """BAG Validator."""
 
+    checkpoint_attributes = ("validated",)
+
     @classmethod
     def validates(cls, catalog_name, entity_name):
         """Tell wether this class validates the given catalog entity.
@@ -8,12 +8,16 @@ import datetime
 
 from gobcore.logging.logger import logger
 from gobcore.model import FIELD
-from gobcore.quality.issue import QA_CHECK, QA_LEVEL, Issue, log_issue
+from gobcore.quality.issue import QA_CHECK, QA_LEVEL
+
+from gobimport.issues import Issue, log_issue
 
 
 class GebiedenValidator:
     """Gebieden Validator."""
 
+    checkpoint_attributes = ("validated",)
+
     @classmethod
     def validates(cls, catalog_name, entity_name):
         """Tell wether this class validates the given catalog entity.
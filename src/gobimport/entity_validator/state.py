@@ -2,14 +2,17 @@ from collections import defaultdict
 
 from gobcore.logging.logger import logger
 from gobcore.model import FIELD
-from gobcore.quality.issue import QA_CHECK, QA_LEVEL, Issue, log_issue
+from gobcore.quality.issue import QA_CHECK, QA_LEVEL
 
 from gobimport import gob_model
+from gobimport.issues import Issue, log_issue
 
 
 class StateValidator:
     """State Validator."""
 
+    checkpoint_attributes = ("validated", "volgnummers", "end_date")
+
     @classmethod
     def validates(cls, catalog_name, entity_name):
         """Tell wether this class validates the given catalog entity.
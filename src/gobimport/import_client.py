@@ -14,21 +14,29 @@ Todo: improve type conversion
 
 import datetime
 import traceback
+from contextlib import AbstractContextManager, closing, nullcontext
 from types import TracebackType
-from typing import Any, Optional, Type
+from typing import Any, Callable, Optional, Type
 
 from gobcore.enum import ImportMode
+from gobcore.exceptions import GOBException
 from gobcore.logging.logger import logger
-from gobcore.message_broker.offline_contents import ContentsWriter
 from gobcore.utils import ProgressTicker
 
+from gobimport.checkpoint import Checkpoint
+from gobimport.content_hash import HashStore
 from gobimport.converter import Converter
 from gobimport.enricher import BaseEnricher
 from gobimport.entity_validator import EntityValidator
 from gobimport.injections import Injector
+from gobimport.issues import issue_aggregator
 from gobimport.merger import Merger
+from gobimport.profiling import MemoryProfiler, cpu_profile, get_memory_profiler
+from gobimport.quarantine import Quarantine
 from gobimport.reader import Reader
+from gobimport.serializer import ContentsWriter
 from gobimport.validator import Validator
+from gobimport.watermark import Watermark
 
 DatasetMappingType = dict[str, Any]
 
@@ -49,6 +57,10 @@ class ImportClient:
 
     n_rows = 0
     raise_exception: bool = False
+    watermark: Optional[Watermark] = None
+    hash_store: Optional[HashStore] = None
+    memory_profiler: Optional[MemoryProfiler] = None
+    quarantine: Optional[Quarantine] = None
 
     def __init__(
         self, dataset: DatasetMappingType, msg: dict[str, Any], logger: logger, mode: ImportMode = ImportMode.FULL
@@ -62,6 +74,9 @@ class ImportClient:
         self.entity_validator = EntityValidator(self.catalogue, self.entity, self.func_source_id)
         self.merger = Merger(self)
 
+        # Issues are counted per import
+        issue_aggregator.reset()
+
         self.header = msg.get("header", {})
         self.logger.info(f"Import dataset {self.entity} from {self.source_app} (mode = {self.mode.name}) started")
 
@@ -142,7 +157,26 @@ class ImportClient:
             "timestamp": datetime.datetime.utcnow().isoformat(),
         }
 
-        summary = {"num_records": self.n_rows}
+        summary: dict[str, Any] = {"num_records": self.n_rows}
+
+        if self.hash_store:
+            # Unchanged entities have not been written, the contents only hold the new and changed entities
+            # The ids of the deleted entities are written to a side file
+            header["delta"] = True
+            header["deleted_ref"] = self.hash_store.deleted_filename
+            summary["num_unchanged"] = self.hash_store.n_unchanged
+            summary["num_deleted"] = self.hash_store.n_deleted
+
+        if self.memory_profiler:
+            summary["memory_profile"] = self.memory_profiler.summary
+
+        if self.quarantine:
+            summary["num_quarantined"] = self.quarantine.n_errors
+
+        if issue_aggregator.counts:
+            # Only a sample of the issues has been logged, the summary holds the exact counts
+            issue_aggregator.log_summary(self.logger)
+            summary["issues"] = issue_aggregator.summary()
 
         log_msg = f"Import dataset {self.entity} from {self.source_app} completed. "
 
@@ -164,34 +198,165 @@ class ImportClient:
 
         return import_message
 
-    def import_rows(self, write, progress: ProgressTicker) -> None:
-        """Import rows from source application."""
-        self.logger.info(f"Connect to {self.source_app}")
+    def _get_checkpoint(self) -> Optional[Checkpoint]:
+        """Return the checkpoint for this import, None if checkpoints are not enabled for the dataset.
 
-        with Reader(self.source, self.source_app, self.dataset, self.mode) as reader:
-            reader.connect()
+        A checkpoint reads the rows ordered by its key, this requires a source query.
+        An import without a source query or that depends on the order of the rows is refused.
+        """
+        if spec := self.source.get("checkpoint"):
+            if not self.source.get("query"):
+                raise GOBException(
+                    f"Checkpoints are not supported for {self.catalogue} {self.entity}, "
+                    "the source has no query to order the rows by"
+                )
+            if self.enricher.depends_on_order():
+                raise GOBException(
+                    f"Checkpoints are not supported for {self.catalogue} {self.entity}, "
+                    "the enrichment depends on the order of the rows"
+                )
+            return Checkpoint(f"{self.catalogue}.{self.entity}.{self.source_app}.{self.mode.value}", spec)
+        return None
+
+    def _get_watermark(self) -> Optional[Watermark]:
+        """Return the watermark for this import, None if watermarks are not enabled for the dataset."""
+        if spec := self.source.get("watermark"):
+            return Watermark(f"{self.catalogue}.{self.entity}.{self.source_app}", spec)
+        return None
+
+    def _get_hash_store(self) -> Optional[HashStore]:
+        """Return the hash store for this import, None if unchanged entities are not suppressed for the dataset.
+
+        The hashes of the import that the workflow has confirmed in the header of the request are applied first.
+        """
+        if self.source.get("suppress_unchanged"):
+            hash_store = HashStore(
+                f"{self.catalogue}.{self.entity}.{self.source_app}", full=self.mode == ImportMode.FULL
+            )
+            if confirmed := self.header.get("confirmed_contents_ref"):
+                hash_store.confirm(confirmed)
+            return hash_store
+        return None
+
+    def _clear_hash_store(self) -> None:
+        """Clear the hash store for a delete import, all entities are deleted and are new in the next import.
+
+        The hash store is not used to suppress entities, the empty contents of a delete import are not a delta.
+        """
+        if hash_store := self._get_hash_store():
+            hash_store.clear()
 
-            self.logger.info(f"Start import from {self.source_app}")
-            self.n_rows = 0
-            for row in reader.read():
-                progress.tick()
+    def _get_quarantine(self, filename: str) -> Optional[Quarantine]:
+        """Return the quarantine for this import, None if failing rows abort the import.
 
-                self.row = row
-                self.n_rows += 1
+        The quarantine file is written next to the contents file.
+        """
+        if (spec := self.source.get("quarantine")) is not None:
+            return Quarantine(f"{filename}.quarantine", spec)
+        return None
 
-                self.injector.inject(row)
+    def _get_projection(self, checkpoint: Optional[Checkpoint] = None) -> Optional[list[str]]:
+        """Return the source columns that the import reads, None if all columns are read.
 
-                self.enricher.enrich(row)
+        The source query is projected on the columns that are used by the mapping, the injection, the merge,
+        the enrichers, the checkpoint and the watermark. Projection is enabled in the source definition:
 
-                self.merger.merge(row, write)
+        "projection": {
+            "exclude": [<optional columns that are mapped but that are not in the source>]
+        }
 
-                entity = self.converter.convert(row)
+        The columns that the enrichers add to a row are excluded automatically.
+        """
+        if (spec := self.source.get("projection")) is None:
+            return None
+
+        read, added = self.enricher.get_columns()
+        columns = ({*self.converter.get_columns(), *self.injector.get_columns()} - added) | read
+        if self.merger.merge_def:
+            columns.add(self.merger.merge_def["on"])
+        if checkpoint:
+            columns.add(checkpoint.key)
+        if self.watermark:
+            columns.add(self.watermark.column)
+        return sorted(columns - set(spec.get("exclude", [])))
+
+    def _get_checkpoint_components(self) -> dict[str, Any]:
+        """Return the components that have a state that is saved in a checkpoint, by name."""
+        return {
+            "validator": self.validator,
+            "merger": self.merger,
+            "issues": issue_aggregator,
+            **({"watermark": self.watermark} if self.watermark else {}),
+            **({"quarantine": self.quarantine} if self.quarantine else {}),
+            **{f"entity_validator.{n}": validator for n, validator in enumerate(self.entity_validator.validators)},
+            **{f"enricher.{n}": enricher for n, enricher in enumerate(self.enricher.enrichers)},
+        }
 
-                self.validator.validate(entity)
+    def _get_accumulators(self) -> dict[str, Any]:
+        """Return the data structures that grow during an import, by name."""
+        return {
+            **{
+                f"{name}.{attr}": getattr(component, attr)
+                for name, component in self._get_checkpoint_components().items()
+                for attr in getattr(component, "checkpoint_attributes", ())
+            },
+            "merger.merge_items": self.merger.merge_items,
+            "injector.injections": getattr(self.injector, "injections", None),
+        }
+
+    def _profile_memory(self, progress: ProgressTicker) -> AbstractContextManager[Any]:
+        """Return a context that profiles the memory usage of the import when memory profiling is enabled.
 
-                self.entity_validator.validate(entity, merged=self.merger.is_merged(entity))
+        The context returns the progress ticker to use for the import.
+        """
+        self.memory_profiler = get_memory_profiler(progress, self._get_accumulators, self.logger, self.header)
+        return self.memory_profiler or nullcontext(progress)
 
-                write(entity)
+    def _profile_cpu(self, filename: str) -> AbstractContextManager[Any]:
+        """Return a context that profiles the import when profiling is requested in the message header.
+
+        The profile is written next to the contents file.
+        """
+        if self.header.get("profile"):
+            return cpu_profile(f"{filename}.prof", self.logger)
+        return nullcontext()
+
+    def import_rows(self, write, progress: ProgressTicker, checkpoint: Optional[Checkpoint] = None) -> None:
+        """Import rows from source application.
+
+        If a checkpoint is given the rows are read ordered by the checkpoint key
+        and the state of the import is saved every checkpoint interval.
+        A resumable checkpoint continues the import after the last saved key.
+
+        If the import has a quarantine a row that fails is quarantined and the import continues.
+        """
+        self.logger.info(f"Connect to {self.source_app}")
+
+        with Reader(self.source, self.source_app, self.dataset, self.mode) as reader, closing(self.injector):
+            reader.connect()
+
+            if checkpoint and checkpoint.resumable:
+                self.n_rows = checkpoint.restore(self._get_checkpoint_components())
+                self.logger.info(f"Resume import from {self.source_app} after {self.n_rows} records")
+            else:
+                self.logger.info(f"Start import from {self.source_app}")
+                self.n_rows = 0
+
+            order_by = checkpoint.key if checkpoint else None
+            after = checkpoint.last_key if checkpoint else None
+            watermark = self.watermark.value if self.watermark else None
+            columns = self._get_projection(checkpoint)
+            guard = self.quarantine.guard if self.quarantine else nullcontext
+            for row in reader.read(order_by, after, watermark, columns):
+                progress.tick()
+
+                self.row = row
+                self.n_rows += 1
+
+                self._import_row(row, write, guard)
+
+                if checkpoint and self.n_rows % checkpoint.interval == 0:
+                    checkpoint.save(row[checkpoint.key], self.n_rows, self._get_checkpoint_components())
 
         self.validator.result()
 
@@ -202,18 +367,89 @@ class ImportClient:
             # Default requirement for full imports is a non-empty dataset
             self.logger.error(f"Too few records imported: {self.n_rows} < {min_rows}")
 
+    def _import_row(self, row: dict[str, Any], write, guard: Callable[[Any], AbstractContextManager[Any]]) -> None:
+        """Import a row from the source application.
+
+        A row that fails to be injected, enriched or converted is quarantined by the guard.
+        A row is merged before it is converted, the merge writes the entities that precede the row.
+        When a merged row fails to be converted, the entity that it has been merged with is written in its place.
+        A failing merge is not quarantined.
+        The watermark is only updated by rows that have been imported.
+        """
+        enriched = False
+        with guard(row):
+            self.injector.inject(row)
+
+            self.enricher.enrich(row)
+
+            enriched = True
+
+        if not enriched:
+            # The row has been quarantined
+            return
+
+        self.merger.merge(row, write)
+
+        entity = None
+        with guard(row):
+            entity = self.converter.convert(row)
+
+        if entity is None:
+            # The row has been quarantined, write the entity that it has been merged with in its place
+            self.merger.release(row, write)
+            return
+
+        self.validator.validate(entity)
+
+        self.entity_validator.validate(entity, merged=self.merger.is_merged(entity))
+
+        write(entity)
+
+        if self.watermark:
+            self.watermark.update(row)
+
     def import_dataset(self, destination: Optional[str] = None) -> None:
         """Import dataset into the destination."""
         with (
             ContentsWriter(destination) as writer,
             ProgressTicker(f"Import {self.catalogue} {self.entity}", 10000) as progress,
+            self._profile_memory(progress) as progress,
+            self._profile_cpu(writer.filename),
         ):
             self.filename = writer.filename
 
             # DELETE: Skip import rows -> write empty file
             # mark all entities as deleted
             if self.mode != ImportMode.DELETE:
+                self.hash_store = self._get_hash_store()
+                write = self.hash_store.suppress_unchanged(writer.write) if self.hash_store else writer.write
+
                 self.merger.prepare(progress)
-                self.import_rows(writer.write, progress)
-                self.merger.finish(writer.write)
+                self.watermark = self._get_watermark()
+                self.quarantine = self._get_quarantine(writer.filename)
+                if checkpoint := self._get_checkpoint():
+                    # Spool the entities, only write them to the contents file when all rows have been read
+                    with checkpoint:
+                        self.import_rows(checkpoint.write, progress, checkpoint)
+                        # All rows have been read, do not resume from this checkpoint
+                        checkpoint.finish()
+                        checkpoint.replay(write)
+                    checkpoint.remove()
+                else:
+                    self.import_rows(write, progress)
+
+                if self.quarantine:
+                    # Fail the import if the error budget has been exceeded
+                    self.quarantine.result(self.logger)
+
+                self.merger.finish(write)
                 self.entity_validator.result()
+
+                if self.watermark:
+                    # Only rows after the watermark are read in the next import
+                    self.watermark.save()
+
+                if self.hash_store:
+                    self.hash_store.commit(writer.filename)
+            else:
+                self._clear_hash_store()
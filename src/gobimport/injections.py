@@ -5,11 +5,33 @@ Conversion logic to populate a source with fixed data.
 This can be used when importing data from new sources.
 The data in the new source can be populated so that it joins the previous source.
 
-ToDo: handle data that has states (key consists of multiple items).
+The injections file is read as a stream. Every injection is projected onto the "on" field and the
+fields that are listed in the conversions, any other field in the file is never kept in memory.
+For large injection files an index can be specified. The index is a SQLite database that is built
+once from the injections file and that is queried for every row instead of holding all injections in memory.
+
+Data that has states can be injected by relating the sources on multiple fields, e.g. identificatie and volgnummer.
+The injections are then keyed on the combination of the values of these fields.
+
+The values of the "on" field(s) are normalised before they are matched, in memory and in the index alike:
+numbers that have the same value match (1 == 1.0 == Decimal("1")), dates and datetimes match their ISO format.
+Other types of values, e.g. lists or objects, can not be used to relate the sources.
 """
 
 
+import datetime
 import json
+import os
+import sqlite3
+import tempfile
+from decimal import Decimal
+from operator import itemgetter
+from typing import Any, Iterator, Optional, Union
+
+from gobcore.exceptions import GOBException
+
+# Number of characters to read at once when streaming an injections file
+READ_CHUNK_SIZE = 1 << 16
 
 
 class Injector:
@@ -22,17 +44,23 @@ class Injector:
         if inject_spec:
             # {
             #     "from": "<input file name>",
-            #     "on": "<fieldname of field that relates the two sources>",
+            #     "on": "<fieldname of field that relates the two sources>" | ["<fieldname>", ...],
             #     "conversions": {
             #         "fieldname": "<operator>",
             #         ...
-            #     }
+            #     },
+            #     "index": "<optional index file name>"
             # }
 
             inject_from = inject_spec["from"]
             self.inject_on = inject_spec["on"]
             self.conversions = inject_spec["conversions"]
 
+            # A list of fields relates the two sources on the combination of the values, e.g. identificatie + volgnummer
+            on_fields = [self.inject_on] if isinstance(self.inject_on, str) else list(self.inject_on)
+            self.on_fields = on_fields
+            self._get_key = _key_getter(on_fields)
+
             # [
             #     {
             #         "<fieldname of field that relates the two sources>" : "<key value>",
@@ -40,11 +68,37 @@ class Injector:
             #         ...
             #     }, ...
             # ]
-            with open(inject_from) as file:
-                injections = json.load(file)
+            self.injections: Union[dict[Any, tuple[Any, ...]], IndexedInjections]
+            if index := inject_spec.get("index"):
+                self.injections = IndexedInjections(inject_from, index, on_fields, list(self.conversions))
+            else:
+                # Convert injections into dict for fast access
+                self.injections = {
+                    self._get_key(injection): _injection_values(injection, self.conversions)
+                    for injection in read_injections(inject_from, [*on_fields, *self.conversions])
+                }
 
-            # Convert injections into dict for fast access
-            self.injections = {injection[self.inject_on]: injection for injection in injections}
+            # Compile the conversions once into (key, operator function) pairs
+            self._conversions = tuple((key, _get_operator(operator)) for key, operator in self.conversions.items())
+
+    def get_columns(self) -> set[str]:
+        """Return the source columns that the injector reads.
+
+        Injected columns are read as well, a row without an injection keeps its source value.
+
+        :return:
+        """
+        if not self.inject_spec:
+            return set()
+        return {*self.on_fields, *self.conversions}
+
+    def close(self) -> None:
+        """Close the injections index, if any.
+
+        :return:
+        """
+        if isinstance(injections := getattr(self, "injections", None), IndexedInjections):
+            injections.close()
 
     def inject(self, row):
         """Inject data row."""
@@ -57,27 +111,228 @@ class Injector:
             return
 
         # Process row
-        inject_key = row[self.inject_on]  # e.g. data["code"]
-        inject_spec = self.injections.get(inject_key)  # e.g. injections["A"]
-        if not inject_spec:
+        inject_key = self._get_key(row)  # e.g. data["code"] or (data["code"], data["volgnummer"])
+        inject_values = self.injections.get(inject_key)  # e.g. injections["A"]
+        if not inject_values:
+            return
+
+        for (key, apply), value in zip(self._conversions, inject_values):
+            apply(row, key, value)
+
+
+def _overwrite(row, key, value):
+    row[key] = value
+
+
+def _add(row, key, value):
+    row[key] += value
+
+
+def _add_minus_one(row, key, value):
+    row[key] += value - 1
+
+
+OPERATORS = {
+    "=": _overwrite,  # Overwrite value
+    "+": _add,  # Add to value
+    "+-1": _add_minus_one,  # Add to value
+}
+
+
+def _get_operator(operator):
+    """Return the function that applies operator.
+
+    :param operator: the operator as specified in the conversions
+    :return:
+    """
+    try:
+        return OPERATORS[operator]
+    except KeyError as exc:
+        raise GOBException(f"Unknown injection operator {operator}") from exc
+
+
+def _normalise_key_value(value: Any) -> Any:
+    """Return the value of an "on" field in the form in which it is matched.
+
+    :param value: the value of an "on" field in the source or in the injections file
+    :return:
+    """
+    if value is None or type(value) is str:
+        return value
+    if isinstance(value, (int, float, Decimal)):  # includes bool, True == 1
+        try:
+            return int(value) if value == int(value) else float(value)
+        except (OverflowError, ValueError):  # infinity or NaN
+            return float(value)
+    if isinstance(value, (datetime.date, datetime.time)):  # includes datetime
+        return value.isoformat()
+    raise GOBException(f"Unsupported injection key value {value!r} of type {type(value).__name__}")
+
+
+def _key_getter(on_fields: list[str]):
+    """Return a function that returns the normalised key of an injection or a row.
+
+    :param on_fields: the field(s) that relate the two sources
+    :return:
+    """
+    get_key = itemgetter(*on_fields)
+    if len(on_fields) == 1:
+        return lambda item: _normalise_key_value(get_key(item))
+    return lambda item: tuple(map(_normalise_key_value, get_key(item)))
+
+
+def _injection_values(injection, conversions):
+    """Return the values of an injection in the order of the conversions.
+
+    :param injection: the (projected) injection
+    :param conversions: the conversions specification
+    :return:
+    """
+    return tuple(injection[key] for key in conversions)
+
+
+def _iter_json_array(file) -> Iterator[Any]:  # noqa: C901
+    """Yield the items of a JSON array file one by one.
+
+    The file is read in chunks, only the (unparsed) text of the current item is kept in memory.
+
+    :param file: an opened JSON file that contains an array of objects
+    :return:
+    """
+    decoder = json.JSONDecoder()
+    buffer = file.read(READ_CHUNK_SIZE)
+    pos = 0
+    eof = not buffer
+    started = False
+
+    while True:
+        # Skip whitespace, the opening bracket and the separators between the items
+        while pos < len(buffer) and (buffer[pos].isspace() or buffer[pos] == ("," if started else "[")):
+            started = started or buffer[pos] == "["
+            pos += 1
+
+        if pos < len(buffer) and buffer[pos] == "]":
             return
 
-        for key, operator in self.conversions.items():
-            self._apply(row=row, key=key, operator=operator, value=inject_spec[key])
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # The item is not complete yet, read more data and try again
+            chunk = file.read(READ_CHUNK_SIZE)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+
+        yield item
+        pos = end
+
+
+def read_injections(filename: str, fields: list[str]) -> Iterator[dict[str, Any]]:
+    """Read the injections from filename and project each injection onto the given fields.
+
+    :param filename: the name of the file that contains the injections
+    :param fields: the fields to keep
+    :return:
+    """
+    with open(filename) as file:
+        for injection in _iter_json_array(file):
+            yield {field: injection[field] for field in fields}
+
+
+def build_injection_index(filename: str, index: str, on_fields: list[str], fields: list[str]) -> None:
+    """Build a SQLite index for the injections in filename.
+
+    The index is written to a unique temporary file first so that a failing build never leaves an incomplete index.
+
+    :param filename: the name of the file that contains the injections
+    :param index: the name of the index file
+    :param on_fields: the field(s) that relate the two sources
+    :param fields: the fields to store for each injection
+    :return:
+    """
+    # A unique temporary file, imports that build the same index at the same time do not interfere
+    fd, tmp_index = tempfile.mkstemp(dir=os.path.dirname(index) or ".", prefix=f"{os.path.basename(index)}.")
+    os.close(fd)
+
+    get_key = _key_getter(on_fields)
+    connection = sqlite3.connect(tmp_index)
+    try:
+        with connection:
+            connection.execute("CREATE TABLE fields (fields TEXT)")
+            connection.execute("INSERT INTO fields VALUES (?)", (json.dumps([on_fields, fields]),))
+            connection.execute("CREATE TABLE injections (key TEXT PRIMARY KEY, injection TEXT)")
+            connection.executemany(
+                "INSERT OR REPLACE INTO injections VALUES (?, ?)",
+                (
+                    (json.dumps(get_key(injection)), json.dumps(_injection_values(injection, fields)))
+                    for injection in read_injections(filename, [*on_fields, *fields])
+                ),
+            )
+    except BaseException:
+        connection.close()
+        os.remove(tmp_index)
+        raise
+    connection.close()
+
+    os.replace(tmp_index, index)
+
+
+def _get_index_fields(index: str) -> Optional[list[list[str]]]:
+    """Return the key fields and the fields for which the index has been built.
+
+    :param index: the name of the index file
+    :return:
+    """
+    connection = sqlite3.connect(f"file:{index}?mode=ro", uri=True)
+    try:
+        result = connection.execute("SELECT fields FROM fields").fetchone()
+    except sqlite3.DatabaseError:
+        return None
+    finally:
+        connection.close()
+    return json.loads(result[0]) if result else None
+
+
+class IndexedInjections:
+    """Injections that are looked up in a SQLite index instead of being held in memory."""
+
+    def __init__(self, filename: str, index: str, on_fields: list[str], fields: list[str]) -> None:
+        """Open the index, (re)build the index when it is missing or outdated.
+
+        An index is outdated when it is older than the injections file or when it has been built for other fields.
+
+        :param filename: the name of the file that contains the injections
+        :param index: the name of the index file
+        :param on_fields: the field(s) that relate the two sources
+        :param fields: the fields to store for each injection
+        """
+        if (
+            not os.path.exists(index)
+            or os.path.getmtime(index) < os.path.getmtime(filename)
+            or _get_index_fields(index) != [on_fields, fields]
+        ):
+            build_injection_index(filename, index, on_fields, fields)
+
+        self.connection = sqlite3.connect(f"file:{index}?mode=ro", uri=True)
+
+    def get(self, key: Any) -> Optional[tuple[Any, ...]]:
+        """Return the injection values for key or None if the key has no injection.
+
+        The values are returned in the order of the conversions.
+
+        :param key: the normalised value(s) of the field(s) that relate the two sources
+        :return:
+        """
+        query = "SELECT injection FROM injections WHERE key = ?"
+        result = self.connection.execute(query, (json.dumps(key),)).fetchone()
+        return tuple(json.loads(result[0])) if result else None
 
-    def _apply(self, row, key, operator, value):
-        """Apply an injection.
+    def close(self) -> None:
+        """Close the index.
 
-        :param row: the data row to which the injection should be applied
-        :param key: the key
-        :param operator: the operator to apply
-        :param value: the value to apply
         :return:
         """
-        # Process an injection
-        if operator == "=":  # Overwrite value
-            row[key] = value
-        elif operator == "+":  # Add to value
-            row[key] += value
-        elif operator == "+-1":  # Add to value
-            row[key] += value - 1
+        self.connection.close()
@@ -0,0 +1,65 @@
+"""Interning.
+
+Many source columns hold only a few distinct values, e.g. status codes or woonplaats codes,
+but every row that is read carries its own string object for the value.
+
+Interning replaces a repeated value by the first object with the same value as the rows are read.
+The entities that are kept in memory during an import (merge items, checkpoints, sampled issues)
+then share the values, and comparing two shared values is an identity check.
+
+Interning is enabled per column in the source definition of a dataset:
+
+"intern": ["<source column>", ...]
+
+A column that turns out to have more than IMPORT_INTERN_MAX_VALUES distinct values is not a
+low-cardinality column. Its values are released and it is no longer interned.
+"""
+
+
+import os
+from typing import Any
+
+from gobcore.logging.logger import logger
+
+# Maximum number of distinct values of an interned column
+IMPORT_INTERN_MAX_VALUES = int(os.getenv("IMPORT_INTERN_MAX_VALUES", "10000"))
+
+
+class Interner:
+    """Intern the string values of source columns."""
+
+    def __init__(self, columns: list[str], max_values: int = IMPORT_INTERN_MAX_VALUES) -> None:
+        """Initialise Interner.
+
+        :param columns: the source columns to intern
+        :param max_values: the maximum number of distinct values of a column
+        """
+        self.max_values = max_values
+
+        # Column => value => the shared value
+        self.values: dict[str, dict[str, str]] = {column: {} for column in columns}
+        self.columns = tuple(self.values.items())
+
+    def intern(self, row: dict[str, Any]) -> dict[str, Any]:
+        """Replace the values of the interned columns of row by the shared values.
+
+        :param row: a source row
+        :return: the row
+        """
+        for column, values in self.columns:
+            value = row.get(column)
+            if type(value) is str:
+                row[column] = values.setdefault(value, value)
+                if len(values) > self.max_values:
+                    self.release(column)
+        return row
+
+    def release(self, column: str) -> None:
+        """Stop interning column and release its values.
+
+        :param column:
+        :return:
+        """
+        logger.info(f"Column {column} has more than {self.max_values} distinct values, it is no longer interned")
+        del self.values[column]
+        self.columns = tuple(self.values.items())
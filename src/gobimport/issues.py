@@ -0,0 +1,123 @@
+"""Issues.
+
+Aggregated logging of quality issues.
+
+A systematically wrong source fails the same check for (nearly) every entity.
+Logging an issue for every entity would then dominate the runtime of the import,
+building a gobcore Issue extracts and formats the values of the entity.
+
+The issues are therefore counted per check, attribute and level. Only a sample of the issues,
+the first IMPORT_ISSUE_SAMPLE_SIZE issues for every check, attribute and level, is logged in detail.
+The counts are exact, they are logged and added to the summary at the end of the import.
+
+Usage: import Issue and log_issue from this module instead of from gobcore.quality.issue.
+"""
+
+
+import os
+from collections import Counter
+from typing import Any, Optional
+
+from gobcore.quality.issue import Issue as QualityIssue
+from gobcore.quality.issue import log_issue as log_quality_issue
+
+# Number of issues that is logged in detail per check, attribute and level
+IMPORT_ISSUE_SAMPLE_SIZE = int(os.getenv("IMPORT_ISSUE_SAMPLE_SIZE", "100"))
+
+
+class Issue:
+    """A deferred quality issue.
+
+    Takes the same arguments as the gobcore Issue, the gobcore Issue is only built when the issue is logged.
+    """
+
+    __slots__ = ("check", "entity", "id_attribute", "attribute", "kwargs")
+
+    def __init__(
+        self, check: dict[str, Any], entity: dict[str, Any], id_attribute: Optional[str], attribute: str, **kwargs: Any
+    ) -> None:
+        """Initialise Issue.
+
+        :param check: the quality check that failed
+        :param entity: the entity that failed the check
+        :param id_attribute: the attribute that identifies the entity
+        :param attribute: the attribute that failed the check
+        :param kwargs: any other arguments of the gobcore Issue, e.g. compared_to
+        """
+        self.check = check
+        self.entity = entity
+        self.id_attribute = id_attribute
+        self.attribute = attribute
+        self.kwargs = kwargs
+
+    def build(self) -> QualityIssue:
+        """Return the gobcore Issue."""
+        return QualityIssue(self.check, self.entity, self.id_attribute, self.attribute, **self.kwargs)
+
+
+class IssueAggregator:
+    """Count the issues and log a sample of them."""
+
+    checkpoint_attributes = ("counts",)
+
+    def __init__(self, sample_size: int = IMPORT_ISSUE_SAMPLE_SIZE) -> None:
+        """Initialise IssueAggregator.
+
+        :param sample_size: the number of issues that is logged per check, attribute and level
+        """
+        self.sample_size = sample_size
+        self.counts: Counter[tuple[Optional[str], str, str]] = Counter()
+
+    def reset(self) -> None:
+        """Start counting for a new import."""
+        self.counts = Counter()
+
+    def log_issue(self, logger: Any, level: str, issue: Issue) -> None:
+        """Count the issue, log it if the sample for its check, attribute and level is not yet complete.
+
+        :param logger: the logger of the import
+        :param level: the QA level of the issue
+        :param issue:
+        :return:
+        """
+        key = (issue.check.get("name"), issue.attribute, level)
+        self.counts[key] += 1
+        if self.counts[key] <= self.sample_size:
+            log_quality_issue(logger, level, issue.build())
+
+    def summary(self) -> dict[str, dict[str, int]]:
+        """Return the number of issues per level and per check and attribute.
+
+        :return: level => "<check>.<attribute>" => count
+        """
+        summary: dict[str, dict[str, int]] = {}
+        for (name, attribute, level), count in sorted(self.counts.items(), key=str):
+            summary.setdefault(level, {})[f"{name}.{attribute}"] = count
+        return summary
+
+    def log_summary(self, logger: Any) -> None:
+        """Log the number of issues that have not been logged in detail.
+
+        :param logger: the logger of the import
+        :return:
+        """
+        for (name, attribute, level), count in self.counts.items():
+            if count > self.sample_size:
+                logger.warning(
+                    f"{count} {level} issues {name} for attribute {attribute}, {self.sample_size} have been logged"
+                )
+
+
+# The aggregator of the import that is running in this process
+issue_aggregator = IssueAggregator()
+
+
+def log_issue(logger: Any, level: str, issue: Issue) -> None:
+    """Log an issue, see IssueAggregator.log_issue.
+
+    :param logger:
+    :param level:
+    :param issue:
+    :return:
+    """
+    issue_aggregator.log_issue(logger, level, issue)
@@ -26,6 +26,8 @@ from gobcore.utils import ProgressTicker
 class Merger:
     """Merge a dataset with another dataset."""
 
+    checkpoint_attributes = ("merged",)
+
     def __init__(self, import_client) -> None:
         """Initialise a Merger by providing it with the ImportClient instance.
 
@@ -140,6 +142,20 @@ class Merger:
                 self.merge_func(entity, write, merge_item["entities"])
                 self.merged.add(entity[on])
 
+    def release(self, entity: dict[str, Any], write) -> None:
+        """Write the merge entity that has been merged into entity, when entity itself is not written.
+
+        A merged entity takes the place of the last entity to be merged, this entity is held back by the merge.
+        When a merged entity is not imported, e.g. because it has been quarantined,
+        the held back entity is written instead so that it is not lost.
+
+        :param entity:
+        :param write:
+        :return:
+        """
+        if self.is_merged(entity):
+            write(self.merge_items[entity[self.merge_def["on"]]]["entities"][-1])
+
     def finish(self, write) -> None:
         """Apply write (Callable[[entity], None]) on remaining entities.
 
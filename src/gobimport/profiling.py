@@ -0,0 +1,151 @@
+"""Profiling.
+
+Opt-in instrumentation to find out where an import spends its time and memory.
+
+CPU profiling is enabled for a single import by the "profile" flag in the header of the import message,
+or by the --profile argument in standalone mode. The profile (cProfile) of the import is written
+next to the contents file, a summary of the functions with the highest cumulative time is logged.
+
+Memory profiling is enabled for all imports by the IMPORT_MEMORY_PROFILE_INTERVAL environment variable,
+or for a single import by the "memory_profile" flag in the header of the import message.
+The value is the number of rows between two snapshots, true in the header uses the default interval.
+
+Every snapshot logs the traced memory, the lines that allocated most memory and the sizes
+(number of items) of the data structures that grow during an import (the accumulators).
+The peak memory and the final sizes of the accumulators are added to the summary of the import.
+"""
+
+
+import cProfile
+import io
+import os
+import pstats
+import tracemalloc
+from collections.abc import Sized
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional, Union
+
+from gobcore.utils import ProgressTicker
+
+# Number of functions in the logged summary of a CPU profile
+PROFILE_TOP = 25
+
+# Number of rows between two memory snapshots, 0 disables memory profiling
+IMPORT_MEMORY_PROFILE_INTERVAL = int(os.getenv("IMPORT_MEMORY_PROFILE_INTERVAL", "0"))
+
+DEFAULT_MEMORY_PROFILE_INTERVAL = 100_000
+
+# Number of allocation sites that is logged for every snapshot
+MEMORY_PROFILE_TOP = 10
+
+
+def get_memory_profile_interval(header: dict[str, Any]) -> int:
+    """Return the number of rows between two memory snapshots, 0 if memory profiling is disabled.
+
+    :param header: the header of the import message
+    :return:
+    """
+    flag: Union[bool, int] = header.get("memory_profile", False)
+    if flag is True:
+        return DEFAULT_MEMORY_PROFILE_INTERVAL
+    return int(flag) or IMPORT_MEMORY_PROFILE_INTERVAL
+
+
+class MemoryProfiler:
+    """Trace the memory usage of an import.
+
+    The profiler wraps the progress ticker of the import and takes a snapshot every interval ticks.
+    """
+
+    def __init__(
+        self, progress: ProgressTicker, accumulators: Callable[[], dict[str, Any]], logger: Any, interval: int
+    ) -> None:
+        """Initialise MemoryProfiler.
+
+        :param progress: the progress ticker of the import, ticks for every row
+        :param accumulators: returns the data structures to report, by name
+        :param logger: the logger of the import
+        :param interval: the number of rows between two snapshots
+        """
+        self.progress = progress
+        self.accumulators = accumulators
+        self.logger = logger
+        self.interval = interval
+
+        self.n_rows = 0
+        self.summary: dict[str, Any] = {}
+
+    def __enter__(self) -> "MemoryProfiler":
+        """Start tracing memory allocations."""
+        tracemalloc.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """Take a final snapshot and stop tracing memory allocations."""
+        try:
+            self.snapshot()
+        finally:
+            tracemalloc.stop()
+
+    def tick(self) -> None:
+        """Tick the progress ticker, take a snapshot every interval rows."""
+        self.progress.tick()
+        self.n_rows += 1
+        if self.n_rows % self.interval == 0:
+            self.snapshot()
+
+    def snapshot(self) -> None:
+        """Log the memory usage and update the summary.
+
+        :return:
+        """
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+        top = [str(statistic) for statistic in snapshot.statistics("lineno")[:MEMORY_PROFILE_TOP]]
+        sizes = {name: len(value) for name, value in self.accumulators().items() if isinstance(value, Sized)}
+
+        self.summary = {"peak_memory": peak, "accumulators": sizes}
+        self.logger.info(
+            f"Memory after {self.n_rows} rows: {current / 2 ** 20:.1f} MiB, peak {peak / 2 ** 20:.1f} MiB",
+            kwargs={"data": {"current_memory": current, **self.summary, "top": top}},
+        )
+
+
+def get_memory_profiler(
+    progress: ProgressTicker, accumulators: Callable[[], dict[str, Any]], logger: Any, header: dict[str, Any]
+) -> Optional[MemoryProfiler]:
+    """Return a memory profiler if memory profiling is enabled for the import, else None.
+
+    :param progress: the progress ticker of the import
+    :param accumulators: returns the data structures to report, by name
+    :param logger: the logger of the import
+    :param header: the header of the import message
+    :return:
+    """
+    if interval := get_memory_profile_interval(header):
+        return MemoryProfiler(progress, accumulators, logger, interval)
+    return None
+
+
+@contextmanager
+def cpu_profile(filename: str, logger: Any) -> Iterator[None]:
+    """Profile the code that runs in this context.
+
+    The profile is written to filename, it can be inspected with pstats or any other profile viewer.
+    The functions with the highest cumulative time are logged.
+
+    :param filename: the name of the profile file
+    :param logger: the logger of the import
+    :return:
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(filename)
+
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(PROFILE_TOP)
+        logger.info(f"Profile written to {filename}", kwargs={"data": {"profile": stream.getvalue()}})
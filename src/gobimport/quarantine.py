@@ -0,0 +1,111 @@
+"""Quarantine.
+
+By default a row that cannot be imported, e.g. a value that cannot be converted, aborts the import.
+
+A dataset can instead quarantine the rows that fail. A quarantined row is written, together with
+the exception it raised, to a side file next to the contents file (<contents>.quarantine, one JSON
+object per line) and the import continues with the next row.
+The import only fails at the end, when more rows have been quarantined than the error budget allows.
+
+Only injection, enrichment and conversion are guarded.
+A row is merged before it is converted. When a merged row is quarantined, the entity that it has been
+merged with is written in its place, so no merged data is lost.
+A failure while merging, validating or writing still aborts the import.
+
+Quarantine is enabled in the source definition of a dataset:
+
+"quarantine": {
+    "max_errors": <the error budget, the maximum number of quarantined rows, default 100>
+}
+"""
+
+
+import json
+from types import TracebackType
+from typing import Any, Optional, TextIO, Type
+
+from gobcore.exceptions import GOBException
+
+DEFAULT_MAX_ERRORS = 100
+
+
+class Quarantine:
+    """Quarantine the rows that fail to import."""
+
+    # A resumed import writes the rows that fail after the checkpoint to its own quarantine file
+    checkpoint_attributes = ("n_errors",)
+
+    def __init__(self, filename: str, spec: dict[str, Any]) -> None:
+        """Initialise Quarantine.
+
+        :param filename: the name of the quarantine file
+        :param spec: quarantine specification from the dataset source definition
+        """
+        self.filename = filename
+        self.max_errors = spec.get("max_errors", DEFAULT_MAX_ERRORS)
+
+        self.n_errors = 0
+        self.row: Any = None
+        self.file: Optional[TextIO] = None
+
+    def guard(self, row: Any) -> "Quarantine":
+        """Return a context that quarantines row when it fails to import.
+
+        Usage:
+        with quarantine.guard(row):
+            import row
+
+        :param row: a source row
+        :return:
+        """
+        self.row = row
+        return self
+
+    def __enter__(self) -> "Quarantine":
+        """Start importing the row."""
+        return self
+
+    def __exit__(
+        self, exc_type: Optional[Type[BaseException]], exc_val: Optional[BaseException], exc_tb: Optional[TracebackType]
+    ) -> bool:
+        """Quarantine the row when it has failed, True suppresses the exception."""
+        if exc_type is None or not issubclass(exc_type, Exception):
+            return False
+
+        self.add(self.row, exc_val)
+        return True
+
+    def add(self, row: Any, exception: Any) -> None:
+        """Write the row and the exception it raised to the quarantine file.
+
+        :param row: a source row
+        :param exception:
+        :return:
+        """
+        if self.file is None:
+            self.file = open(self.filename, "a")
+
+        self.n_errors += 1
+        error = f"{type(exception).__name__}: {exception}"
+        self.file.write(json.dumps({"error": error, "row": row}, default=str) + "\n")
+
+    def close(self) -> None:
+        """Close the quarantine file."""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def result(self, logger: Any) -> None:
+        """Close the quarantine file and report the quarantined rows.
+
+        :param logger: the logger of the import
+        :raises GOBException: when the error budget has been exceeded
+        :return:
+        """
+        self.close()
+
+        if self.n_errors:
+            logger.warning(f"{self.n_errors} rows have been quarantined in {self.filename}")
+
+        if self.n_errors > self.max_errors:
+            raise GOBException(f"Too many rows quarantined: {self.n_errors} > {self.max_errors}")
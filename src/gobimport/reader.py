@@ -2,16 +2,20 @@
 
 Contains logic to connect and read from a variety of data sources.
 """
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Optional
 
 from gobconfig.datastore.config import get_datastore_config
-from gobcore.datastore.factory import Datastore, DatastoreFactory
 from gobcore.enum import ImportMode
 from gobcore.logging.logger import logger
-from gobcore.secure.crypto import read_protect
 from gobcore.typesystem import GOB_SECURE_TYPES
 
 from gobimport import gob_model
+from gobimport.interning import Interner
+from gobimport.utils import sql_literal
+from gobimport.watermark import WATERMARK_PLACEHOLDER
+
+if TYPE_CHECKING:
+    from gobcore.datastore.factory import Datastore
 
 
 class Reader:
@@ -42,7 +46,11 @@ class Reader:
         self.secure_attributes: list[str] = []
         self.set_secure_attributes(mapping, gob_attributes)
 
-        self.datastore: Optional[Datastore] = None
+        # Intern the values of low-cardinality columns, secure values are never kept by the interner
+        intern_columns = [column for column in source.get("intern", []) if column not in self.secure_attributes]
+        self.interner = Interner(intern_columns) if intern_columns else None
+
+        self.datastore: Optional["Datastore"] = None
 
     def __enter__(self):
         """Enter Reader context."""
@@ -78,6 +86,9 @@ class Reader:
 
         :return:
         """
+        # The datastores and their drivers are only imported when a source is read
+        from gobcore.datastore.factory import DatastoreFactory
+
         # Get manually added config, or config based on application name
         datastore_config = self.source.get("application_config") or get_datastore_config(self.source["application"])
 
@@ -88,6 +99,9 @@ class Reader:
         logger.info(f"Connection to {self.app} {self.datastore.user} has been made.")
 
     def _protect_row(self, row):
+        # The crypto module is only imported when secure attributes are read
+        from gobcore.secure.crypto import read_protect
+
         for attr in row.keys():
             if attr in self.secure_attributes:
                 row[attr] = read_protect(row[attr])
@@ -100,9 +114,51 @@ class Reader:
         else:
             yield from query
 
-    def read(self):  # noqa: C901
+    def _get_mode_query(self, watermark: Any) -> list[str]:
+        """Return the mode specific query, e.g. the query for recent imports.
+
+        The {watermark} placeholder is replaced by the watermark of the previous import.
+        When the query refers to a watermark and no watermark is available the query is skipped.
+
+        :param watermark: the watermark of the previous import
+        :return:
+        """
+        try:
+            # Optionally populated with the mode, eg partial, random, ...
+            mode_query: list[str] = self.source[self.mode.value]
+        except KeyError as exc:
+            logger.error(f"Unknown import mode for the collection: {self.mode.value}")
+            raise exc
+
+        if not any(WATERMARK_PLACEHOLDER in line for line in mode_query):
+            return mode_query
+
+        if watermark is None:
+            logger.warning(f"No watermark available for the {self.mode.value} import, all rows are read")
+            return []
+
+        literal = sql_literal(watermark)
+        return [line.replace(WATERMARK_PLACEHOLDER, literal) for line in mode_query]
+
+    def read(
+        self,
+        order_by: Optional[str] = None,
+        after: Any = None,
+        watermark: Any = None,
+        columns: Optional[list[str]] = None,
+    ):
         """Read the data from the data source.
 
+        When order_by is specified the rows of a query are read ordered by the given column.
+        When after is specified as well only the rows with order_by > after are read.
+        This is used to resume an import from a checkpoint.
+
+        When columns are specified the query is projected on these columns, any other column is not read.
+
+        :param order_by: optional column to order the rows by
+        :param after: optional value to read only the rows after this value
+        :param watermark: optional watermark of the previous import for the mode specific query
+        :param columns: optional columns to project the query on
         :return: iterable dataset
         """
         assert self.datastore is not None, (
@@ -114,14 +170,18 @@ class Reader:
 
         # Add partial query only if have source query, ignore for other datastores
         if source_query and self.mode != ImportMode.FULL:
-            try:
-                # Optionally populated with the mode, eg partial, random, ...
-                source_query += self.source[self.mode.value]
-            except KeyError as exc:
-                logger.error(f"Unknown import mode for the collection: {self.mode.value}")
-                raise exc
+            source_query = [*source_query, *self._get_mode_query(watermark)]
+
+        query = "\n".join(source_query)
+        if query and columns:
+            query = f"SELECT {', '.join(f'q.{column}' for column in columns)} FROM (\n{query}\n) q"
+
+        if query and order_by:
+            where = "" if after is None else f" WHERE q.{order_by} > {sql_literal(after)}"
+            query = f"SELECT * FROM (\n{query}\n) q{where} ORDER BY q.{order_by}"
 
         # Name the cursor to activate server-side-cursor (only postgresql datastore)
-        results = self.datastore.query("\n".join(source_query), arraysize=2000, name="import_cursor", withhold=True)
+        results = self.datastore.query(query, arraysize=2000, name="import_cursor", withhold=True)
 
-        return self._maybe_protect_rows(results)
+        rows = self._maybe_protect_rows(results)
+        return map(self.interner.intern, rows) if self.interner else rows
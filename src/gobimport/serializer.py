@@ -0,0 +1,127 @@
+"""Serializer.
+
+Serialisation of the entities that are written to the contents file.
+
+Serialising the entities is a large part of the CPU time of large imports.
+The entities are serialised by orjson, when orjson is not installed by the GOB contents writer.
+
+The entities hold Python values (str, int, Decimal, date, datetime, ...) and GOB values, e.g. secure values.
+orjson serialises the values that it does not support, e.g. Decimal and the GOB values, by the GOB JSON encoder.
+Dates and datetimes are only serialised by orjson itself when it serialises them like the GOB JSON encoder.
+The contents hold the same values with or without orjson.
+"""
+
+
+import datetime
+import json
+from typing import Any, BinaryIO, Optional
+
+from gobcore.message_broker.offline_contents import ContentsWriter as GOBContentsWriter
+from gobcore.typesystem.json import GobTypeJSONEncoder
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, it speeds up writing the contents
+    orjson = None  # type: ignore[assignment]
+
+# Dates and datetimes to compare the serialisation of orjson with the GOB JSON encoder
+DATETIME_SAMPLES = (
+    datetime.date(2020, 1, 31),
+    datetime.datetime(2020, 1, 31, 10, 11, 12),
+    datetime.datetime(2020, 1, 31, 10, 11, 12, 13),
+    datetime.datetime(2020, 1, 31, 10, 11, 12, tzinfo=datetime.timezone.utc),
+)
+
+_encoder = GobTypeJSONEncoder()
+
+
+def _serialises_datetimes_alike() -> bool:
+    """Tell whether orjson serialises dates and datetimes like the GOB JSON encoder."""
+    try:
+        return all(
+            orjson.dumps(value) == json.dumps(value, cls=GobTypeJSONEncoder).encode() for value in DATETIME_SAMPLES
+        )
+    except TypeError:
+        return False
+
+
+def get_options() -> int:
+    """Return the orjson options, to serialise the entities like the GOB JSON encoder.
+
+    :return:
+    """
+    options = orjson.OPT_NON_STR_KEYS
+    if not _serialises_datetimes_alike():
+        options |= orjson.OPT_PASSTHROUGH_DATETIME
+    return options
+
+
+ORJSON_OPTIONS = get_options() if orjson else 0
+
+
+def dumps(entity: Any) -> bytes:
+    """Serialise an entity by orjson to UTF-8 encoded JSON.
+
+    :param entity:
+    :return:
+    """
+    return orjson.dumps(entity, default=_encoder.default, option=ORJSON_OPTIONS)
+
+
+class ContentsWriter:
+    """Write the entities to a contents file, in the layout of the GOB contents writer.
+
+    The GOB contents writer names the contents file. When orjson is installed the entities are serialised
+    by orjson and the UTF-8 encoded JSON is written to the file as is.
+    Otherwise the GOB contents writer writes the file.
+    """
+
+    def __init__(self, filename: Optional[str] = None) -> None:
+        """Initialise ContentsWriter.
+
+        :param filename: optional name of the contents file, by default a unique name is generated
+        """
+        self.writer = GOBContentsWriter(filename)
+        self.filename = self.writer.filename
+
+        # The contents file when the entities are serialised by orjson
+        self.file: Optional[BinaryIO] = None
+        self.separator = b""
+
+    def __enter__(self) -> "ContentsWriter":
+        """Open the contents file and start the JSON array."""
+        if orjson is None:
+            self.writer.__enter__()
+        else:
+            self.file = open(self.filename, "wb")
+            self.file.write(b"[")
+            self.separator = b""
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """End the JSON array and close the contents file."""
+        if self.file is None:
+            self.writer.__exit__(*args)
+            return
+
+        self.file.write(b"]")
+        self.file.close()
+        self.file = None
+
+    def write(self, entity: dict[str, Any]) -> None:
+        """Write an entity to the contents file.
+
+        The entity is serialised before anything is written, an entity that fails to serialise leaves the file intact.
+
+        :param entity:
+        :return:
+        """
+        if self.file is None:
+            self.writer.write(entity)
+            return
+
+        # A JSON array with an entity per line, like the GOB contents writer
+        data = dumps(entity)
+        self.file.write(self.separator)
+        self.file.write(data)
+        self.separator = b",\n"
@@ -1,5 +1,16 @@
+import datetime
+import re
+from decimal import Decimal
 from functools import reduce
-from typing import Any
+from typing import Any, Optional
+
+try:
+    import numpy
+except ImportError:  # numpy is optional, it speeds up parsing large geometries
+    numpy = None  # type: ignore[assignment]
+
+# Any number in a WKT geometry
+WKT_NUMBER = re.compile(r"-?[0-9]+(?:\.[0-9]+)?")
 
 
 def split_field_reference(ref: str) -> list[str]:
@@ -18,3 +29,65 @@ def get_nested_item(data: dict[str, Any], *keys: str):
     :return:
     """
     return reduce(lambda d, key: d.get(key, None) if isinstance(d, dict) else None, keys, data)
+
+
+def sql_literal(value: Any) -> str:
+    """Return value as an (ANSI) SQL literal.
+
+    Example: sql_literal("O'Brien") = "'O''Brien'"
+
+    :param value:
+    :return:
+    """
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float, Decimal)):
+        return str(value)
+    if isinstance(value, datetime.datetime):
+        return f"TIMESTAMP '{value.strftime('%Y-%m-%d %H:%M:%S.%f')}'"
+    if isinstance(value, datetime.date):
+        return f"DATE '{value.isoformat()}'"
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _wkt_numbers(value: str) -> list[str]:
+    # The numbers of a WKT geometry, e.g. POLYGON ((x y, x y, ...)), follow its first "("
+    start = value.find("(")
+    if start < 0:
+        # Empty geometry, e.g. POLYGON EMPTY
+        return []
+    return value[start:].replace("(", " ").replace(")", " ").replace(",", " ").split()
+
+
+def wkt_bounds(value: str) -> Optional[tuple[float, float, float, float]]:
+    """Return the bounding box of a WKT geometry, None if the geometry has no coordinates.
+
+    Example: wkt_bounds("POLYGON ((1 2, 3 2, 3 4, 1 2))") = (1.0, 2.0, 3.0, 4.0)
+
+    The coordinates are parsed in bulk, by numpy when it is installed.
+    Every even number is an x coordinate, every odd number an y coordinate.
+
+    :param value: the WKT geometry
+    :return: min x, min y, max x, max y
+    """
+    numbers = _wkt_numbers(value)
+    if len(numbers) < 2:
+        return None
+
+    try:
+        if numpy is not None:
+            array = numpy.array(numbers, dtype=float)
+            x, y = array[0::2], array[1::2]
+            return float(x.min()), float(y.min()), float(x.max()), float(y.max())
+        coords = list(map(float, numbers))
+    except ValueError:
+        # The coordinates are mixed with other text, e.g. a GEOMETRYCOLLECTION
+        coords = list(map(float, WKT_NUMBER.findall(value)))
+        if len(coords) < 2:
+            # Only empty geometries, e.g. GEOMETRYCOLLECTION (POINT EMPTY)
+            return None
+
+    xs, ys = coords[0::2], coords[1::2]
+    return min(xs), min(ys), max(xs), max(ys)
@@ -13,10 +13,11 @@ from typing import Any
 from gobcore.exceptions import GOBException
 from gobcore.logging.logger import logger
 from gobcore.model.metadata import FIELD
-from gobcore.quality.issue import QA_CHECK, QA_LEVEL, Issue, log_issue
+from gobcore.quality.issue import QA_CHECK, QA_LEVEL
 
 from gobimport import gob_model
-from gobimport.utils import get_nested_item, split_field_reference
+from gobimport.issues import Issue, log_issue
+from gobimport.utils import get_nested_item, split_field_reference, wkt_bounds
 
 # Log message formats
 MISSING_ATTR_FMT = "{attr} missing in entity: {entity}"
@@ -238,6 +239,8 @@ ENTITY_CHECKS: dict[str, dict[Any, Any]] = {
 class Validator:
     """Quality validator."""
 
+    checkpoint_attributes = ("primary_keys", "duplicates", "fatal", "collection_qa")
+
     def __init__(self, source_app, catalogue, entity_name, input_spec):
         self.source_app = source_app
         self.catalogue = catalogue
@@ -388,17 +391,12 @@ class Validator:
     def _geometry_check(self, check, value):
         values = check.get("values")
         assert values, "Geometry values should be configured for this check"
-        coords = re.findall(r"([0-9]+\.[0-9]+)", value)
-        # Loop through all coords and check if they fill within the supplied range.
-        # Even coords are x values, uneven are y values
-        coord_types = ["x", "y"]
-        for count, coord in enumerate(coords):
-            # Get the coord type
-            coord_type = coord_types[count % 2]
-            # If the coord is outside of the boundaries, retun false
-            if not values[coord_type]["min"] <= float(coord) <= values[coord_type]["max"]:
-                return False
-        return True
+        # Check if all coords fall within the supplied range by comparing the bounding box of the geometry
+        if (bounds := wkt_bounds(value)) is None:
+            return True
+        min_x, min_y, max_x, max_y = bounds
+        x, y = values["x"], values["y"]
+        return x["min"] <= min_x and max_x <= x["max"] and y["min"] <= min_y and max_y <= y["max"]
 
     def _validate_quality(self, entity):
         """Validate an entity.
@@ -0,0 +1,88 @@
+"""Watermarks.
+
+A watermark is the highest value of a source column, e.g. a mutation timestamp, that has been imported.
+
+After each successful import the watermark is saved on the shared volume.
+The next import binds the saved watermark into the mode specific query (e.g. "recent")
+so that only the rows that have changed since the last import are read.
+
+Watermarks are enabled in the source definition of a dataset:
+
+"watermark": {
+    "column": "<source column, e.g. the mutation timestamp>"
+}
+
+The mode specific query refers to the saved watermark by the {watermark} placeholder, e.g.:
+
+"recent": [
+    "AND mutatie_datum > {watermark}"
+]
+
+When no watermark has been saved yet the mode specific query is skipped and all rows are read.
+"""
+
+
+import os
+import pickle
+from typing import Any
+
+from gobcore.message_broker.config import GOB_SHARED_DIR
+
+WATERMARK_DIR = os.path.join(GOB_SHARED_DIR, "watermarks")
+
+# Placeholder for the saved watermark in a mode specific query
+WATERMARK_PLACEHOLDER = "{watermark}"
+
+
+class Watermark:
+    """Track and save the highest value of a source column."""
+
+    checkpoint_attributes = ("max_value",)
+
+    def __init__(self, name: str, spec: dict[str, Any]) -> None:
+        """Initialise a Watermark, load the watermark of the previous import.
+
+        :param name: unique name for the imported dataset, e.g. catalogue.collection.application
+        :param spec: watermark specification from the dataset source definition
+        """
+        self.column = spec["column"]
+        self.filename = os.path.join(WATERMARK_DIR, f"{name}.watermark")
+
+        # The watermark of the previous import
+        self.value = self._load()
+        # The highest value that has been read in this import
+        self.max_value = None
+
+    def _load(self) -> Any:
+        if not os.path.exists(self.filename):
+            return None
+
+        with open(self.filename, "rb") as file:
+            return pickle.load(file)
+
+    def update(self, row: dict[str, Any]) -> None:
+        """Update the highest value with the value of the row.
+
+        :param row: a source row
+        :return:
+        """
+        value = row.get(self.column)
+        if value is not None and (self.max_value is None or value > self.max_value):
+            self.max_value = value
+
+    def save(self) -> None:
+        """Save the highest value that has been read as the watermark for the next import.
+
+        The watermark is left unchanged when no values have been read.
+
+        :return:
+        """
+        if self.max_value is None:
+            return
+
+        os.makedirs(WATERMARK_DIR, exist_ok=True)
+        tmp_file = f"{self.filename}.tmp"
+        with open(tmp_file, "wb") as file:
+            pickle.dump(self.max_value, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, self.filename)
+        self.value = self.max_value
@@ -0,0 +1,187 @@
+"""Workers.
+
+Run the message driven import service in a pool of worker processes.
+
+Every worker is a separate consumer of the import queues. A long running import in one worker
+does not block the imports that are handled by the other workers.
+The GOBModel is loaded before the workers are forked, so every worker starts warm.
+
+The number of concurrent imports from one source application can be limited to protect the source database.
+The limits are specified as a comma separated list of application=limit pairs, e.g. "Neuron=2,DGDialog=1".
+Every import slot is a lock file that is locked by the worker that uses the slot. The operating system releases
+the lock when the worker exits, a worker that dies during an import never keeps its slot.
+A worker does not wait for a free slot while it holds the import request. When all slots of the application are
+in use, the request is published again to the import queue and the worker is free to handle the next message.
+"""
+
+
+import fcntl
+import multiprocessing
+import os
+import shutil
+import signal
+import tempfile
+import time
+from contextlib import contextmanager
+from multiprocessing.process import BaseProcess
+from typing import IO, Any, Callable, Iterator, Optional
+
+from gobcore.exceptions import GOBException
+from gobcore.logging.logger import logger
+from gobcore.message_broker import publish
+from gobcore.message_broker.config import IMPORT, WORKFLOW_EXCHANGE
+
+from gobimport import get_gob_model
+
+# Number of worker processes, 1 runs the service in the main process
+IMPORT_WORKERS = int(os.getenv("IMPORT_WORKERS", "1"))
+
+# Max number of concurrent imports per source application
+IMPORT_APPLICATION_CONCURRENCY = os.getenv("IMPORT_APPLICATION_CONCURRENCY", "")
+
+# Seconds between two checks of the worker processes
+POLL_INTERVAL = 5
+
+# Application name => lock files of the import slots, shared by all workers
+_application_slots: dict[str, list[str]] = {}
+
+
+def parse_application_concurrency(spec: str) -> dict[str, int]:
+    """Parse the concurrency limits per source application.
+
+    Example: parse_application_concurrency("Neuron=2,DGDialog=1") = {"Neuron": 2, "DGDialog": 1}
+
+    :param spec: comma separated list of application=limit pairs
+    :return:
+    """
+    limits = {}
+    for item in filter(None, (item.strip() for item in spec.split(","))):
+        try:
+            application, limit = item.split("=")
+            limits[application.strip()] = int(limit)
+        except ValueError as exc:
+            raise GOBException(f"Invalid application concurrency '{item}', expected <application>=<limit>") from exc
+    return limits
+
+
+def _acquire_slot(slots: list[str]) -> Optional[IO[str]]:
+    """Lock the first free slot.
+
+    :param slots: the lock files of the slots
+    :return: the locked file, None if all slots are in use
+    """
+    for slot in slots:
+        file = open(slot, "a")
+        try:
+            fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            file.close()
+            continue
+        # The process that holds the slot, for diagnostics only
+        file.truncate(0)
+        file.write(str(os.getpid()))
+        file.flush()
+        return file
+    return None
+
+
+@contextmanager
+def application_slot(application: Optional[str]) -> Iterator[bool]:
+    """Acquire a free import slot for the given source application.
+
+    Applications without a concurrency limit always get a slot.
+    The value of the context tells whether a slot has been acquired, the slot is released on exit.
+
+    :param application: the name of the source application
+    :return:
+    """
+    slots = _application_slots.get(application) if application else None
+    if slots is None:
+        yield True
+        return
+
+    if (slot := _acquire_slot(slots)) is None:
+        yield False
+        return
+
+    try:
+        yield True
+    finally:
+        # Closing the file releases the lock
+        slot.close()
+
+
+def requeue(msg: dict[str, Any]) -> None:
+    """Publish an import request again, the import is started by the worker that finds a free slot.
+
+    :param msg: the import request
+    :return:
+    """
+    header = msg["header"]
+    if not header.get("requeued"):
+        logger.info(f"Maximum number of concurrent imports from {header['application']} reached, import requeued")
+    header["requeued"] = True
+    publish(WORKFLOW_EXCHANGE, IMPORT, msg)
+
+
+def _terminate(signum: int, frame: Any) -> None:
+    """Exit on a termination signal, so that the worker pool stops its workers."""
+    raise SystemExit(128 + signum)
+
+
+def run_worker_pool(n_workers: int, target: Callable[..., Any], *args: Any) -> None:
+    """Run target(*args) in n_workers worker processes.
+
+    The workers are (re)started until the pool is interrupted or terminated.
+    A worker that exits, e.g. because it has been killed, is replaced by a new worker.
+
+    :param n_workers: the number of worker processes
+    :param target: the function to run in each worker
+    :param args: the arguments for target
+    :return:
+    """
+    context = multiprocessing.get_context("fork")
+
+    # Create the slots before the workers are forked so that they are shared by all workers
+    slots_dir = tempfile.mkdtemp(prefix="gobimport-slots-")
+    for application, limit in parse_application_concurrency(IMPORT_APPLICATION_CONCURRENCY).items():
+        _application_slots[application] = [os.path.join(slots_dir, f"{application}.{n}") for n in range(limit)]
+
+    # Load the model once, the workers inherit the loaded model
+    get_gob_model()
+
+    workers: list[Optional[BaseProcess]] = [None] * n_workers
+    default_handler = signal.signal(signal.SIGTERM, _terminate)
+    try:
+        while True:
+            for n, worker in enumerate(workers):
+                if worker is None or not worker.is_alive():
+                    workers[n] = _start_worker(context, n, worker, target, args)
+            time.sleep(POLL_INTERVAL)
+    finally:
+        signal.signal(signal.SIGTERM, default_handler)
+        _stop_workers(workers)
+        shutil.rmtree(slots_dir, ignore_errors=True)
+
+
+def _run_worker(target: Callable[..., Any], args: tuple[Any, ...]) -> None:
+    # A worker is terminated by the default handler, the handler of the pool is for the parent process only
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    target(*args)
+
+
+def _start_worker(
+    context: Any, n: int, previous: Optional[BaseProcess], target: Callable[..., Any], args: tuple[Any, ...]
+) -> BaseProcess:
+    if previous is not None:
+        print(f"Import worker {n} exited with exit code {previous.exitcode}, restarting")
+    worker: BaseProcess = context.Process(target=_run_worker, args=(target, args), name=f"import-worker-{n}")
+    worker.start()
+    return worker
+
+
+def _stop_workers(workers: list[Optional[BaseProcess]]) -> None:
+    for worker in workers:
+        if worker is not None and worker.is_alive():
+            worker.terminate()
+            worker.join()
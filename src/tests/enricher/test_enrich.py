@@ -1,6 +1,8 @@
 import unittest
 from unittest import mock
 
+from gobcore.exceptions import GOBException
+
 from gobimport.enricher import BaseEnricher, MeetboutenEnricher, GebiedenEnricher
 
 
@@ -28,3 +30,35 @@ class TestEnricher(unittest.TestCase):
         for entity in self.entities:
             enricher.enrich(entity)
         self.assertListEqual(enricher.enrichers, [])
+
+    def test_catalogue_enricher(self):
+        enricher = BaseEnricher('app', 'meetbouten', 'metingen')
+        self.assertEqual([type(e) for e in enricher.enrichers], [MeetboutenEnricher])
+
+        # Enrichers are only selected for the catalogue of the collection
+        with mock.patch.object(GebiedenEnricher, 'enriches') as mock_enriches:
+            BaseEnricher('app', 'meetbouten', 'metingen')
+            mock_enriches.assert_not_called()
+
+    def test_get_columns(self):
+        enricher = BaseEnricher('app', 'meetbouten', 'metingen')
+        read, added = enricher.get_columns()
+        self.assertEqual({'hoort_bij_meetbout', 'datum', 'hoogte_tov_nap'}, read)
+        self.assertIn('zakking', added)
+
+        self.assertEqual((set(), set()), BaseEnricher('app', 'test', 'test').get_columns())
+
+        # The columns of an enriched collection should be declared
+        with mock.patch.object(MeetboutenEnricher, 'read_columns', {}), self.assertRaises(GOBException):
+            enricher.get_columns()
+
+    def test_depends_on_order(self):
+        self.assertTrue(BaseEnricher('app', 'meetbouten', 'metingen').depends_on_order())
+        self.assertFalse(BaseEnricher('app', 'gebieden', 'buurten').depends_on_order())
+        self.assertFalse(BaseEnricher('app', 'test', 'test').depends_on_order())
+
+    def test_unknown_enricher(self):
+        import gobimport.enricher
+
+        with self.assertRaises(AttributeError):
+            gobimport.enricher.UnknownEnricher
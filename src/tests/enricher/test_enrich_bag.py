@@ -65,3 +65,7 @@ class TestBAGEnrichment(unittest.TestCase):
 
         # Expect a invalid BAG collection to not be enriched
         self.assertFalse(BAGEnricher.enriches("test", "bag", "testcollection"))
+
+    def test_get_columns(self):
+        enricher = BAGEnricher("app", "bag", "verblijfsobjecten")
+        self.assertEqual(({"fng_code", "pandidentificatie"}, {"fng_omschrijving"}), enricher.get_columns())
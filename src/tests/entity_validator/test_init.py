@@ -21,7 +21,7 @@ class TestEntityValidator(unittest.TestCase):
              patch.object(StateValidator, 'result', lambda *args: True), \
              patch.object(GebiedenValidator, 'result', lambda *args: False), \
              self.assertRaises(GOBException):
-            validator = EntityValidator("catalog", "collection", "id")
+            validator = EntityValidator("gebieden", "collection", "id")
             validator.result()
 
         with patch.object(StateValidator, 'validates', lambda *args: True), \
@@ -29,7 +29,7 @@ class TestEntityValidator(unittest.TestCase):
              patch.object(StateValidator, 'result', lambda *args: False), \
              patch.object(GebiedenValidator, 'result', lambda *args: True), \
              self.assertRaises(GOBException):
-            validator = EntityValidator("catalog", "collection", "id")
+            validator = EntityValidator("gebieden", "collection", "id")
             validator.result()
 
     def test_entity_validate(self):
@@ -37,16 +37,24 @@ class TestEntityValidator(unittest.TestCase):
              patch.object(StateValidator, 'validate', lambda *args, **kwargs: True), \
              patch.object(GebiedenValidator, 'validates', lambda *args: True), \
              patch.object(GebiedenValidator, 'validate', lambda *args, **kwargs: False):
-            validator = EntityValidator("catalog", "collection", "id")
+            validator = EntityValidator("gebieden", "collection", "id")
             self.assertEqual(len(validator.validators), 2)
             self.assertIsNone(validator.validate("collection"))
 
     @patch("gobimport.entity_validator.StateValidator", MagicMock())
     @patch("gobimport.entity_validator.GebiedenValidator", MagicMock())
     def test_validate_kwarg(self):
-        validator = EntityValidator("catalog", "collection", "id")
+        validator = EntityValidator("gebieden", "collection", "id")
         validator.validate("collection", custom_kwarg="kwarg1")
 
         self.assertEqual(2, len(validator.validators))
         for val in validator.validators:
             val.validate.assert_called_with("collection", custom_kwarg="kwarg1")
+
+    def test_catalogue_validators(self):
+        with patch.object(StateValidator, 'validates', lambda *args: False):
+            validator = EntityValidator("catalog", "collection", "id")
+            self.assertEqual(validator.validators, [])
+
+            validator = EntityValidator("bag", "verblijfsobjecten", "id")
+            self.assertEqual([type(v).__name__ for v in validator.validators], ["BAGValidator"])
@@ -0,0 +1,85 @@
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from gobimport.checkpoint import Checkpoint
+
+
+class Component:
+
+    checkpoint_attributes = ("a", "b")
+
+    def __init__(self):
+        self.a = set()
+        self.b = 0
+        self.c = "not saved"
+
+
+class TestCheckpoint(TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.patcher = patch("gobimport.checkpoint.CHECKPOINT_DIR", self.tmpdir.name)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.tmpdir.cleanup()
+
+    def test_init(self):
+        checkpoint = Checkpoint("name", {"key": "id"})
+        self.assertEqual("id", checkpoint.key)
+        self.assertEqual(1_000_000, checkpoint.interval)
+        self.assertEqual(24, checkpoint.max_age)
+        self.assertFalse(checkpoint.resumable)
+        self.assertIsNone(checkpoint.last_key)
+
+    def test_save_restore(self):
+        component = Component()
+        checkpoint = Checkpoint("name", {"key": "id", "interval": 2})
+        with checkpoint:
+            checkpoint.write({"id": 1})
+            checkpoint.write({"id": 2})
+            component.a.add(2)
+            component.b = 2
+            checkpoint.save(2, 2, {"component": component})
+            # Spooled after the checkpoint, dropped on resume
+            checkpoint.write({"id": 3})
+
+        # Resume
+        checkpoint = Checkpoint("name", {"key": "id", "interval": 2})
+        self.assertTrue(checkpoint.resumable)
+        self.assertEqual(2, checkpoint.last_key)
+
+        component = Component()
+        component.c = "other"
+        self.assertEqual(2, checkpoint.restore({"component": component}))
+        self.assertEqual({2}, component.a)
+        self.assertEqual(2, component.b)
+        self.assertEqual("other", component.c)
+
+        write = MagicMock()
+        with checkpoint:
+            checkpoint.write({"id": 4})
+            checkpoint.finish()
+            self.assertFalse(checkpoint.resumable)
+            checkpoint.replay(write)
+        self.assertEqual([({"id": 1},), ({"id": 2},), ({"id": 4},)], [args for args, _ in write.call_args_list])
+
+        checkpoint.remove()
+        self.assertEqual([], os.listdir(self.tmpdir.name))
+        self.assertFalse(Checkpoint("name", {"key": "id"}).resumable)
+
+    @patch("gobimport.checkpoint.time.time")
+    def test_max_age(self, mock_time):
+        checkpoint = Checkpoint("name", {"key": "id", "max_age": 1})
+        with checkpoint:
+            checkpoint.save(1, 1, {})
+
+        mock_time.return_value = os.path.getmtime(checkpoint.state_file) + 3599
+        self.assertTrue(Checkpoint("name", {"key": "id", "max_age": 1}).resumable)
+
+        mock_time.return_value = os.path.getmtime(checkpoint.state_file) + 3601
+        self.assertFalse(Checkpoint("name", {"key": "id", "max_age": 1}).resumable)
+        self.assertEqual([], os.listdir(self.tmpdir.name))
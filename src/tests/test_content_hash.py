@@ -0,0 +1,110 @@
+import datetime
+import json
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from gobimport.content_hash import HashStore, entity_hash
+
+
+class TestContentHash(TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.patcher = patch("gobimport.content_hash.HASH_DIR", self.tmpdir.name)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.tmpdir.cleanup()
+
+    def test_entity_hash(self):
+        entity = {"a": 1, "b": datetime.date(2020, 1, 1)}
+        self.assertEqual(entity_hash(entity), entity_hash({"b": datetime.date(2020, 1, 1), "a": 1}))
+        self.assertNotEqual(entity_hash(entity), entity_hash({**entity, "a": 2}))
+
+    def _import(self, entities, full=True, commit=True, confirm=True, contents="contents"):
+        hash_store = HashStore("name", full=full)
+        write = MagicMock()
+        suppressed_write = hash_store.suppress_unchanged(write)
+        for entity in entities:
+            suppressed_write(entity)
+        if commit:
+            hash_store.commit(os.path.join(self.tmpdir.name, contents))
+        else:
+            hash_store.connection.close()
+        if confirm:
+            # The workflow confirms the import in the request of the next import
+            self._confirm(contents)
+        return [args[0] for args, _ in write.call_args_list], hash_store.n_unchanged
+
+    def _confirm(self, contents):
+        hash_store = HashStore("name", full=False)
+        hash_store.confirm(os.path.join(self.tmpdir.name, contents))
+        hash_store.connection.close()
+
+    def test_suppress_unchanged(self):
+        e1 = {"_source_id": "1", "a": 1}
+        e2 = {"_source_id": "2", "a": 2}
+        no_id = {"_source_id": None, "a": 3}
+
+        self.assertEqual(([e1, e2, no_id], 0), self._import([e1, e2, no_id]))
+        self.assertEqual(([no_id], 2), self._import([e1, e2, no_id]))
+
+        # Changed entity
+        e2_changed = {"_source_id": "2", "a": 22}
+        self.assertEqual(([e2_changed], 1), self._import([e1, e2_changed]))
+
+        # A failed import does not update the hashes
+        self.assertEqual(([e2], 1), self._import([e1, e2], commit=False))
+        self.assertEqual(([e2], 1), self._import([e1, e2], full=False))
+
+        # Partial import keeps the other hashes
+        self.assertEqual(([], 1), self._import([e1]))  # full import, drops e2
+        self.assertEqual(([e2], 0), self._import([e2], full=False))
+        self.assertEqual(([], 2), self._import([e1, e2]))
+
+        # A full import reports the entities that have not been read as deleted
+        hash_store = HashStore("name", full=True)
+        hash_store.suppress_unchanged(MagicMock())(e1)
+        contents = os.path.join(self.tmpdir.name, "deleted")
+        hash_store.commit(contents)
+        self.assertEqual(1, hash_store.n_deleted)
+        self.assertEqual(f"{contents}.deleted", hash_store.deleted_filename)
+        with open(hash_store.deleted_filename) as file:
+            self.assertEqual(["2"], json.load(file))
+
+        # Other imports do not read all entities
+        hash_store = HashStore("name", full=False)
+        hash_store.commit(contents)
+        self.assertEqual(0, hash_store.n_deleted)
+        with open(hash_store.deleted_filename) as file:
+            self.assertEqual([], json.load(file))
+
+        # A delete import clears the hashes
+        self._import([e1, e2], confirm=False, contents="pending")
+        HashStore("name", full=False).clear()
+        self._confirm("pending")
+        self.assertEqual(([e1, e2], 0), self._import([e1, e2]))
+
+    def test_confirm(self):
+        e1 = {"_source_id": "1", "a": 1}
+        e2 = {"_source_id": "2", "a": 2}
+
+        self._import([e1, e2], contents="c1")
+
+        # The hashes of an import are pending until the workflow confirms the import
+        e1_changed = {"_source_id": "1", "a": 11}
+        self.assertEqual(([e1_changed], 0), self._import([e1_changed], confirm=False, contents="c2"))
+        self.assertEqual(([e1_changed], 1), self._import([e1_changed, e2], confirm=False, contents="c3"))
+
+        # Confirming an import drops the pending hashes of earlier imports
+        self._confirm("c3")
+        self._confirm("c2")
+        self.assertEqual(([], 2), self._import([e1_changed, e2], confirm=False))
+
+        # A confirmed full import replaces all hashes, a confirmed partial import updates them
+        self._import([e1], contents="c4")
+        self.assertEqual(([e2], 0), self._import([e2], full=False, contents="c5"))
+        self.assertEqual(([], 2), self._import([e1, e2], confirm=False))
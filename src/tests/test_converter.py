@@ -1,13 +1,17 @@
+import datetime
 import unittest
 from unittest import mock
 from decimal import Decimal
 
 from gobcore.model.metadata import FIELD
 from gobcore.exceptions import GOBException, GOBTypeException
+from gobcore.typesystem import get_gob_type_from_info, get_value
 
 from gobimport import gob_model
-from gobimport.converter import _apply_filters, _extract_references, _is_object_reference, _split_object_reference, \
-                                Converter, _json_safe_value, _get_value, _clean_references, _extract_field, _goblike_row, MappinglessConverterAdapter
+from gobimport.converter import _compile_filters, _extract_references, _is_object_reference, _split_object_reference, \
+                                Converter, _json_safe_value, _resolve_source, _clean_references, _goblike_row, MappinglessConverterAdapter, \
+                                get_mappingless_converter, _compile_field_filters, _parse_references, ReferenceSource, \
+                                LITERAL, COLUMN, SPLIT, OBJECT_ATTRIBUTE, FieldConverter
 from tests.fixtures import random_string
 
 
@@ -16,19 +20,19 @@ class TestConverter(unittest.TestCase):
     def setUp(self):
         pass
 
-    def test_apply_filters(self):
+    def test_compile_filters(self):
         filters = [
             ["re.sub", "a", "b"],
             ["upper"]
         ]
-        result = _apply_filters("a", filters)
+        result = _compile_filters(filters)("a")
         self.assertEqual(result, "B")
 
         filters = [
             ["upper"],
             ["re.sub", "a", "b"],
         ]
-        result = _apply_filters("a", filters)
+        result = _compile_filters(filters)("a")
         self.assertEqual(result, "A")
 
         filters = [
@@ -36,7 +40,29 @@ class TestConverter(unittest.TestCase):
             ["re.sub", "a", "b"],
         ]
         with self.assertRaises(GOBException):
-            result = _apply_filters("a", filters)
+            _compile_filters(filters)
+
+    def test_compile_field_filters(self):
+        self.assertIsNone(_compile_field_filters({'source_mapping': 'col'}))
+
+        field_filter = _compile_field_filters({'filters': [['re.sub', '^0+', ''], ['upper']]})
+        self.assertEqual('1A', field_filter('001a'))
+        self.assertEqual('2B', field_filter('002b'))
+
+        field_filter = _compile_field_filters({'filters': {'bronwaarde': [['upper']]}})
+        self.assertEqual({'bronwaarde': 'A', 'broninfo': 'b'}, field_filter({'bronwaarde': 'a', 'broninfo': 'b'}))
+
+        with self.assertRaises(GOBException):
+            _compile_field_filters({'filters': {'bronwaarde': [['lower']]}})
+
+    @mock.patch("gobimport.converter.gob_model", mock.MagicMock(spec_set=gob_model))
+    def test_converter_unknown_filter(self):
+        # Unknown filters raise when the converter is created, not on the first row
+        with self.assertRaises(GOBException):
+            Converter("catalog", "entity", {
+                "gob_mapping": {"code": {"source_mapping": "code", "filters": [["lower"]]}},
+                "source": {"entity_id": "id"}
+            })
 
 
     def test_is_object_reference(self):
@@ -73,15 +99,15 @@ class TestConverter(unittest.TestCase):
             for testcase in invalid_testcases:
                 _split_object_reference(testcase)
 
-    def test_get_value(self):
+    def test_resolve_source(self):
         valid_testcase = (
-            ({'row':{'field': 'value'}, 'field':'field'}, 'value'),
-            ({'row':{}, 'field':'=field'}, 'field'),
-            ({'row':{'field': {'nested_field': 'value'}}, 'field':'field.nested_field'}, {'nested_field': 'value'}),
+            ('field', ('field', None)),
+            ('=field', (None, 'field')),
+            ('field.nested_field', ('field', None)),
         )
 
         for testcase, result in valid_testcase:
-            self.assertEqual(result, _get_value(testcase['row'], testcase['field']), f"Case {testcase} should return {result}")
+            self.assertEqual(result, _resolve_source(testcase), f"Case {testcase} should return {result}")
 
     def test_extract_references_bronwaarde_object_ref(self):
         row = {
@@ -125,6 +151,22 @@ class TestConverter(unittest.TestCase):
         }]
         self.assertEqual(expected_result, result)
 
+    def test_parse_references(self):
+        self.assertEqual([
+            ReferenceSource('bronwaarde', LITERAL, 'value'),
+            ReferenceSource('begin_geldigheid', COLUMN, 'col'),
+            ReferenceSource('code', OBJECT_ATTRIBUTE, 'json_col', 'attr'),
+        ], _parse_references({'bronwaarde': '=value', 'begin_geldigheid': 'col', 'code': 'json_col.attr'}))
+
+        self.assertEqual([
+            ReferenceSource('bronwaarde', SPLIT, 'col', None, ';'),
+        ], _parse_references({'bronwaarde': 'col', 'format': {'split': ';'}}))
+
+        # The parsed mapping is used instead of the source mapping
+        sources = _parse_references({'bronwaarde': 'col'})
+        result = _extract_references({'col': 'a', 'other': 'b'}, {'bronwaarde': 'other'}, 'GOB.Reference', False, sources)
+        self.assertEqual({'bronwaarde': 'a'}, result)
+
     def test_extract_references_json_force_list(self):
         row = {
             "id": random_string(),
@@ -228,6 +270,29 @@ class TestConverter(unittest.TestCase):
         self.assertEqual(expected_result, result)
 
 
+    def test_extract_cleaned_references(self):
+        row = {
+            'col': 'a;b;a',
+            'date': '2020-01-01',
+            'other': ['x', 'y'],
+            'json_col': [{'code': 1, 'name': 'one'}, {'code': 2, 'name': 'two'}],
+            'obj_col': {'code': 3, 'name': 'three'},
+            'dec': Decimal('1.5'),
+        }
+        testcases = [
+            ({'bronwaarde': 'col', 'format': {'split': ';'}}, 'GOB.ManyReference'),
+            ({'bronwaarde': 'other', 'extra': 'other', 'begin_geldigheid': '=2020'}, 'GOB.ManyReference'),
+            ({'bronwaarde': 'json_col.code', 'extra': 'other'}, 'GOB.ManyReference'),
+            ({'bronwaarde': 'obj_col.code', 'begin_geldigheid': 'date', 'extra': 'dec'}, 'GOB.Reference'),
+            ({'bronwaarde': 'col'}, 'GOB.Reference'),
+            ({'extra': 'missing'}, 'GOB.Reference'),
+        ]
+        # References are built cleaned in one pass, the result equals extracting and then cleaning the references
+        for field_source, field_type in testcases:
+            expected_result = _clean_references(_extract_references(row, field_source, field_type))
+            result = _extract_references(row, field_source, field_type, clean=True)
+            self.assertEqual(expected_result, result, field_source)
+
     def test_clean_reference_without_other_values(self):
         reference = {
             'bronwaarde': random_string(),
@@ -267,7 +332,6 @@ class TestConverter(unittest.TestCase):
 
 
     @mock.patch("gobimport.converter._json_safe_value", lambda x: 'safe ' + x)
-    @mock.patch("gobimport.converter._get_value", lambda x, y: x[y])
     def test_extract_references_not_many(self):
         row = {
             "rowkey a": "val a",
@@ -298,8 +362,9 @@ class TestConverter(unittest.TestCase):
         for arg, result in testcases:
             self.assertEqual(result, _json_safe_value(arg))
 
-    @mock.patch("gobimport.converter.gob_model", mock.MagicMock(spec_set=gob_model))
-    def test_convert(self):
+    @mock.patch("gobimport.converter.gob_model", spec_set=gob_model)
+    def test_convert(self, mock_model):
+        mock_model.has_states.return_value = False
         row = {
             "id": random_string(),
             "name": random_string(),
@@ -319,11 +384,100 @@ class TestConverter(unittest.TestCase):
         converter = Converter("catalog", "entity", {
             "gob_mapping": {},
             "source": {
-                "entity_id": "any entity id"
+                "entity_id": "id"
             }
         })
         result = converter.convert(row)
-        self.assertEqual(result, {"_source_id": mock.ANY})
+        self.assertEqual(result, {"_source_id": row["id"]})
+
+    @mock.patch("gobimport.converter.gob_model", spec_set=gob_model)
+    def test_convert_gob_types(self, mock_model):
+        # Values that are converted by a fast path equal the values that are converted by the GOB types
+        fields = {
+            "string": {"type": "GOB.String"},
+            "integer": {"type": "GOB.Integer"},
+            "date": {"type": "GOB.Date"},
+            "datetime": {"type": "GOB.DateTime"},
+            "boolean": {"type": "GOB.Boolean"},
+        }
+        mock_model.__getitem__.return_value = {"collections": {"entity": {"all_fields": fields}}}
+        mock_model.has_states.return_value = False
+        converter = Converter("catalog", "entity", {
+            "gob_mapping": {field: {"source_mapping": field} for field in fields},
+            "source": {"entity_id": "string"}
+        })
+
+        rows = [
+            {
+                "string": "abc",
+                "integer": 12,
+                "date": datetime.date(2020, 1, 31),
+                "datetime": datetime.datetime(2020, 1, 31, 10, 11, 12, 13),
+                "boolean": True,
+            },
+            {
+                "string": "",
+                "integer": 0,
+                "date": datetime.date(1900, 1, 1),
+                "datetime": datetime.datetime(2020, 1, 31),
+                "boolean": False,
+            },
+            {
+                "string": "12",
+                "integer": "12",
+                "date": None,
+                "datetime": None,
+                "boolean": None,
+            },
+        ]
+        for row in rows:
+            expected = {
+                field: get_value(get_gob_type_from_info(typeinfo).from_value_secure(row[field], typeinfo))
+                for field, typeinfo in fields.items()
+            }
+            result = converter.convert(row)
+            self.assertEqual({**expected, "_source_id": row["string"]}, result)
+            for field in fields:
+                self.assertIs(type(expected[field]), type(result[field]), f"Field {field} of {row}")
+
+    @mock.patch("gobimport.converter.gob_model", spec_set=gob_model)
+    def test_get_source_id(self, mock_model):
+        input_spec = {"gob_mapping": {}, "source": {"entity_id": "id"}}
+        row = {"id": 1, "volgnummer": 2, "seqnr": 3}
+
+        mock_model.has_states.return_value = False
+        self.assertEqual("1", Converter("catalog", "entity", input_spec).get_source_id(row))
+        mock_model.has_states.assert_called_with("catalog", "entity")
+
+        mock_model.has_states.return_value = True
+        self.assertEqual("1.2", Converter("catalog", "entity", input_spec).get_source_id(row))
+
+        input_spec["gob_mapping"]["volgnummer"] = {"source_mapping": "seqnr"}
+        self.assertEqual("1.3", Converter("catalog", "entity", input_spec).get_source_id(row))
+
+    @mock.patch("gobimport.converter.gob_model", spec_set=gob_model)
+    def test_get_columns(self, mock_model):
+        mock_model.__getitem__.return_value = {"collections": {"entity": {"all_fields": {
+            "code": {"type": "GOB.String"},
+            "naam": {"type": "GOB.String"},
+            "ref": {"type": "GOB.Reference"},
+        }}}}
+        input_spec = {
+            "gob_mapping": {
+                "code": {"source_mapping": "code"},
+                "naam": {"source_mapping": "=literal"},
+                "ref": {"source_mapping": {"bronwaarde": "json.attr", "code": "=literal", "extra": "extra_column"}},
+            },
+            "source": {"entity_id": "id"}
+        }
+
+        mock_model.has_states.return_value = False
+        self.assertEqual({"id", "code", "json", "extra_column"},
+                         Converter("catalog", "entity", input_spec).get_columns())
+
+        mock_model.has_states.return_value = True
+        self.assertEqual({"id", "code", "json", "extra_column", "volgnummer"},
+                         Converter("catalog", "entity", input_spec).get_columns())
 
     def test_goblike_row(self):
         entity_id_field = 'entity_id field'
@@ -387,12 +541,14 @@ class TestConverter(unittest.TestCase):
         result = _extract_references(row, source, field_type)
         self.assertEqual(result, [{'bronwaarde': 'aap'}, {'bronwaarde': 'mies'}, {'bronwaarde': 'noot'}])
 
+class TestFieldConverter(unittest.TestCase):
+
     @mock.patch('gobimport.converter.logger')
     @mock.patch('gobimport.converter.get_gob_type_from_info')
-    @mock.patch('gobimport.converter._get_value')
-    def test_extract_field(self, mock_get_value, mock_get_gob_type_from_info, mock_logger):
+    def test_convert(self, mock_get_gob_type_from_info, mock_logger):
         row = {
             '_id': '12345',
+            'any mapping': 'any value',
         }
         field = 'f'
         metadata = {
@@ -401,23 +557,78 @@ class TestConverter(unittest.TestCase):
         typeinfo = {
             'type': 'any type'
         }
-        # Implementation test of extract field
         mock_gob_type = mock.MagicMock()
         mock_get_gob_type_from_info.return_value = mock_gob_type
-        result = _extract_field(row, field, metadata, typeinfo)
+        result = FieldConverter(field, metadata, typeinfo).convert(row)
         self.assertEqual(result, mock_gob_type.from_value_secure.return_value)
-        mock_get_value.assert_called_with(row, metadata['source_mapping'])
-        mock_gob_type.from_value_secure.assert_called_with(mock_get_value.return_value, typeinfo)
+        mock_gob_type.from_value_secure.assert_called_with('any value', typeinfo)
 
         # Behaviour test, if GOB Type conversion fails a data error should be reported
         # And a GOB Type None value should be returned
         mock_gob_type.from_value_secure.side_effect = [GOBTypeException(), None]
-        result = _extract_field(row, field, metadata, typeinfo)
+        result = FieldConverter(field, metadata, typeinfo).convert(row)
         self.assertEqual(result, None)
 
         # Assert error is generated
         mock_logger.error.assert_called_once()
 
+    @mock.patch('gobimport.converter.get_gob_type_from_info')
+    def test_fast_path(self, mock_get_gob_type_from_info):
+        gob_type = mock_get_gob_type_from_info.return_value
+        testcases = [
+            ('GOB.String', 'abc', True),
+            ('GOB.String', 1, False),
+            ('GOB.Integer', 1, True),
+            ('GOB.Integer', True, False),
+            ('GOB.Integer', '1', False),
+            ('GOB.Boolean', False, True),
+            ('GOB.Date', datetime.date(2020, 1, 31), True),
+            ('GOB.Date', datetime.datetime(2020, 1, 31), False),
+            ('GOB.DateTime', datetime.datetime(2020, 1, 31, 12), True),
+            ('GOB.DateTime', datetime.datetime(2020, 1, 31, 12, tzinfo=datetime.timezone.utc), False),
+            ('GOB.DateTime', None, True),
+            ('GOB.Decimal', Decimal('1.5'), False),
+            ('GOB.SecureString', 'abc', False),
+        ]
+        for field_type, value, is_fast in testcases:
+            gob_type.reset_mock()
+            typeinfo = {'type': field_type}
+            field_converter = FieldConverter('f', {'source_mapping': 'col'}, typeinfo)
+            result = field_converter.convert({'col': value})
+            if is_fast:
+                self.assertEqual(value, result)
+                gob_type.from_value_secure.assert_not_called()
+            else:
+                self.assertEqual(gob_type.from_value_secure.return_value, result)
+                gob_type.from_value_secure.assert_called_with(value, typeinfo)
+
+        # Conversion arguments disable the fast path
+        field_converter = FieldConverter('f', {'source_mapping': 'col', 'format': '%Y'}, {'type': 'GOB.String'})
+        self.assertEqual(gob_type.from_value_secure.return_value, field_converter.convert({'col': '2020'}))
+
+        # Filters are applied before the value is converted
+        field_converter = FieldConverter('f', {'source_mapping': 'col', 'filters': [['upper']]}, {'type': 'GOB.String'})
+        self.assertEqual('ABC', field_converter.convert({'col': 'abc'}))
+
+
+    @mock.patch('gobimport.converter.get_gob_type_from_info', mock.MagicMock())
+    def test_extract(self):
+        row = {'col': 'value', 'json': [{'attr': 'a'}]}
+        testcases = [
+            ('col', 'col', None, 'value'),
+            ('=literal', None, 'literal', 'literal'),
+            ('json.attr', 'json', None, [{'attr': 'a'}]),
+            ('missing', 'missing', None, None),
+        ]
+        for source_mapping, column, literal, value in testcases:
+            field_converter = FieldConverter('f', {'source_mapping': source_mapping}, {'type': 'GOB.String'})
+            self.assertEqual((column, literal), (field_converter.column, field_converter.literal))
+            self.assertEqual(value, field_converter.extract(row))
+
+        field_converter = FieldConverter('f', {'source_mapping': {'bronwaarde': 'col'}}, {'type': 'GOB.Reference'})
+        self.assertIsNone(field_converter.column)
+        self.assertEqual({'bronwaarde': 'value'}, field_converter.extract(row))
+
 
 class TestMappinglessConverterAdapter(unittest.TestCase):
 
@@ -461,3 +672,30 @@ class TestMappinglessConverterAdapter(unittest.TestCase):
         res = c.convert({'some': 'row'})
         self.assertEqual(c.converter.convert.return_value, res)
         c.converter.convert.assert_called_with({'some': 'row'})
+
+        # .. and convert many
+        c.converter.convert.side_effect = lambda row: row['some']
+        self.assertEqual(['row', 'other row'], c.convert_many([{'some': 'row'}, {'some': 'other row'}]))
+
+
+class TestGetMappinglessConverter(unittest.TestCase):
+
+    def setUp(self):
+        get_mappingless_converter.cache_clear()
+
+    def tearDown(self):
+        get_mappingless_converter.cache_clear()
+
+    @mock.patch("gobimport.converter.MappinglessConverterAdapter")
+    def test_get_mappingless_converter(self, mock_adapter):
+        mock_adapter.side_effect = lambda *args: mock.MagicMock()
+
+        adapter = get_mappingless_converter('the cat', 'the col', 'attr')
+        mock_adapter.assert_called_once_with('the cat', 'the col', 'attr')
+
+        # The adapter is constructed only once per collection
+        self.assertIs(adapter, get_mappingless_converter('the cat', 'the col', 'attr'))
+        mock_adapter.assert_called_once()
+
+        self.assertIsNot(adapter, get_mappingless_converter('the cat', 'the col', 'other attr'))
+        self.assertEqual(mock_adapter.call_count, 2)
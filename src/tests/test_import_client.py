@@ -1,10 +1,14 @@
+from contextlib import nullcontext
 from unittest import TestCase
 from unittest.mock import MagicMock, patch, call, mock_open
 
 from gobcore.enum import ImportMode
+from gobcore.exceptions import GOBException
 
 from gobimport import gob_model
 from gobimport.import_client import ImportClient
+from gobimport.issues import issue_aggregator
+from gobimport.quarantine import Quarantine
 from tests import fixtures
 
 
@@ -89,48 +93,98 @@ class TestImportClient(TestCase):
 
         _self = MagicMock()
         _self.logger = MagicMock()
-        _self.injector.inject = MagicMock()
-        _self.merger = MagicMock()
-        _self.converter = MagicMock()
-        entity = 'Entity'
-        _self.converter.convert.return_value = entity
         _self.validator = MagicMock()
         ImportClient.import_rows(_self, write, progress)
         _self.logger.info.assert_called()
-        self.assertEqual(_self.injector.inject.call_args_list, [call(c) for c in rows])
-        self.assertEqual(_self.merger.merge.call_args_list, [call(c, write) for c in rows])
-        self.assertEqual(_self.converter.convert.call_args_list, [call(c) for c in rows])
-        self.assertEqual(_self.validator.validate.call_args_list, [call(entity) for c in rows])
-        self.assertEqual(write.call_args_list, [call(entity) for c in rows])
+        guard = _self.quarantine.guard
+        self.assertEqual(_self._import_row.call_args_list, [call(c, write, guard) for c in rows])
 
         _self.validator.result.called_once_with()
         self.assertEqual(len(_self.logger.info.call_args_list), 3)
 
         mock_reader.__exit__.assert_called()
 
+        # Without quarantine the rows are not guarded
+        _self.quarantine = None
+        ImportClient.import_rows(_self, write, progress)
+        _self._import_row.assert_called_with(rows[-1], write, nullcontext)
+
         # exception
         mock_reader.reset_mock()
-        _self.injector.inject.side_effect = Exception
+        _self._import_row.side_effect = Exception
         with self.assertRaises(Exception):
             ImportClient.import_rows(_self, write, progress)
         mock_reader.__exit__.assert_called()
 
-    @patch('gobimport.import_client.Reader')
-    def test_import_rows_merged(self, mock_Reader):
-        mock_reader = MagicMock()
-        mock_Reader.return_value = mock_reader
-        rows = ((1, 2), (3, 4))
-        mock_reader.__enter__.return_value.read.return_value = rows
-
-        progress = MagicMock()
+    def test_import_row(self):
+        row = {'id': 1}
         write = MagicMock()
 
+        _self = MagicMock()
+        entity = 'Entity'
+        _self.converter.convert.return_value = entity
+        _self.merger.merge.side_effect = lambda row, write: write('Merged entity')
+        ImportClient._import_row(_self, row, write, nullcontext)
+        _self.injector.inject.assert_called_with(row)
+        _self.enricher.enrich.assert_called_with(row)
+        _self.merger.merge.assert_called_with(row, write)
+        _self.converter.convert.assert_called_with(row)
+        _self.validator.validate.assert_called_with(entity)
+        _self.entity_validator.validate.assert_called_with(entity, merged=_self.merger.is_merged.return_value)
+        self.assertEqual([call('Merged entity'), call(entity)], write.call_args_list)
+        _self.watermark.update.assert_called_with(row)
+
+        _self.watermark = None
+        ImportClient._import_row(_self, row, write, nullcontext)
+
+        # exception
+        _self.injector.inject.side_effect = Exception
+        with self.assertRaises(Exception):
+            ImportClient._import_row(_self, row, write, nullcontext)
+
+    def test_import_row_quarantine(self):
+        rows = [{'id': 1}, {'id': 2}, {'id': 3}]
+
+        write = MagicMock()
+        _self = MagicMock()
+        _self.merger.merge.side_effect = lambda row, write: write(f"Merged {row['id']}")
+        _self.merger.release.side_effect = lambda row, write: write(f"Released {row['id']}")
+        _self.converter.convert.side_effect = lambda row: 1 / (row['id'] - 2)
+        quarantine = Quarantine('filename', {})
+        quarantine.add = MagicMock()
+
+        for row in rows:
+            ImportClient._import_row(_self, row, write, quarantine.guard)
+
+        # The failing row is not written or validated, the entity that it has been merged with is released
+        self.assertEqual(
+            [call('Merged 1'), call(-1.0), call('Merged 2'), call('Released 2'), call('Merged 3'), call(1.0)],
+            write.call_args_list)
+        _self.merger.release.assert_called_once_with(rows[1], write)
+        self.assertEqual([call(-1.0), call(1.0)], _self.validator.validate.call_args_list)
+        self.assertEqual([call(rows[0]), call(rows[2])], _self.watermark.update.call_args_list)
+        quarantine.add.assert_called_once()
+        self.assertEqual({'id': 2}, quarantine.add.call_args[0][0])
+
+        # A row that fails to be enriched is not merged
+        _self.merger.merge.reset_mock()
+        _self.enricher.enrich.side_effect = ValueError
+        ImportClient._import_row(_self, rows[0], write, quarantine.guard)
+        _self.merger.merge.assert_not_called()
+        self.assertEqual(2, quarantine.add.call_count)
+        _self.enricher.enrich.side_effect = None
+
+        # Without quarantine the first failing row aborts the import
+        with self.assertRaises(ZeroDivisionError):
+            ImportClient._import_row(_self, rows[1], write, nullcontext)
+
+    def test_import_row_merged(self):
         _self = MagicMock()
         _self.converter.convert.return_value = 'Entity'
 
         _self.merger.is_merged = lambda x: True
 
-        ImportClient.import_rows(_self, write, progress)
+        ImportClient._import_row(_self, (1, 2), MagicMock(), nullcontext)
         _self.entity_validator.validate.assert_called_with("Entity", merged=True)
 
     @patch('gobimport.import_client.Reader')
@@ -164,6 +218,9 @@ class TestImportClient(TestCase):
         writer.write = 'write'
         progress = MagicMock()
         mock_ProgressTicker.return_value.__enter__.return_value = progress
+        _self._profile_memory.side_effect = nullcontext
+        _self._get_checkpoint.return_value = None
+        _self._get_hash_store.return_value = None
 
         ImportClient.import_dataset(_self)
 
@@ -173,6 +230,300 @@ class TestImportClient(TestCase):
         _self.import_rows.assert_called_once_with('write', progress)
         _self.merger.finish.assert_called_once_with('write')
         _self.entity_validator.result.assert_called_once()
+        self.assertEqual(_self._get_watermark.return_value, _self.watermark)
+        _self.watermark.save.assert_called_once()
+        _self._get_quarantine.assert_called_once_with(filename)
+        _self.quarantine.result.assert_called_once_with(_self.logger)
+
+    @patch('gobimport.import_client.ContentsWriter')
+    @patch('gobimport.import_client.ProgressTicker')
+    def test_import_dataset_checkpoint(self, mock_ProgressTicker, mock_ContentsWriter):
+        _self = MagicMock()
+        writer = MagicMock()
+        mock_ContentsWriter.return_value.__enter__.return_value = writer
+        progress = MagicMock()
+        mock_ProgressTicker.return_value.__enter__.return_value = progress
+        _self._profile_memory.side_effect = nullcontext
+        checkpoint = _self._get_checkpoint.return_value
+        _self._get_hash_store.return_value = None
+
+        ImportClient.import_dataset(_self)
+
+        checkpoint.__enter__.assert_called_once()
+        _self.import_rows.assert_called_once_with(checkpoint.write, progress, checkpoint)
+        checkpoint.finish.assert_called_once()
+        checkpoint.replay.assert_called_once_with(writer.write)
+        checkpoint.remove.assert_called_once()
+        _self.merger.finish.assert_called_once_with(writer.write)
+
+    @patch('gobimport.import_client.ContentsWriter')
+    @patch('gobimport.import_client.ProgressTicker')
+    def test_import_dataset_suppress_unchanged(self, mock_ProgressTicker, mock_ContentsWriter):
+        _self = MagicMock()
+        writer = MagicMock()
+        mock_ContentsWriter.return_value.__enter__.return_value = writer
+        progress = MagicMock()
+        mock_ProgressTicker.return_value.__enter__.return_value = progress
+        _self._profile_memory.side_effect = nullcontext
+        _self._get_checkpoint.return_value = None
+        hash_store = _self._get_hash_store.return_value
+
+        ImportClient.import_dataset(_self)
+
+        hash_store.suppress_unchanged.assert_called_once_with(writer.write)
+        write = hash_store.suppress_unchanged.return_value
+        _self.import_rows.assert_called_once_with(write, progress)
+        _self.merger.finish.assert_called_once_with(write)
+        hash_store.commit.assert_called_once_with(writer.filename)
+
+    @patch('gobimport.import_client.Quarantine')
+    def test_get_quarantine(self, mock_Quarantine):
+        logger = MagicMock()
+        client = ImportClient(self.mock_dataset, self.mock_msg, logger)
+        self.assertIsNone(client._get_quarantine('contents'))
+
+        self.mock_dataset['source']['quarantine'] = {'max_errors': 10}
+        client = ImportClient(self.mock_dataset, self.mock_msg, logger)
+        self.assertEqual(mock_Quarantine.return_value, client._get_quarantine('contents'))
+        mock_Quarantine.assert_called_with('contents.quarantine', {'max_errors': 10})
+
+    def test_publish_quarantine(self):
+        logger = MagicMock()
+        logger.get_summary.return_value = {}
+        self.import_client = ImportClient(self.mock_dataset, self.mock_msg, logger)
+        self.import_client.filename = "filename"
+        self.import_client.quarantine = MagicMock(n_errors=3)
+        msg = self.import_client.get_result_msg()
+        self.assertEqual(msg['summary']['num_quarantined'], 3)
+
+    @patch('gobimport.import_client.HashStore')
+    def test_get_hash_store(self, mock_HashStore):
+        logger = MagicMock()
+        client = ImportClient(self.mock_dataset, self.mock_msg, logger)
+        self.assertIsNone(client._get_hash_store())
+
+        self.mock_dataset['source']['suppress_unchanged'] = True
+        client = ImportClient(self.mock_dataset, self.mock_msg, logger, ImportMode.RECENT)
+        self.assertEqual(mock_HashStore.return_value, client._get_hash_store())
+        name = f"{client.catalogue}.{client.entity}.{client.source_app}"
+        mock_HashStore.assert_called_with(name, full=False)
+        mock_HashStore.return_value.confirm.assert_not_called()
+
+        # The workflow confirms the contents of a previous import in the request
+        client.header = {'confirmed_contents_ref': 'contents'}
+        client._get_hash_store()
+        mock_HashStore.return_value.confirm.assert_called_once_with('contents')
+
+        # A delete import clears the hash store
+        mock_HashStore.reset_mock()
+        client._clear_hash_store()
+        mock_HashStore.return_value.clear.assert_called_once()
+
+        client.source['suppress_unchanged'] = False
+        mock_HashStore.reset_mock()
+        client._clear_hash_store()
+        mock_HashStore.assert_not_called()
+
+    def test_publish_delta(self):
+        logger = MagicMock()
+        logger.get_summary.return_value = {}
+        self.import_client = ImportClient(self.mock_dataset, self.mock_msg, logger)
+        self.import_client.n_rows = 10
+        self.import_client.filename = "filename"
+        self.import_client.hash_store = MagicMock(n_unchanged=8, n_deleted=1, deleted_filename="filename.deleted")
+        msg = self.import_client.get_result_msg()
+        self.assertTrue(msg['header']['delta'])
+        self.assertEqual(msg['header']['deleted_ref'], "filename.deleted")
+        self.assertEqual(msg['summary']['num_unchanged'], 8)
+        self.assertEqual(msg['summary']['num_deleted'], 1)
+
+    @patch('gobimport.import_client.get_memory_profiler')
+    def test_profile_memory(self, mock_get_memory_profiler):
+        _self = MagicMock()
+        progress = MagicMock()
+
+        mock_get_memory_profiler.return_value = None
+        with ImportClient._profile_memory(_self, progress) as ticker:
+            self.assertEqual(progress, ticker)
+        mock_get_memory_profiler.assert_called_with(progress, _self._get_accumulators, _self.logger, _self.header)
+        self.assertIsNone(_self.memory_profiler)
+
+        profiler = MagicMock()
+        mock_get_memory_profiler.return_value = profiler
+        self.assertEqual(profiler, ImportClient._profile_memory(_self, progress))
+        self.assertEqual(profiler, _self.memory_profiler)
+
+    @patch('gobimport.import_client.cpu_profile')
+    def test_profile_cpu(self, mock_cpu_profile):
+        _self = MagicMock()
+        _self.header = {}
+        self.assertIsInstance(ImportClient._profile_cpu(_self, 'contents'), nullcontext)
+        mock_cpu_profile.assert_not_called()
+
+        _self.header = {'profile': True}
+        self.assertEqual(mock_cpu_profile.return_value, ImportClient._profile_cpu(_self, 'contents'))
+        mock_cpu_profile.assert_called_with('contents.prof', _self.logger)
+
+    def test_get_accumulators(self):
+        _self = MagicMock()
+        validator = MagicMock(checkpoint_attributes=('primary_keys',))
+        enricher = MagicMock(spec=[])
+        _self._get_checkpoint_components.return_value = {'validator': validator, 'enricher.0': enricher}
+        self.assertEqual({
+            'validator.primary_keys': validator.primary_keys,
+            'merger.merge_items': _self.merger.merge_items,
+            'injector.injections': _self.injector.injections,
+        }, ImportClient._get_accumulators(_self))
+
+    def test_publish_memory_profile(self):
+        logger = MagicMock()
+        logger.get_summary.return_value = {}
+        self.import_client = ImportClient(self.mock_dataset, self.mock_msg, logger)
+        self.import_client.filename = "filename"
+        self.import_client.memory_profiler = MagicMock(summary={'peak_memory': 1})
+        msg = self.import_client.get_result_msg()
+        self.assertEqual(msg['summary']['memory_profile'], {'peak_memory': 1})
+
+    def test_publish_issues(self):
+        logger = MagicMock()
+        logger.get_summary.return_value = {}
+        self.import_client = ImportClient(self.mock_dataset, self.mock_msg, logger)
+        self.import_client.filename = "filename"
+        msg = self.import_client.get_result_msg()
+        self.assertNotIn('issues', msg['summary'])
+
+        issue_aggregator.counts[('format_n8', 'code', 'warning')] = 2
+        msg = self.import_client.get_result_msg()
+        self.assertEqual(msg['summary']['issues'], {'warning': {'format_n8.code': 2}})
+
+        ImportClient(self.mock_dataset, self.mock_msg, logger)
+        self.assertEqual({}, issue_aggregator.counts)
+
+    @patch('gobimport.import_client.Checkpoint')
+    def test_get_checkpoint(self, mock_Checkpoint):
+        logger = MagicMock()
+        client = ImportClient(self.mock_dataset, self.mock_msg, logger)
+        self.assertIsNone(client._get_checkpoint())
+
+        # The rows of a source without a query can not be read in the order of the checkpoint key
+        self.mock_dataset['source']['checkpoint'] = {'key': 'id'}
+        self.mock_dataset['source'].pop('query', None)
+        client = ImportClient(self.mock_dataset, self.mock_msg, logger)
+        with self.assertRaises(GOBException):
+            client._get_checkpoint()
+
+        self.mock_dataset['source']['query'] = ['SELECT * FROM meetbouten']
+        client = ImportClient(self.mock_dataset, self.mock_msg, logger)
+        self.assertEqual(mock_Checkpoint.return_value, client._get_checkpoint())
+        name = f"{client.catalogue}.{client.entity}.{client.source_app}.full"
+        mock_Checkpoint.assert_called_with(name, {'key': 'id'})
+
+        # The rows of an order dependent enrichment can not be read in the order of the checkpoint key
+        client.enricher = MagicMock()
+        client.enricher.depends_on_order.return_value = True
+        with self.assertRaises(GOBException):
+            client._get_checkpoint()
+
+    @patch('gobimport.import_client.Watermark')
+    def test_get_watermark(self, mock_Watermark):
+        logger = MagicMock()
+        client = ImportClient(self.mock_dataset, self.mock_msg, logger)
+        self.assertIsNone(client._get_watermark())
+
+        self.mock_dataset['source']['watermark'] = {'column': 'mutatie'}
+        client = ImportClient(self.mock_dataset, self.mock_msg, logger)
+        self.assertEqual(mock_Watermark.return_value, client._get_watermark())
+        name = f"{client.catalogue}.{client.entity}.{client.source_app}"
+        mock_Watermark.assert_called_with(name, {'column': 'mutatie'})
+
+    @patch('gobimport.import_client.Reader')
+    def test_import_rows_watermark(self, mock_Reader):
+        reader = mock_Reader.return_value.__enter__.return_value
+        rows = [{'id': 1}, {'id': 2}]
+        reader.read.return_value = rows
+
+        _self = MagicMock()
+        ImportClient.import_rows(_self, MagicMock(), MagicMock())
+        reader.read.assert_called_with(None, None, _self.watermark.value, _self._get_projection.return_value)
+
+        _self.watermark = None
+        ImportClient.import_rows(_self, MagicMock(), MagicMock())
+        reader.read.assert_called_with(None, None, None, _self._get_projection.return_value)
+
+    def test_get_projection(self):
+        _self = MagicMock()
+        _self.source = {}
+        self.assertIsNone(ImportClient._get_projection(_self))
+
+        _self.source = {'projection': {}}
+        _self.converter.get_columns.return_value = {'id', 'code', 'fng_omschrijving', 'pandidentificatie'}
+        _self.injector.get_columns.return_value = {'naam'}
+        _self.enricher.get_columns.return_value = ({'fng_code', 'pandidentificatie'},
+                                                   {'fng_omschrijving', 'pandidentificatie'})
+        _self.merger.merge_def = {}
+        _self.watermark = None
+        self.assertEqual(['code', 'fng_code', 'id', 'naam', 'pandidentificatie'], ImportClient._get_projection(_self))
+
+        _self.merger.merge_def = {'on': 'merge_on'}
+        _self.watermark = MagicMock(column='mutatie')
+        checkpoint = MagicMock()
+        checkpoint.key = 'seqnr'
+        _self.source = {'projection': {'exclude': ['naam']}}
+        self.assertEqual(['code', 'fng_code', 'id', 'merge_on', 'mutatie', 'pandidentificatie', 'seqnr'],
+                         ImportClient._get_projection(_self, checkpoint))
+
+    def test_get_checkpoint_components(self):
+        _self = MagicMock()
+        _self.entity_validator.validators = ['ev']
+        _self.enricher.enrichers = ['en']
+        self.assertEqual({
+            'validator': _self.validator,
+            'merger': _self.merger,
+            'issues': issue_aggregator,
+            'watermark': _self.watermark,
+            'quarantine': _self.quarantine,
+            'entity_validator.0': 'ev',
+            'enricher.0': 'en',
+        }, ImportClient._get_checkpoint_components(_self))
+
+        _self.watermark = None
+        _self.quarantine = None
+        self.assertNotIn('watermark', ImportClient._get_checkpoint_components(_self))
+        self.assertNotIn('quarantine', ImportClient._get_checkpoint_components(_self))
+
+    @patch('gobimport.import_client.Reader')
+    def test_import_rows_checkpoint(self, mock_Reader):
+        reader = mock_Reader.return_value.__enter__.return_value
+        reader.read.return_value = [{'id': n} for n in range(1, 6)]
+
+        write = MagicMock()
+        _self = MagicMock()
+        _self.converter.convert.side_effect = lambda row: row
+
+        checkpoint = MagicMock()
+        checkpoint.resumable = False
+        checkpoint.key = 'id'
+        checkpoint.interval = 2
+
+        ImportClient.import_rows(_self, write, MagicMock(), checkpoint)
+        reader.read.assert_called_with(
+            'id', checkpoint.last_key, _self.watermark.value, _self._get_projection.return_value)
+        _self._get_projection.assert_called_with(checkpoint)
+        components = _self._get_checkpoint_components.return_value
+        self.assertEqual([call(2, 2, components), call(4, 4, components)], checkpoint.save.call_args_list)
+        self.assertEqual(5, _self.n_rows)
+
+        # Resume
+        reader.read.return_value = [{'id': 5}]
+        checkpoint.resumable = True
+        checkpoint.restore.return_value = 4
+        checkpoint.save.reset_mock()
+
+        ImportClient.import_rows(_self, write, MagicMock(), checkpoint)
+        checkpoint.restore.assert_called_with(components)
+        self.assertEqual(5, _self.n_rows)
+        checkpoint.save.assert_not_called()
+        _self.logger.info.assert_any_call(f"Resume import from {_self.source_app} after 4 records")
 
     def test_import_dataset_mode_delete(self):
         _self = MagicMock()
@@ -187,6 +538,7 @@ class TestImportClient(TestCase):
         _self.merger.assert_not_called()
         _self.import_rows.assert_not_called()
         _self.entity_validator.assert_not_called()
+        _self._clear_hash_store.assert_called_once()
 
     @patch('gobimport.import_client.ContentsWriter')
     @patch('gobimport.import_client.traceback')
@@ -0,0 +1,33 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+import gobimport
+
+
+class TestGobModel(TestCase):
+
+    def setUp(self):
+        self.gob_model = gobimport._gob_model
+        gobimport._gob_model = None
+
+    def tearDown(self):
+        gobimport._gob_model = self.gob_model
+
+    @patch("gobimport.GOBModel")
+    def test_lazy_gob_model(self, mock_gob_model):
+        model = mock_gob_model.return_value
+        mock_gob_model.assert_not_called()
+
+        self.assertEqual(model.__getitem__.return_value, gobimport.gob_model["cat"])
+        model.__getitem__.assert_called_with("cat")
+
+        self.assertEqual(model.has_states.return_value, gobimport.gob_model.has_states("cat", "col"))
+        model.has_states.assert_called_with("cat", "col")
+
+        self.assertFalse("cat" in gobimport.gob_model)
+        self.assertEqual([], list(gobimport.gob_model))
+        self.assertEqual(0, len(gobimport.gob_model))
+
+        # The model is constructed only once
+        mock_gob_model.assert_called_once_with()
+        self.assertIs(model, gobimport.get_gob_model())
@@ -1,9 +1,16 @@
+import datetime
+import io
+import os
+import tempfile
 import unittest
 import json
 
+from decimal import Decimal
 from unittest import mock
 
-from gobimport.injections import Injector
+from gobcore.exceptions import GOBException
+
+from gobimport.injections import Injector, IndexedInjections, build_injection_index, _get_operator, _iter_json_array, _normalise_key_value
 
 class TestInjections(unittest.TestCase):
 
@@ -65,14 +72,32 @@ class TestInjections(unittest.TestCase):
 
     def test_apply_injection(self):
         row = {}
-        injector = Injector(None)
-        injector._apply(row, "key", "=", "aap")
+        _get_operator("=")(row, "key", "aap")
         self.assertEqual(row, {"key": "aap"})
 
         row = {"key": 1}
-        injector._apply(row, "key", "+", 1)
+        _get_operator("+")(row, "key", 1)
         self.assertEqual(row, {"key": 2})
 
+        row = {"key": 1}
+        _get_operator("+-1")(row, "key", 3)
+        self.assertEqual(row, {"key": 3})
+
+    @mock.patch('builtins.open')
+    def test_unknown_operator(self, mock_open):
+        mock_open.side_effect = [
+            mock.mock_open(read_data=json.dumps([])).return_value,
+        ]
+        inject_spec = {
+            "from": "anyfile",
+            "on": "id",
+            "conversions": {
+                "field1": "*",
+            }
+        }
+        with self.assertRaises(GOBException):
+            Injector(inject_spec)
+
     @mock.patch('builtins.open')
     def test_injections_with_data(self, mock_open):
         injections = [
@@ -149,3 +174,196 @@ class TestInjections(unittest.TestCase):
         for row in data:
             injector.inject(row)
         self.assertEqual(data, expect)
+
+    @mock.patch('builtins.open')
+    def test_injections_projection(self, mock_open):
+        injections = [
+            {
+                "id": 1,
+                "field1": "aap",
+                "field2": 10,
+                "unused": "noot"
+            }
+        ]
+        mock_open.side_effect = [
+            mock.mock_open(read_data=json.dumps(injections)).return_value,
+        ]
+        inject_spec = {
+            "from": "anyfile",
+            "on": "id",
+            "conversions": {
+                "field1": "=",
+            }
+        }
+        injector = Injector(inject_spec)
+        self.assertEqual(injector.injections, {1: ("aap",)})
+
+    @mock.patch('gobimport.injections.READ_CHUNK_SIZE', 5)
+    def test_iter_json_array(self):
+        injections = [
+            {"id": i, "value": "x" * i, "nested": {"list": [1, {"bracket": "]"}]}} for i in range(10)
+        ]
+        for data in [json.dumps(injections), json.dumps(injections, indent=4), "[]", " [ ] "]:
+            self.assertEqual(list(_iter_json_array(io.StringIO(data))), json.loads(data))
+
+        with self.assertRaises(json.JSONDecodeError):
+            list(_iter_json_array(io.StringIO('[{"id": 1}, {"id": ')))
+
+    def test_indexed_injections(self):
+        injections = [
+            {"id": 1, "field1": "aap", "field2": 10, "unused": "noot"},
+            {"id": 2, "field1": "mies", "field2": 20, "unused": "noot"},
+        ]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            inject_from = os.path.join(tmpdir, "injections.json")
+            index = os.path.join(tmpdir, "injections.db")
+            with open(inject_from, "w") as file:
+                json.dump(injections, file)
+
+            inject_spec = {
+                "from": inject_from,
+                "on": "id",
+                "conversions": {
+                    "field1": "=",
+                    "field2": "+"
+                },
+                "index": index
+            }
+            injector = Injector(inject_spec)
+            self.assertIsInstance(injector.injections, IndexedInjections)
+            self.assertTrue(os.path.exists(index))
+
+            row = {"id": 2, "field1": "0", "field2": 1}
+            injector.inject(row)
+            self.assertEqual(row, {"id": 2, "field1": "mies", "field2": 21})
+
+            row = {"id": 3, "field1": "0", "field2": 1}
+            injector.inject(row)
+            self.assertEqual(row, {"id": 3, "field1": "0", "field2": 1})
+
+            # The existing index is reused
+            with mock.patch('gobimport.injections.build_injection_index') as mock_build:
+                IndexedInjections(inject_from, index, ["id"], ["field1", "field2"])
+                mock_build.assert_not_called()
+
+            # The index is rebuilt when the fields change
+            injections = IndexedInjections(inject_from, index, ["id"], ["field2"])
+            self.assertEqual(injections.get(1), (10,))
+
+            # Indexes on multiple fields
+            injections = IndexedInjections(inject_from, index, ["id", "field1"], ["field2"])
+            self.assertEqual(injections.get((1, "aap")), (10,))
+            self.assertIsNone(injections.get((1, "mies")))
+
+            injector.close()
+            injections.close()
+
+            # A failing build leaves no temporary files, nor an index
+            with open(inject_from, "w") as file:
+                file.write('[{"id": 1, ')
+            other_index = os.path.join(tmpdir, "other.db")
+            with self.assertRaises(json.JSONDecodeError):
+                build_injection_index(inject_from, other_index, ["id"], ["field2"])
+            self.assertEqual(["injections.db", "injections.json"], sorted(os.listdir(tmpdir)))
+
+    def test_normalise_key_value(self):
+        for value, expect in [
+            ("1", "1"),
+            (None, None),
+            (1, 1),
+            (1.0, 1),
+            (Decimal("1.00"), 1),
+            (True, 1),
+            (0.5, 0.5),
+            (Decimal("0.5"), 0.5),
+            (datetime.date(2020, 1, 31), "2020-01-31"),
+            (datetime.datetime(2020, 1, 31, 10, 11, 12), "2020-01-31T10:11:12"),
+        ]:
+            result = _normalise_key_value(value)
+            self.assertEqual(result, expect)
+            self.assertIs(type(result), type(expect))
+
+        self.assertEqual(_normalise_key_value(float("inf")), float("inf"))
+        self.assertEqual(_normalise_key_value(Decimal("-Infinity")), float("-inf"))
+
+        with self.assertRaises(GOBException):
+            _normalise_key_value(["1"])
+
+    def test_injection_keys(self):
+        # The keys are matched in the same way with and without an index
+        injections = [
+            {"id": 1, "datum": "2020-01-31", "field1": "aap"},
+            {"id": 2.5, "datum": "2020-02-01", "field1": "noot"},
+        ]
+        rows = [
+            {"id": 1.0, "datum": datetime.date(2020, 1, 31), "field1": "0"},
+            {"id": Decimal("1"), "datum": "2020-01-31", "field1": "0"},
+            {"id": Decimal("2.5"), "datum": datetime.date(2020, 2, 1), "field1": "0"},
+            {"id": 2, "datum": datetime.date(2020, 2, 1), "field1": "0"},
+        ]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            inject_from = os.path.join(tmpdir, "injections.json")
+            with open(inject_from, "w") as file:
+                json.dump(injections, file)
+
+            inject_spec = {
+                "from": inject_from,
+                "on": ["id", "datum"],
+                "conversions": {
+                    "field1": "=",
+                },
+            }
+            for spec in [inject_spec, {**inject_spec, "index": os.path.join(tmpdir, "injections.db")}]:
+                injector = Injector(spec)
+                data = [dict(row) for row in rows]
+                for row in data:
+                    injector.inject(row)
+                injector.close()
+                self.assertEqual([row["field1"] for row in data], ["aap", "aap", "noot", "0"])
+
+            with self.assertRaises(GOBException):
+                Injector(inject_spec).inject({"id": [1], "datum": "2020-01-31"})
+
+    @mock.patch('builtins.open')
+    def test_injections_on_multiple_fields(self, mock_open):
+        injections = [
+            {"id": 1, "volgnummer": 1, "field1": "aap"},
+            {"id": 1, "volgnummer": 2, "field1": "noot"},
+        ]
+        mock_open.side_effect = [
+            mock.mock_open(read_data=json.dumps(injections)).return_value,
+        ]
+        inject_spec = {
+            "from": "anyfile",
+            "on": ["id", "volgnummer"],
+            "conversions": {
+                "field1": "=",
+            }
+        }
+        injector = Injector(inject_spec)
+        self.assertEqual(injector.injections, {(1, 1): ("aap",), (1, 2): ("noot",)})
+
+        data = [
+            {"id": 1, "volgnummer": 1, "field1": "0"},
+            {"id": 1, "volgnummer": 2, "field1": "0"},
+            {"id": 1, "volgnummer": 3, "field1": "0"},
+        ]
+        for row in data:
+            injector.inject(row)
+        self.assertEqual([row["field1"] for row in data], ["aap", "noot", "0"])
+
+    @mock.patch('builtins.open')
+    def test_get_columns(self, mock_open):
+        self.assertEqual(set(), Injector(None).get_columns())
+
+        mock_open.side_effect = [
+            mock.mock_open(read_data="[]").return_value,
+        ]
+        inject_spec = {
+            "from": "anyfile",
+            "on": ["id", "volgnummer"],
+            "conversions": {
+                "field1": "=",
+            }
+        }
+        self.assertEqual({"id", "volgnummer", "field1"}, Injector(inject_spec).get_columns())
@@ -0,0 +1,40 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from gobimport.interning import IMPORT_INTERN_MAX_VALUES, Interner
+
+
+@patch("gobimport.interning.logger")
+class TestInterner(TestCase):
+
+    def test_intern(self, mock_logger):
+        interner = Interner(["code", "number"])
+        self.assertEqual(IMPORT_INTERN_MAX_VALUES, interner.max_values)
+
+        rows = [{"code": "".join(["A", "B"]), "number": 1, "other": "".join(["x", "y"])} for _ in range(2)]
+        self.assertIsNot(rows[0]["code"], rows[1]["code"])
+
+        for row in rows:
+            self.assertIs(row, interner.intern(row))
+
+        # Only the string values of the interned columns are shared
+        self.assertEqual({"code": "AB", "number": 1, "other": "xy"}, rows[1])
+        self.assertIs(rows[0]["code"], rows[1]["code"])
+        self.assertIsNot(rows[0]["other"], rows[1]["other"])
+        self.assertEqual({"code": {"AB": "AB"}, "number": {}}, interner.values)
+
+        # Missing values are skipped
+        self.assertEqual({"number": None}, interner.intern({"number": None}))
+
+    def test_release(self, mock_logger):
+        interner = Interner(["code", "id"], max_values=2)
+        for n in range(3):
+            interner.intern({"code": "A", "id": str(n)})
+
+        # The high cardinality column is no longer interned
+        self.assertEqual({"code": {"A": "A"}}, interner.values)
+        mock_logger.info.assert_called_once()
+
+        row = {"code": "A", "id": "4"}
+        interner.intern(row)
+        self.assertEqual({"code": {"A": "A"}}, interner.values)
@@ -0,0 +1,49 @@
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from gobimport.issues import Issue, IssueAggregator, issue_aggregator, log_issue
+
+
+class TestIssue(TestCase):
+
+    @patch("gobimport.issues.QualityIssue")
+    def test_build(self, mock_QualityIssue):
+        check, entity = {"name": "check"}, {"id": 1}
+        issue = Issue(check, entity, "id", "attr", compared_to="other")
+        mock_QualityIssue.assert_not_called()
+
+        self.assertEqual(mock_QualityIssue.return_value, issue.build())
+        mock_QualityIssue.assert_called_with(check, entity, "id", "attr", compared_to="other")
+
+
+@patch("gobimport.issues.log_quality_issue")
+class TestIssueAggregator(TestCase):
+
+    def test_log_issue(self, mock_log_quality_issue):
+        aggregator = IssueAggregator(sample_size=2)
+        logger = MagicMock()
+        issue = MagicMock(check={"name": "check"}, attribute="attr")
+
+        for _ in range(5):
+            aggregator.log_issue(logger, "warning", issue)
+        aggregator.log_issue(logger, "error", issue)
+
+        # Only the sample is built and logged, the counts are exact
+        self.assertEqual(3, mock_log_quality_issue.call_count)
+        self.assertEqual(3, issue.build.call_count)
+        mock_log_quality_issue.assert_called_with(logger, "error", issue.build.return_value)
+        self.assertEqual({"warning": {"check.attr": 5}, "error": {"check.attr": 1}}, aggregator.summary())
+
+        aggregator.log_summary(logger)
+        logger.warning.assert_called_once_with("5 warning issues check for attribute attr, 2 have been logged")
+
+        aggregator.reset()
+        self.assertEqual({}, aggregator.summary())
+
+    def test_module_log_issue(self, mock_log_quality_issue):
+        issue_aggregator.reset()
+        issue = MagicMock(check={"name": "check"}, attribute="attr")
+        log_issue("logger", "warning", issue)
+        mock_log_quality_issue.assert_called_with("logger", "warning", issue.build.return_value)
+        self.assertEqual({"warning": {"check.attr": 1}}, issue_aggregator.summary())
+        issue_aggregator.reset()
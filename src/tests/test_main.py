@@ -2,6 +2,8 @@ from unittest import TestCase
 
 import json
 import pytest
+import subprocess
+import sys
 from argparse import Namespace
 from gobcore.exceptions import GOBException
 from pathlib import Path
@@ -23,7 +25,7 @@ class TestMain(TestCase):
         }
 
     @patch("gobimport.__main__.logger")
-    @patch("gobimport.__main__.ImportClient")
+    @patch("gobimport.import_client.ImportClient")
     @patch("gobimport.__main__.extract_dataset_from_msg")
     def test_handle_import_msg(self, mock_extract_dataset, mock_import_client, mock_logger):
         """Tests handle_import_msg for a normal import."""
@@ -63,7 +65,7 @@ class TestMain(TestCase):
         }, self.mock_msg)
 
     @patch("gobimport.__main__.logger")
-    @patch("gobimport.__main__.MappinglessConverterAdapter")
+    @patch("gobimport.__main__.get_mappingless_converter")
     def test_handle_import_object_msg(self, mock_converter, mock_logger):
         msg = {
             'header': {
@@ -81,11 +83,31 @@ class TestMain(TestCase):
                 'collection': 'ENT',
             },
             'summary': mock_logger.get_summary.return_value,
-            'contents': [mock_converter.return_value.convert.return_value]
+            'contents': mock_converter.return_value.convert_many.return_value
         }, handle_import_object_msg(msg))
 
         mock_converter.assert_called_with('CAT', 'ENT', 'id_attr')
-        mock_converter.return_value.convert.assert_called_with({'the': 'contents'})
+        mock_converter.return_value.convert_many.assert_called_with([{'the': 'contents'}])
+
+    @patch("gobimport.__main__.logger")
+    @patch("gobimport.__main__.get_mappingless_converter")
+    def test_handle_import_object_msg_list(self, mock_converter, mock_logger):
+        msg = {
+            'header': {
+                'catalogue': 'CAT',
+                'entity': 'ENT',
+                'entity_id_attr': 'id_attr',
+            },
+            'contents': [{'the': 'contents'}, {'other': 'contents'}],
+        }
+        mock_converter.return_value.convert_many.return_value = ['entity 1', 'entity 2']
+
+        result = handle_import_object_msg(msg)
+        self.assertEqual(['entity 1', 'entity 2'], result['contents'])
+        self.assertEqual('single_object', result['header']['mode'])
+
+        mock_converter.assert_called_once_with('CAT', 'ENT', 'id_attr')
+        mock_converter.return_value.convert_many.assert_called_with([{'the': 'contents'}, {'other': 'contents'}])
 
     @patch("gobimport.__main__.get_import_definition")
     def test_extract_dataset_from_msg(self, mock_import_definition):
@@ -131,6 +153,63 @@ class TestMain(TestCase):
             main()
             mock_messagedriven_service.assert_called_with(SERVICEDEFINITION, "Import")
 
+    @patch("gobimport.__main__.IMPORT_WORKERS", 4)
+    @patch("gobimport.__main__.run_worker_pool")
+    @patch("gobimport.__main__.messagedriven_service")
+    def test_main_entry_worker_pool(self, mock_messagedriven_service, mock_run_worker_pool):
+        from gobimport.__main__ import sys
+
+        with patch.object(sys, "argv", ["gobimport"]):
+            main()
+            mock_run_worker_pool.assert_called_with(4, mock_messagedriven_service, SERVICEDEFINITION, "Import")
+            mock_messagedriven_service.assert_not_called()
+
+    @patch("gobimport.__main__.application_slot")
+    @patch("gobimport.__main__.logger", MagicMock())
+    @patch("gobimport.import_client.ImportClient")
+    @patch("gobimport.__main__.extract_dataset_from_msg")
+    def test_handle_import_msg_application_slot(self, mock_extract_dataset, mock_import_client, mock_slot):
+        mock_extract_dataset.return_value = {
+            "source": {
+                "name": "Some name",
+                "application": "The application",
+            },
+            "catalogue": "CAT",
+            "entity": "ENT"
+        }
+        handle_import_msg(self.mock_msg)
+
+        mock_slot.assert_called_with("The application")
+        mock_slot.return_value.__enter__.assert_called_once()
+        mock_slot.return_value.__exit__.assert_called_once()
+
+        # The application defaults to the source name
+        del mock_extract_dataset.return_value["source"]["application"]
+        handle_import_msg(self.mock_msg)
+        mock_slot.assert_called_with("Some name")
+        self.assertEqual("Some name", self.mock_msg["header"]["application"])
+
+    @patch("gobimport.__main__.requeue")
+    @patch("gobimport.__main__.application_slot")
+    @patch("gobimport.__main__.logger", MagicMock())
+    @patch("gobimport.import_client.ImportClient")
+    @patch("gobimport.__main__.extract_dataset_from_msg")
+    def test_handle_import_msg_requeue(self, mock_extract_dataset, mock_import_client, mock_slot, mock_requeue):
+        mock_extract_dataset.return_value = {
+            "source": {
+                "name": "Some name",
+                "application": "The application",
+            },
+            "catalogue": "CAT",
+            "entity": "ENT"
+        }
+        # All slots of the application are in use
+        mock_slot.return_value.__enter__.return_value = False
+
+        self.assertIsNone(handle_import_msg(self.mock_msg))
+        mock_requeue.assert_called_once_with(self.mock_msg)
+        mock_import_client.assert_not_called()
+
     @patch("gobimport.__main__.run_as_standalone")
     def test_main_entry_standalone(self, mock_run):
         from gobimport.__main__ import sys
@@ -147,9 +226,15 @@ class TestMain(TestCase):
         assert argparse.collection == "ligplaatsen"
         assert argparse.application == "GOBPrepare"
         assert argparse.mode == "full"
+        assert argparse.profile is False
 
-    @patch("gobimport.__main__.ImportClient.import_dataset", MagicMock())
-    @patch("gobimport.__main__.ImportClient.get_result_msg")
+        sys.argv += ["--profile"]
+        with pytest.raises(SystemExit):
+            main()
+        assert mock_run.call_args.args[0].profile is True
+
+    @patch("gobimport.import_client.ImportClient.import_dataset", MagicMock())
+    @patch("gobimport.import_client.ImportClient.get_result_msg")
     def test_main_entry_standalone_writes_xcom(self, mock_result_msg):
         from gobimport.__main__ import sys
         contents_ref = f"/path/to/nap/peilmerken/20220726.130856.{uuid4()}"
@@ -167,3 +252,27 @@ class TestMain(TestCase):
         with Path("/airflow/xcom/return.json").open("r") as fp:
             data = json.load(fp)
             assert data["contents_ref"] == contents_ref
+
+
+def test_import_main_is_lazy():
+    """Starting gobimport should neither construct the model nor import any catalogue specific code."""
+    code = (
+        "import json, sys, gobimport, gobimport.__main__; "
+        "print(json.dumps({'model': gobimport._gob_model is not None, 'modules': sorted(sys.modules)}))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=Path(__file__).parent.parent
+    )
+    loaded = json.loads(result.stdout.splitlines()[-1])
+
+    assert loaded["model"] is False
+    for module in [
+        "gobimport.enricher.bag",
+        "gobimport.enricher.gebieden",
+        "gobimport.enricher.meetbouten",
+        "gobimport.entity_validator.bag",
+        "gobimport.entity_validator.gebieden",
+        "gobimport.import_client",
+        "gobimport.reader",
+    ]:
+        assert module not in loaded["modules"]
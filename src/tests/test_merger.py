@@ -133,6 +133,26 @@ class TestMerger(unittest.TestCase):
         merger.merge_items["value2"] = {"entities": [entity]}
         self.assertTrue(merger.is_merged(entity))
 
+    def test_release(self):
+        written = []
+        write = lambda e: written.append(e)
+
+        merger = Merger(None)
+        entity = {"b": "value2", "volgnummer": 3}
+        merger.release(entity, write)
+        self.assertEqual([], written)
+
+        merge_entities = [{"b": "value2", "volgnummer": 2}, {"b": "value2", "volgnummer": 3}]
+        merger.merge_def = {"on": "b"}
+        merger.merged = {"value2"}
+        merger.merge_items["value2"] = {"entities": merge_entities}
+        merger.release(entity, write)
+        self.assertEqual([merge_entities[-1]], written)
+
+        # An entity that has not taken the place of the merge entity holds nothing back
+        merger.release({"b": "value2", "volgnummer": 4}, write)
+        self.assertEqual([merge_entities[-1]], written)
+
     @mock.patch('gobimport.merger.get_import_definition_by_filename', mock.MagicMock())
     def test_merge(self):
         mock_client = mock.MagicMock(spec=ImportClient)
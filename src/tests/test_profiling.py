@@ -0,0 +1,78 @@
+import os
+import pstats
+import tempfile
+import tracemalloc
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from gobimport.profiling import MemoryProfiler, cpu_profile, get_memory_profile_interval, get_memory_profiler
+
+
+class TestMemoryProfiler(TestCase):
+
+    @patch("gobimport.profiling.IMPORT_MEMORY_PROFILE_INTERVAL", 0)
+    def test_get_memory_profile_interval(self):
+        self.assertEqual(0, get_memory_profile_interval({}))
+        self.assertEqual(0, get_memory_profile_interval({"memory_profile": False}))
+        self.assertEqual(100_000, get_memory_profile_interval({"memory_profile": True}))
+        self.assertEqual(50, get_memory_profile_interval({"memory_profile": 50}))
+
+        with patch("gobimport.profiling.IMPORT_MEMORY_PROFILE_INTERVAL", 10):
+            self.assertEqual(10, get_memory_profile_interval({}))
+            self.assertEqual(50, get_memory_profile_interval({"memory_profile": 50}))
+
+    @patch("gobimport.profiling.IMPORT_MEMORY_PROFILE_INTERVAL", 0)
+    def test_get_memory_profiler(self):
+        self.assertIsNone(get_memory_profiler(MagicMock(), MagicMock(), MagicMock(), {}))
+
+        profiler = get_memory_profiler("progress", "accumulators", "logger", {"memory_profile": 5})
+        self.assertIsInstance(profiler, MemoryProfiler)
+        self.assertEqual(5, profiler.interval)
+
+    def test_memory_profiler(self):
+        progress = MagicMock()
+        logger = MagicMock()
+        keys = set()
+
+        with MemoryProfiler(progress, lambda: {"keys": keys, "value": 1}, logger, 2) as profiler:
+            self.assertTrue(tracemalloc.is_tracing())
+            for n in range(5):
+                keys.add(n)
+                profiler.tick()
+
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertEqual(5, progress.tick.call_count)
+        # Snapshots after 2 and 4 rows and at the end
+        self.assertEqual(3, logger.info.call_count)
+        self.assertEqual({"keys": 5}, profiler.summary["accumulators"])
+        self.assertGreater(profiler.summary["peak_memory"], 0)
+
+        data = logger.info.call_args[1]["kwargs"]["data"]
+        self.assertIn("top", data)
+        self.assertIn("current_memory", data)
+
+
+class TestCPUProfile(TestCase):
+
+    def test_cpu_profile(self):
+        logger = MagicMock()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "contents.prof")
+            with cpu_profile(filename, logger):
+                sorted(range(1000), key=lambda x: -x)
+
+            stats = pstats.Stats(filename)
+            self.assertTrue(any(func[2] == "<lambda>" for func in stats.stats))
+
+        logger.info.assert_called_once()
+        self.assertEqual(f"Profile written to {filename}", logger.info.call_args[0][0])
+        self.assertIn("<lambda>", logger.info.call_args[1]["kwargs"]["data"]["profile"])
+
+    def test_cpu_profile_exception(self):
+        logger = MagicMock()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "contents.prof")
+            with self.assertRaises(ValueError):
+                with cpu_profile(filename, logger):
+                    raise ValueError
+            self.assertTrue(os.path.exists(filename))
@@ -0,0 +1,61 @@
+import datetime
+import json
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from gobcore.exceptions import GOBException
+
+from gobimport.quarantine import DEFAULT_MAX_ERRORS, Quarantine
+
+
+class TestQuarantine(TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, "contents.quarantine")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _read(self):
+        with open(self.filename) as file:
+            return [json.loads(line) for line in file]
+
+    def test_guard(self):
+        quarantine = Quarantine(self.filename, {"max_errors": 1})
+        self.assertEqual(1, quarantine.max_errors)
+        self.assertEqual(DEFAULT_MAX_ERRORS, Quarantine(self.filename, {}).max_errors)
+
+        with quarantine.guard({"id": 1}):
+            pass
+        self.assertEqual(0, quarantine.n_errors)
+        self.assertFalse(os.path.exists(self.filename))
+
+        with quarantine.guard({"id": 2, "datum": datetime.date(2020, 1, 31)}):
+            raise ValueError("Invalid value")
+        self.assertEqual(1, quarantine.n_errors)
+
+        with self.assertRaises(KeyboardInterrupt):
+            with quarantine.guard({"id": 3}):
+                raise KeyboardInterrupt
+
+        quarantine.close()
+        self.assertEqual([{"error": "ValueError: Invalid value", "row": {"id": 2, "datum": "2020-01-31"}}], self._read())
+
+    def test_result(self):
+        logger = MagicMock()
+        quarantine = Quarantine(self.filename, {"max_errors": 1})
+        quarantine.result(logger)
+        logger.warning.assert_not_called()
+
+        quarantine.add({"id": 1}, ValueError())
+        quarantine.result(logger)
+        logger.warning.assert_called_with(f"1 rows have been quarantined in {self.filename}")
+        self.assertIsNone(quarantine.file)
+
+        quarantine.add({"id": 2}, ValueError())
+        with self.assertRaises(GOBException):
+            quarantine.result(logger)
+        self.assertEqual(2, len(self._read()))
@@ -36,7 +36,7 @@ class TestReader(TestCase):
         self.assertEqual('other mode', reader.mode)
 
     @mock.patch("gobimport.reader.get_datastore_config")
-    @mock.patch("gobimport.reader.DatastoreFactory")
+    @mock.patch("gobcore.datastore.factory.DatastoreFactory")
     def test_connect(self, mock_datastore_factory, mock_datastore_config):
         reader = Reader(self.source, self.app, self.dataset())
 
@@ -95,6 +95,73 @@ class TestReader(TestCase):
         with self.assertRaises(KeyError):
             reader.read()
 
+    def test_read_order_by(self):
+        reader = Reader({'query': ['a', 'b']}, self.app, self.dataset())
+        reader.datastore = mock.MagicMock()
+        reader._maybe_protect_rows = mock.MagicMock()
+        query_kwargs = {'arraysize': 2000, 'name': 'import_cursor', 'withhold': True}
+
+        reader.read('id')
+        reader.datastore.query.assert_called_with('SELECT * FROM (\na\nb\n) q ORDER BY q.id', **query_kwargs)
+
+        reader.read('id', "O'Brien")
+        reader.datastore.query.assert_called_with(
+            "SELECT * FROM (\na\nb\n) q WHERE q.id > 'O''Brien' ORDER BY q.id", **query_kwargs)
+
+        # No query, no ordering
+        reader.source = {}
+        reader.read('id', 1)
+        reader.datastore.query.assert_called_with('', **query_kwargs)
+
+    def test_read_columns(self):
+        reader = Reader({'query': ['a', 'b']}, self.app, self.dataset())
+        reader.datastore = mock.MagicMock()
+        reader._maybe_protect_rows = mock.MagicMock()
+        query_kwargs = {'arraysize': 2000, 'name': 'import_cursor', 'withhold': True}
+
+        reader.read(columns=['id', 'code'])
+        reader.datastore.query.assert_called_with('SELECT q.id, q.code FROM (\na\nb\n) q', **query_kwargs)
+
+        reader.read('id', 1, columns=['id', 'code'])
+        reader.datastore.query.assert_called_with(
+            'SELECT * FROM (\nSELECT q.id, q.code FROM (\na\nb\n) q\n) q WHERE q.id > 1 ORDER BY q.id', **query_kwargs)
+
+        # No query, no projection
+        reader.source = {}
+        reader.read(columns=['id'])
+        reader.datastore.query.assert_called_with('', **query_kwargs)
+
+    def test_read_intern(self):
+        self.assertIsNone(Reader({'query': ['a']}, self.app, self.dataset()).interner)
+
+        # Secure columns are not interned
+        with mock.patch.object(Reader, 'set_secure_attributes',
+                               lambda reader, *args: reader.secure_attributes.append('secure')):
+            reader = Reader({'query': ['a'], 'intern': ['code', 'secure']}, self.app, self.dataset())
+        self.assertEqual(['code'], list(reader.interner.values))
+
+        reader.datastore = mock.MagicMock()
+        reader.datastore.query.return_value = [{'code': 'A'}, {'code': 'A'}]
+        reader._maybe_protect_rows = lambda rows: rows
+        self.assertEqual([{'code': 'A'}, {'code': 'A'}], list(reader.read()))
+        self.assertEqual({'code': {'A': 'A'}}, reader.interner.values)
+
+    def test_read_watermark(self):
+        reader = Reader({'query': ['a'], 'recent': ['AND b > {watermark}']}, self.app, self.dataset(), ImportMode.RECENT)
+        reader.datastore = mock.MagicMock()
+        reader._maybe_protect_rows = mock.MagicMock()
+        query_kwargs = {'arraysize': 2000, 'name': 'import_cursor', 'withhold': True}
+
+        reader.read(watermark=5)
+        reader.datastore.query.assert_called_with("a\nAND b > 5", **query_kwargs)
+
+        # No watermark, read all rows
+        reader.read()
+        reader.datastore.query.assert_called_with("a", **query_kwargs)
+
+        # The source definition is left unchanged
+        self.assertEqual(['a'], reader.source['query'])
+
     def test_set_secure_attributes(self):
         reader = Reader(self.source, self.app, self.dataset())
         mapping = {
@@ -144,7 +211,7 @@ class TestReader(TestCase):
         reader.set_secure_attributes(mapping, attributes)
         self.assertEqual(reader.secure_attributes, ['any secure string', 'any secure bronwaarde'])
 
-    @mock.patch("gobimport.reader.read_protect", lambda x: 'read_protected(' + x + ')')
+    @mock.patch("gobcore.secure.crypto.read_protect", lambda x: 'read_protected(' + x + ')')
     def test_protect_row(self):
         reader = Reader(self.source, self.app, self.dataset())
         reader.secure_attributes = ['attrB']
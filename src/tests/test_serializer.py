@@ -0,0 +1,82 @@
+import datetime
+import json
+import os
+import tempfile
+from decimal import Decimal
+from unittest import TestCase, skipUnless
+from unittest.mock import patch
+
+from gobcore.typesystem.json import GobTypeJSONEncoder
+
+from gobimport import serializer
+from gobimport.serializer import ContentsWriter, dumps, get_options
+
+
+class TestSerializer(TestCase):
+
+    entity = {
+        "code": "ë",
+        "number": 12,
+        "decimal": Decimal("1.50"),
+        "date": datetime.date(2020, 1, 31),
+        "datetime": datetime.datetime(2020, 1, 31, 10, 11, 12, 13),
+        "ref": [{"bronwaarde": "1"}, {"bronwaarde": None}],
+        1: True,
+    }
+
+    @skipUnless(serializer.orjson, "orjson is not installed")
+    def test_dumps(self):
+        expected = json.loads(json.dumps(self.entity, cls=GobTypeJSONEncoder))
+        self.assertEqual(expected, json.loads(dumps(self.entity)))
+
+    @skipUnless(serializer.orjson, "orjson is not installed")
+    def test_get_options(self):
+        orjson = serializer.orjson
+        with patch("gobimport.serializer._serialises_datetimes_alike", lambda: True):
+            self.assertEqual(orjson.OPT_NON_STR_KEYS, get_options())
+
+        with patch("gobimport.serializer._serialises_datetimes_alike", lambda: False):
+            self.assertEqual(orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME, get_options())
+
+        # Dates and datetimes are passed to the GOB encoder when it fails to serialise them
+        with patch("gobimport.serializer.json.dumps", side_effect=TypeError):
+            self.assertEqual(orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME, get_options())
+
+    @skipUnless(serializer.orjson, "orjson is not installed")
+    def test_write(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "contents")
+            with ContentsWriter(filename) as writer:
+                self.assertEqual(filename, writer.filename)
+                writer.write({"a": 1})
+
+                # An entity that fails to serialise is not written
+                with self.assertRaises(TypeError):
+                    writer.write({"a": object()})
+
+                writer.write({"a": 2})
+
+                # Non ASCII characters are written UTF-8 encoded, whatever the locale
+                writer.write({"a": "ë"})
+
+            with open(filename, "rb") as file:
+                self.assertEqual('[{"a":1},\n{"a":2},\n{"a":"ë"}]'.encode("utf-8"), file.read())
+
+            with ContentsWriter(filename):
+                pass
+
+            with open(filename) as file:
+                self.assertEqual([], json.load(file))
+
+    @patch("gobimport.serializer.orjson", None)
+    @patch("gobimport.serializer.GOBContentsWriter")
+    def test_write_without_orjson(self, mock_GOBContentsWriter):
+        gob_writer = mock_GOBContentsWriter.return_value
+        with ContentsWriter("contents") as writer:
+            mock_GOBContentsWriter.assert_called_with("contents")
+            self.assertEqual(gob_writer.filename, writer.filename)
+            gob_writer.__enter__.assert_called_once()
+
+            writer.write({"a": 1})
+            gob_writer.write.assert_called_with({"a": 1})
+        gob_writer.__exit__.assert_called_once_with(None, None, None)
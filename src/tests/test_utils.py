@@ -0,0 +1,46 @@
+import datetime
+from decimal import Decimal
+from unittest import TestCase
+from unittest.mock import patch
+
+from gobimport.utils import get_nested_item, sql_literal, wkt_bounds
+
+
+class TestUtils(TestCase):
+
+    def test_get_nested_item(self):
+        data = {'a': {'b': 1}}
+        self.assertEqual(1, get_nested_item(data, 'a', 'b'))
+        self.assertIsNone(get_nested_item(data, 'a', 'c'))
+        self.assertIsNone(get_nested_item(data, 'a', 'b', 'c'))
+
+    def test_sql_literal(self):
+        self.assertEqual("NULL", sql_literal(None))
+        self.assertEqual("TRUE", sql_literal(True))
+        self.assertEqual("FALSE", sql_literal(False))
+        self.assertEqual("12", sql_literal(12))
+        self.assertEqual("1.5", sql_literal(1.5))
+        self.assertEqual("1.50", sql_literal(Decimal("1.50")))
+        self.assertEqual("DATE '2020-01-31'", sql_literal(datetime.date(2020, 1, 31)))
+        self.assertEqual("TIMESTAMP '2020-01-31 10:11:12.000013'",
+                         sql_literal(datetime.datetime(2020, 1, 31, 10, 11, 12, 13)))
+        self.assertEqual("'abc'", sql_literal("abc"))
+        self.assertEqual("'O''Brien'", sql_literal("O'Brien"))
+
+    def test_wkt_bounds(self):
+        self.assertEqual((1.0, 2.0, 3.0, 4.0), wkt_bounds("POLYGON ((1 2, 3 2, 3 4, 1 2))"))
+        self.assertEqual((-1.5, 0.5, 3.0, 40.25),
+                         wkt_bounds("MULTIPOLYGON (((-1.5 2, 3 2, 3 4, -1.5 2)), ((0 0.5, 1 40.25, 0 0.5)))"))
+        self.assertEqual((1.0, 2.0, 1.0, 2.0), wkt_bounds("POINT (1 2)"))
+        self.assertEqual((1.0, 2.0, 5.0, 6.0), wkt_bounds("GEOMETRYCOLLECTION (POINT (1 2), POINT (5 6))"))
+        self.assertIsNone(wkt_bounds("GEOMETRYCOLLECTION (POINT EMPTY)"))
+        self.assertIsNone(wkt_bounds("POLYGON EMPTY"))
+        self.assertIsNone(wkt_bounds("POINT (1)"))
+        self.assertIsNone(wkt_bounds("GEOMETRYCOLLECTION (POINT EMPTY)"))
+        self.assertIsNone(wkt_bounds("GEOMETRYCOLLECTION (POINT EMPTY, LINESTRING EMPTY)"))
+
+    @patch("gobimport.utils.numpy", None)
+    def test_wkt_bounds_without_numpy(self):
+        self.assertEqual((1.0, 2.0, 3.0, 4.0), wkt_bounds("POLYGON ((1 2, 3 2, 3 4, 1 2))"))
+        self.assertEqual((1.0, 2.0, 5.0, 6.0), wkt_bounds("GEOMETRYCOLLECTION (POINT (1 2), POINT (5 6))"))
+        self.assertIsNone(wkt_bounds("GEOMETRYCOLLECTION (POINT EMPTY)"))
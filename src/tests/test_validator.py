@@ -168,3 +168,13 @@ class TestValidator(unittest.TestCase):
 
         # Make sure the publiceerbaar has been listed as invalid
         self.assertEqual(validator.collection_qa['num_invalid_publiceerbaar'], 0)
+
+    def test_geometry_check(self):
+        validator = Validator('source_app', 'meetbouten', 'meetbouten', self.mock_input_spec)
+        check = {'values': {'x': {'min': 0, 'max': 10}, 'y': {'min': 100, 'max': 200}}}
+
+        self.assertTrue(validator._geometry_check(check, "POLYGON ((1.5 100, 10 150.5, 1.5 100))"))
+        self.assertTrue(validator._geometry_check(check, "POLYGON EMPTY"))
+        self.assertFalse(validator._geometry_check(check, "POLYGON ((1.5 100, 11 150.5, 1.5 100))"))
+        self.assertFalse(validator._geometry_check(check, "POINT (1.5 99.5)"))
+        self.assertFalse(validator._geometry_check(check, "POINT (-1.5 150)"))
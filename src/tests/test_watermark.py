@@ -0,0 +1,40 @@
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from gobimport.watermark import Watermark
+
+
+class TestWatermark(TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.patcher = patch("gobimport.watermark.WATERMARK_DIR", self.tmpdir.name)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.tmpdir.cleanup()
+
+    def test_watermark(self):
+        watermark = Watermark("name", {"column": "mutatie"})
+        self.assertEqual("mutatie", watermark.column)
+        self.assertIsNone(watermark.value)
+        self.assertIsNone(watermark.max_value)
+
+        # Nothing read, nothing saved
+        watermark.save()
+        self.assertEqual([], os.listdir(self.tmpdir.name))
+
+        for row in [{"mutatie": 2}, {"mutatie": None}, {"mutatie": 3}, {"mutatie": 1}, {}]:
+            watermark.update(row)
+        self.assertEqual(3, watermark.max_value)
+
+        watermark.save()
+        self.assertEqual(3, watermark.value)
+        self.assertEqual(["name.watermark"], os.listdir(self.tmpdir.name))
+
+        watermark = Watermark("name", {"column": "mutatie"})
+        self.assertEqual(3, watermark.value)
+        self.assertIsNone(watermark.max_value)
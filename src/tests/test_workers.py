@@ -0,0 +1,128 @@
+import os
+import signal
+import tempfile
+
+from unittest import TestCase
+from unittest.mock import MagicMock, call, patch
+
+from gobcore.exceptions import GOBException
+
+from gobimport import workers
+from gobimport.workers import application_slot, parse_application_concurrency, requeue, run_worker_pool
+
+
+class TestWorkers(TestCase):
+
+    def tearDown(self):
+        workers._application_slots.clear()
+
+    def test_parse_application_concurrency(self):
+        self.assertEqual({}, parse_application_concurrency(""))
+        self.assertEqual({"Neuron": 2, "DGDialog": 1}, parse_application_concurrency("Neuron=2, DGDialog=1,"))
+
+        for spec in ["Neuron", "Neuron=two", "Neuron=1=2"]:
+            with self.assertRaises(GOBException):
+                parse_application_concurrency(spec)
+
+    def test_application_slot(self):
+        # No limit
+        with application_slot("any application") as has_slot:
+            self.assertTrue(has_slot)
+
+        with application_slot(None) as has_slot:
+            self.assertTrue(has_slot)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            workers._application_slots["Neuron"] = [os.path.join(tmpdir, "Neuron.0"), os.path.join(tmpdir, "Neuron.1")]
+
+            # Free slots
+            with application_slot("Neuron") as first, application_slot("Neuron") as second:
+                self.assertTrue(first and second)
+                with open(os.path.join(tmpdir, "Neuron.1")) as file:
+                    self.assertEqual(str(os.getpid()), file.read())
+
+                # All slots are in use, the import does not wait for a free slot
+                with application_slot("Neuron") as has_slot:
+                    self.assertFalse(has_slot)
+
+            # The slot is released on an exception
+            with self.assertRaises(ValueError):
+                with application_slot("Neuron"):
+                    raise ValueError
+            slots = [workers._acquire_slot(workers._application_slots["Neuron"]) for _ in range(2)]
+            self.assertTrue(all(slots))
+            for slot in slots:
+                slot.close()
+
+    @patch("gobimport.workers.logger")
+    @patch("gobimport.workers.publish")
+    def test_requeue(self, mock_publish, mock_logger):
+        msg = {"header": {"application": "Neuron"}}
+        requeue(msg)
+        mock_publish.assert_called_once_with(workers.WORKFLOW_EXCHANGE, workers.IMPORT, msg)
+        self.assertTrue(msg["header"]["requeued"])
+
+        # Only the first requeue is logged
+        requeue(msg)
+        self.assertEqual(2, mock_publish.call_count)
+        mock_logger.info.assert_called_once()
+
+    @patch("gobimport.workers.IMPORT_APPLICATION_CONCURRENCY", "Neuron=2")
+    @patch("gobimport.workers.get_gob_model")
+    @patch("gobimport.workers.time.sleep")
+    @patch("gobimport.workers.multiprocessing.get_context")
+    def test_run_worker_pool(self, mock_get_context, mock_sleep, mock_get_gob_model):
+        context = mock_get_context.return_value
+        processes = [MagicMock(exitcode=None), MagicMock(exitcode=None), MagicMock(exitcode=-9)]
+        context.Process.side_effect = processes
+        processes[0].is_alive.return_value = False
+        processes[1].is_alive.return_value = True
+        processes[2].is_alive.return_value = True
+
+        # Stop the pool after the second round
+        def sleep(seconds):
+            if mock_sleep.call_count == 2:
+                # The pool has a termination handler while it runs
+                self.assertEqual(workers._terminate, signal.getsignal(signal.SIGTERM))
+                self.assertTrue(all(os.path.isdir(os.path.dirname(slot)) for slot in workers._application_slots["Neuron"]))
+                raise KeyboardInterrupt
+
+        mock_sleep.side_effect = sleep
+        target = MagicMock()
+        default_handler = signal.getsignal(signal.SIGTERM)
+        with self.assertRaises(KeyboardInterrupt):
+            run_worker_pool(2, target, "arg")
+
+        mock_get_context.assert_called_with("fork")
+        slots = workers._application_slots["Neuron"]
+        self.assertEqual(["Neuron.0", "Neuron.1"], [os.path.basename(slot) for slot in slots])
+        mock_get_gob_model.assert_called_once()
+
+        # The first worker has exited and is restarted
+        self.assertEqual([
+            call(target=workers._run_worker, args=(target, ("arg",)), name="import-worker-0"),
+            call(target=workers._run_worker, args=(target, ("arg",)), name="import-worker-1"),
+            call(target=workers._run_worker, args=(target, ("arg",)), name="import-worker-0"),
+        ], context.Process.call_args_list)
+        for process in processes:
+            process.start.assert_called_once()
+
+        # The running workers are stopped, the slots are removed and the termination handler is restored
+        processes[0].terminate.assert_not_called()
+        for process in processes[1:]:
+            process.terminate.assert_called_once()
+            process.join.assert_called_once()
+        self.assertFalse(os.path.exists(os.path.dirname(slots[0])))
+        self.assertEqual(default_handler, signal.getsignal(signal.SIGTERM))
+
+    def test_terminate(self):
+        with self.assertRaises(SystemExit) as context:
+            workers._terminate(signal.SIGTERM, None)
+        self.assertEqual(128 + signal.SIGTERM, context.exception.code)
+
+    @patch("gobimport.workers.signal.signal")
+    def test_run_worker(self, mock_signal):
+        target = MagicMock()
+        workers._run_worker(target, ("arg",))
+        mock_signal.assert_called_with(signal.SIGTERM, signal.SIG_DFL)
+        target.assert_called_with("arg")